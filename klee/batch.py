@@ -0,0 +1,198 @@
+import re
+import shlex
+import asyncio
+import secrets
+
+from .connection import close_async_client
+from .multiplex import _write
+from .printing import echo_bold, echo_error
+from .session import ExecError, exec_session
+
+ERROR_BATCH_FAILED = "running the batch failed: {message}"
+ERROR_SESSION_ENDED = "the shell session ended before the command completed"
+
+BATCH_HEADER = "$ {command}"
+BATCH_COMMAND_FAILED = "exited with exit-code {code}"
+BATCH_SUMMARY = "{succeeded} of {total} commands succeeded"
+BATCH_FAILED = "failed: {lines}"
+BATCH_LINE = "line {number}"
+
+# Every command of the batch is run by the same shell, which reports its exit
+# code after the output with a line only it could print. 'command' keeps 'eval'
+# from ending the shell on a syntax error, and STDIN is left alone since it is
+# the rest of the batch.
+COMMAND_TEMPLATE = (
+    "command eval {command} </dev/null 2>&1; "
+    "printf '\\n%s %d %d\\n' {token} {index} \"$?\"\n"
+)
+
+
+def read_batch(lines):
+    """
+    The commands of a batch file as '(line number, command)' pairs, one per line.
+    Blank lines and lines starting with '#' are skipped, and a line ending with a
+    backslash continues on the next.
+    """
+    commands = []
+    pending = []
+    start = None
+    for number, line in enumerate(lines, start=1):
+        line = line.rstrip("\r\n")
+        if not pending and (not line.strip() or line.lstrip().startswith("#")):
+            continue
+
+        if start is None:
+            start = number
+
+        if line.endswith("\\"):
+            # Kept, so the shell joins the lines like it would in a script
+            pending.append(line)
+            continue
+
+        pending.append(line)
+        commands.append((start, "\n".join(pending)))
+        pending = []
+        start = None
+
+    if pending:
+        commands.append((start, "\n".join(pending)))
+
+    return commands
+
+
+def batch_script(commands, token):
+    """The shell script running 'commands' (see 'read_batch') one by one."""
+    script = [
+        COMMAND_TEMPLATE.format(command=shlex.quote(command), token=token, index=index)
+        for index, (_, command) in enumerate(commands)
+    ]
+    script.append("exit 0\n")
+    return "".join(script)
+
+
+class SentinelParser:
+    """
+    Splits the output of a batch into the output and the exit code of each
+    command, using the lines that 'batch_script' prints after each of them.
+    """
+
+    def __init__(self, token):
+        self._sentinel = re.compile(
+            b"\n" + re.escape(token.encode()) + rb" (\d+) (\d+)\n"
+        )
+        self._buffer = b""
+
+    def feed(self, data):
+        """
+        The events in 'data' and any earlier partial data: '("output", bytes)'
+        for output and '("exit", index, code)' when a command has completed.
+        Output is only passed on up to the last line break, which could be the
+        start of a sentinel line.
+        """
+        if isinstance(data, str):
+            data = data.encode()
+
+        self._buffer += data
+        events = []
+        while True:
+            match = self._sentinel.search(self._buffer)
+            if match is None:
+                break
+
+            if match.start() > 0:
+                events.append(("output", self._buffer[: match.start()]))
+            events.append(("exit", int(match.group(1)), int(match.group(2))))
+            self._buffer = self._buffer[match.end() :]
+
+        end = self._buffer.rfind(b"\n")
+        if end > 0:
+            events.append(("output", self._buffer[:end]))
+            self._buffer = self._buffer[end:]
+
+        return events
+
+    def flush(self):
+        """The output left when the session has ended."""
+        output, self._buffer = self._buffer, b""
+        return output
+
+
+def run_batch(container, commands, env=(), user=""):
+    """
+    Run 'commands' (see 'read_batch') in a single shell session in the container,
+    printing the output of each command below a header with the command. Returns
+    the exit code of klee: 0 if every command exited with 0, otherwise 1.
+    """
+    exit_codes = {}
+    try:
+        asyncio.run(_run_batch(container, commands, env, user, exit_codes))
+    except ExecError as e:
+        echo_error(ERROR_BATCH_FAILED.format(message=e))
+        return 1
+
+    return _print_summary(commands, exit_codes)
+
+
+async def _run_batch(container, commands, env, user, exit_codes):
+    from websockets.exceptions import ConnectionClosed
+
+    token = f"__klee_batch_{secrets.token_hex(8)}__"
+    parser = SentinelParser(token)
+    try:
+        async with exec_session(
+            container, ["/bin/sh"], env=env, user=user
+        ) as websocket:
+            await websocket.send(batch_script(commands, token).encode())
+            _print_header(commands, 0)
+            last = b"\n"
+            while True:
+                try:
+                    frame = await websocket.recv()
+                except ConnectionClosed:
+                    break
+
+                for event in parser.feed(frame):
+                    if event[0] == "output":
+                        _write(event[1])
+                        last = event[1][-1:]
+                        continue
+
+                    _, index, code = event
+                    exit_codes[index] = code
+                    if last != b"\n":
+                        # The output of the next command starts on a new line
+                        _write(b"\n")
+                        last = b"\n"
+                    if code != 0:
+                        echo_error(BATCH_COMMAND_FAILED.format(code=code))
+                    _print_header(commands, index + 1)
+
+            _write(parser.flush())
+    finally:
+        await close_async_client()
+
+    if len(exit_codes) < len(commands):
+        echo_error(ERROR_SESSION_ENDED)
+
+
+def _print_header(commands, index):
+    from rich.markup import escape
+
+    if index < len(commands):
+        echo_bold(escape(BATCH_HEADER.format(command=commands[index][1])))
+
+
+def _print_summary(commands, exit_codes):
+    failed = [
+        BATCH_LINE.format(number=line)
+        for index, (line, _) in enumerate(commands)
+        if exit_codes.get(index) != 0
+    ]
+    echo_bold(
+        BATCH_SUMMARY.format(succeeded=len(commands) - len(failed), total=len(commands))
+    )
+    if failed:
+        echo_error(BATCH_FAILED.format(lines=", ".join(failed)))
+        return 1
+
+    return 0
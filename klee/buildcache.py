@@ -0,0 +1,338 @@
+import os
+import glob
+import shlex
+import tempfile
+from collections import namedtuple
+
+from . import jsoncodec
+from .utils import _parse_timestamp, load_json_map, write_json_map
+
+CACHE_FROM_AUTO = "auto"
+
+# Instructions that change the filesystem of the build container, so their
+# results are only reused through the snapshot taken after them
+SNAPSHOT_INSTRUCTIONS = {"RUN", "COPY", "ADD"}
+COPY_INSTRUCTIONS = {"COPY", "ADD"}
+
+# Dockerfiles written for cached builds are placed in the temporary directory
+# with this prefix, outside the context, so that 'COPY .' does not copy them
+CACHED_DOCKERFILE_PREFIX = "klee-cache-"
+
+# The image, and snapshot if any, that the 'FROM' of an image built by klee
+# referred to when it was built, as '{image ID: base}'
+BASE_IMAGES_PATH = "~/.klee/build_base_images.json"
+
+# Images kept in the record of base images, the least recently built are dropped
+# first
+MAX_BASE_IMAGES = 1000
+
+# Images built from a cached build are in turn built on other images, which is
+# followed this many levels deep
+MAX_CHAIN_DEPTH = 16
+
+# An instruction of an (expanded) image: the instruction, and the image having
+# the snapshot taken after it, if any
+CachedStep = namedtuple("CachedStep", ["instruction", "image_id", "snapshot"])
+
+# The image and snapshot a build can continue from, and how many instructions
+# of the Dockerfile that replaces, including 'FROM'
+CacheMatch = namedtuple("CacheMatch", ["image_id", "snapshot", "reused"])
+
+
+def parse_dockerfile(text):
+    """
+    The instructions of a Dockerfile, with continued lines joined and comments
+    and blank lines left out.
+    """
+    instructions = []
+    pending = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+
+        if stripped.endswith("\\"):
+            pending.append(stripped[:-1])
+            continue
+
+        pending.append(stripped)
+        instructions.append(" ".join(pending))
+        pending = []
+
+    if pending:
+        instructions.append(" ".join(pending))
+
+    return instructions
+
+
+def normalize(instruction):
+    """'instruction' with an upper-case keyword and single spaces between words."""
+    words = instruction.split()
+    if not words:
+        return ""
+
+    return " ".join([words[0].upper(), *words[1:]])
+
+
+def keyword(instruction):
+    return normalize(instruction).partition(" ")[0]
+
+
+def expand_image(image, images_by_id, depth=0):
+    """
+    The instructions of 'image' as 'CachedStep's. If the image was built by a
+    cached build, i.e., from a snapshot of another image followed by the
+    instructions replayed from it (see 'cached_dockerfile'), the instructions of
+    that image are put back in place of its 'FROM'.
+    """
+    instructions = image.instructions if isinstance(image.instructions, list) else []
+    steps = [
+        # Snapshots are referred to with or without their '@'
+        CachedStep(normalize(instruction), image.id, snapshot.lstrip("@"))
+        for instruction, snapshot in instructions
+    ]
+    if not steps or depth >= MAX_CHAIN_DEPTH:
+        return steps
+
+    base, _, snapshot = steps[0].instruction.partition(" ")[2].partition("@")
+    parent = images_by_id.get(base)
+    if keyword(steps[0].instruction) != "FROM" or parent is None or not snapshot:
+        return steps
+
+    parent_steps = expand_image(parent, images_by_id, depth + 1)
+    for n, step in enumerate(parent_steps):
+        if step.snapshot == snapshot:
+            prefix = parent_steps[: n + 1]
+            replayed = [step.instruction for step in _replayed(prefix)]
+            if [step.instruction for step in steps[1 : 1 + len(replayed)]] != replayed:
+                return steps
+
+            return prefix + steps[1 + len(replayed) :]
+
+    return steps
+
+
+def find_cache_match(
+    instructions,
+    images,
+    context,
+    build_args=(),
+    cache_from=CACHE_FROM_AUTO,
+    base_images=None,
+):
+    """
+    The 'CacheMatch' of the image sharing the longest prefix with the Dockerfile
+    'instructions', or None if none of the 'images' has a snapshot to continue
+    from. With 'cache_from' other than 'auto', only that image (ID or NAME:TAG)
+    is considered.
+
+    'FROM' only matches if the image it refers to now (see 'resolve_base') is
+    the one recorded in 'base_images' for the image that was built from it, as
+    a tag may have been moved to another image since. A 'COPY' or 'ADD'
+    instruction only matches if none of the files it copies from 'context' were
+    modified after the image was created, as far as their modification times
+    tell. An 'ARG' instruction whose value is given in 'build_args' ends the
+    prefix, as the values used earlier are not known.
+    """
+    images_by_id = {image.id: image for image in images}
+    base = resolve_base(instructions, images)
+    base_images = {} if base_images is None else base_images
+    instructions = [normalize(instruction) for instruction in instructions]
+    build_args = {arg.partition("=")[0] for arg in build_args}
+    best = None
+    for image in images:
+        if cache_from != CACHE_FROM_AUTO and not _refers_to(cache_from, image):
+            continue
+
+        steps = expand_image(image, images_by_id)
+        if not steps or base is None or base_images.get(steps[0].image_id) != base:
+            continue
+
+        reused = _reusable_steps(instructions, steps, images_by_id, context, build_args)
+        if reused == 0:
+            continue
+
+        step = steps[reused - 1]
+        candidate = CacheMatch(step.image_id, step.snapshot, reused)
+        if best is None or candidate.reused > best.reused:
+            best = candidate
+
+    return best
+
+
+def cached_dockerfile(instructions, match):
+    """
+    A Dockerfile continuing from the snapshot of 'match'. The instructions without
+    snapshots before it (e.g., 'ENV' or 'WORKDIR') are replayed, since the
+    configuration they set is not part of the snapshot.
+    """
+    instructions = [normalize(instruction) for instruction in instructions]
+    prefix = [
+        CachedStep(instruction, None, "")
+        for instruction in instructions[: match.reused]
+    ]
+    lines = [f"FROM {match.image_id}@{match.snapshot}"]
+    lines.extend(step.instruction for step in _replayed(prefix))
+    lines.extend(instructions[match.reused :])
+    return "\n".join(lines) + "\n"
+
+
+def write_cached_dockerfile(text):
+    """
+    Write 'text' to a new Dockerfile in the temporary directory and return its
+    path. The caller removes it after the build.
+    """
+    with tempfile.NamedTemporaryFile(
+        "w",
+        prefix=CACHED_DOCKERFILE_PREFIX,
+        suffix=".Dockerfile",
+        delete=False,
+        encoding="utf-8",
+    ) as f:
+        f.write(text)
+
+    return f.name
+
+
+def resolve_base(instructions, images):
+    """
+    The ID of the image among 'images' that the 'FROM' of the Dockerfile
+    'instructions' refers to, followed by its '@SNAPSHOT' if it has one, or None
+    if there is no such image.
+    """
+    if not instructions or keyword(instructions[0]) != "FROM":
+        return None
+
+    words = normalize(instructions[0]).split()
+    if len(words) < 2:
+        return None
+
+    reference, at, snapshot = words[1].partition("@")
+    for image in images:
+        if _refers_to(reference, image):
+            return f"{image.id}{at}{snapshot}"
+
+    return None
+
+
+def load_base_images(filepath=BASE_IMAGES_PATH):
+    """The '{image ID: base}' of the images built by klee."""
+    return load_json_map(filepath)
+
+
+def record_base_image(image_id, base, filepath=BASE_IMAGES_PATH):
+    """
+    Store 'base' as what the 'FROM' of the image 'image_id' referred to. Returns
+    whether the record could be written.
+    """
+    base_images = load_base_images(filepath)
+    base_images.pop(image_id, None)
+    base_images[image_id] = base
+    entries = list(base_images.items())[-MAX_BASE_IMAGES:]
+    return write_json_map(filepath, dict(entries))
+
+
+def _refers_to(reference, image):
+    return reference in (
+        image.id,
+        f"{image.name}:{image.tag}",
+        image.name if image.tag == "latest" else None,
+    )
+
+
+def _replayed(steps):
+    return [
+        step
+        for step in steps[1:]
+        if keyword(step.instruction) not in SNAPSHOT_INSTRUCTIONS
+    ]
+
+
+def _reusable_steps(instructions, steps, images_by_id, context, build_args):
+    reused = 0
+    for n, (instruction, step) in enumerate(zip(instructions, steps)):
+        if n == 0:
+            # 'FROM' is compared by the image it refers to, see 'find_cache_match'
+            continue
+
+        if instruction != step.instruction:
+            break
+
+        word = keyword(instruction)
+        if word == "ARG" and _arg_name(instruction) in build_args:
+            break
+
+        if word in SNAPSHOT_INSTRUCTIONS:
+            # Only instructions that completed have a snapshot
+            if not step.snapshot:
+                break
+
+            if word in COPY_INSTRUCTIONS:
+                image = images_by_id[step.image_id]
+                if not _unchanged_since(context, instruction, image.created):
+                    break
+
+            reused = n + 1
+
+    return reused
+
+
+def _arg_name(instruction):
+    return instruction.partition(" ")[2].partition("=")[0].strip()
+
+
+def _unchanged_since(context, instruction, created):
+    """
+    Whether the sources of the 'COPY'/'ADD' 'instruction' exist in 'context' and
+    none of the files were modified after 'created'.
+    """
+    try:
+        created = _parse_timestamp(created).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+    sources = _copy_sources(instruction)
+    if not sources:
+        return False
+
+    for source in sources:
+        if "://" in source:
+            # Remote files could have changed at any time
+            return False
+
+        paths = glob.glob(os.path.join(context, source.lstrip("/")))
+        if not paths:
+            return False
+
+        for path in paths:
+            if _newest_mtime(path) > created:
+                return False
+
+    return True
+
+
+def _copy_sources(instruction):
+    arguments = instruction.partition(" ")[2].strip()
+    if arguments.startswith("["):
+        try:
+            words = jsoncodec.loads(arguments)
+        except jsoncodec.JSONDecodeError:
+            return []
+    else:
+        try:
+            words = shlex.split(arguments)
+        except ValueError:
+            return []
+
+    words = [word for word in words if not word.startswith("--")]
+    return words[:-1]
+
+
+def _newest_mtime(path):
+    newest = os.lstat(path).st_mtime
+    if os.path.isdir(path) and not os.path.islink(path):
+        for directory, subdirectories, files in os.walk(path):
+            for name in subdirectories + files:
+                newest = max(newest, os.lstat(os.path.join(directory, name)).st_mtime)
+
+    return newest
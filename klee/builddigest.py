@@ -0,0 +1,94 @@
+import os
+import hashlib
+
+from . import jsoncodec
+from .sync import hash_files
+from .utils import load_json_map, write_json_map
+from .watch import snapshot
+
+# Glob patterns, one per line, of paths in the context that do not affect the
+# build, matched like the '--exclude' patterns of 'klee sync'
+IGNORE_FILE = ".kleeignore"
+
+# The digests of earlier builds, as '{digest: image ID}'
+DIGEST_CACHE_PATH = "~/.klee/build_digests.json"
+
+# Entries kept in the digest cache, the least recently recorded are dropped first
+MAX_CACHE_ENTRIES = 1000
+
+# Keys of the build configuration that do not change the image built
+UNUSED_CONFIG_KEYS = {"quiet"}
+
+
+def read_ignore_file(context):
+    """The patterns of the ignore file in 'context', if there is one."""
+    try:
+        with open(os.path.join(context, IGNORE_FILE), encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return []
+
+    return [
+        line.strip()
+        for line in lines
+        if line.strip() and not line.lstrip().startswith("#")
+    ]
+
+
+def context_digest(context, dockerfile, build_config, base_image=""):
+    """
+    The SHA-256 hex digest of what a build depends on as far as klee can tell:
+    the path, mode and contents of every file in 'context' that is not ignored
+    (see 'read_ignore_file'), the Dockerfile, the JSON 'build_config' sent to
+    kleened, which includes the build arguments, and the ID of the image the
+    build starts from, 'base_image'.
+
+    Files are hashed on a thread per CPU. Raises 'OSError' if the Dockerfile
+    cannot be read.
+    """
+    files = snapshot(context, read_ignore_file(context))
+    digests = hash_files(context, files)
+
+    digest = hashlib.sha256()
+    digest.update(_canonical_config(build_config).encode())
+    digest.update(f"\n{base_image}\n".encode())
+    with open(os.path.join(context, dockerfile), "rb") as f:
+        digest.update(hashlib.sha256(f.read()).hexdigest().encode())
+
+    for path in sorted(files):
+        # Files that cannot be read, e.g., dangling symbolic links, still count
+        file_digest = digests[path][1] if path in digests else ""
+        mode = files[path][2]
+        digest.update(
+            f"\n{path}\0{mode:o}\0{file_digest}".encode(errors="surrogateescape")
+        )
+
+    return digest.hexdigest()
+
+
+def load_digest_cache(filepath=DIGEST_CACHE_PATH):
+    """The '{digest: image ID}' cache, empty if it is missing or unreadable."""
+    return load_json_map(filepath)
+
+
+def record_digest(digest, image_id, filepath=DIGEST_CACHE_PATH):
+    """
+    Store 'image_id' as the image built from 'digest'. The cache is replaced
+    atomically, so concurrent builds never read a partial file. Returns whether
+    the cache could be written.
+    """
+    cache = load_digest_cache(filepath)
+    cache.pop(digest, None)
+    cache[digest] = image_id
+    entries = list(cache.items())[-MAX_CACHE_ENTRIES:]
+    return write_json_map(filepath, dict(entries))
+
+
+def _canonical_config(build_config):
+    config = jsoncodec.loads(build_config)
+    for key in UNUSED_CONFIG_KEYS:
+        config.pop(key, None)
+
+    # The order of '--build-arg' does not matter
+    config["buildargs"] = dict(sorted(config.get("buildargs", {}).items()))
+    return jsoncodec.dumps(config)
@@ -0,0 +1,294 @@
+import os
+import time
+import asyncio
+from collections import namedtuple
+
+from .buildcache import keyword, parse_dockerfile
+from .buildrun import run_build
+from .connection import close_async_client
+from .multiplex import PREFIX_SEPARATOR, LinePrefixer, _write
+from .parallel import DEFAULT_PARALLEL
+from .printing import echo_bold, print_table
+from .utils import image_reference
+
+ERROR_GRAPH_FILE = "invalid build graph {filepath}: {reason}"
+ERROR_UNKNOWN_DEPENDENCY = "'{name}' depends on unknown build '{dependency}'"
+ERROR_DEPENDENCY_CYCLE = "dependency cycle: {cycle}"
+ERROR_BUILD_FAILED = "{message} (most recent snapshot: {snapshot})"
+ERROR_DEPENDENCY_FAILED = "not built, since {dependency} failed"
+
+GRAPH_SUMMARY = "{succeeded} of {total} images built in {seconds:.1f}s"
+GRAPH_CRITICAL_PATH = "critical path: {path} ({seconds:.1f}s)"
+
+GRAPH_SUMMARY_COLUMNS = [
+    ("BUILD", {"style": "bold aquamarine1"}),
+    ("IMAGE ID", {"style": "cyan"}),
+    ("STARTED", {"style": "bright_white", "justify": "right"}),
+    ("DURATION", {"style": "bright_white", "justify": "right"}),
+    ("RESULT", {}),
+]
+
+# Build messages that are complete lines even without a trailing newline
+STATUS_MARKERS = (
+    "--> Snapshot created: @",
+    "Using user-supplied parent image:",
+)
+
+BuildSpec = namedtuple(
+    "BuildSpec", ["name", "path", "file", "tag", "build_args", "from_", "depends_on"]
+)
+BuildOutcome = namedtuple(
+    "BuildOutcome", ["succeeded", "image_id", "started", "seconds", "message"]
+)
+
+
+class GraphError(Exception):
+    """A build graph that cannot be built, e.g., because of a dependency cycle."""
+
+
+def is_status_message(message):
+    """Whether 'message' is one of the status lines of a build."""
+    return any(marker in message for marker in STATUS_MARKERS) or (
+        "Step " in message and " : " in message
+    )
+
+
+def load_graph(filepath):
+    """
+    The 'BuildSpec's of the YAML file 'filepath'. Relative paths are relative to
+    the directory of the file. See 'docs/klee_image_build.md' for the format.
+    """
+    import yaml
+
+    try:
+        with open(filepath, encoding="utf-8") as f:
+            graph = yaml.safe_load(f)
+    except (OSError, yaml.YAMLError) as e:
+        raise GraphError(ERROR_GRAPH_FILE.format(filepath=filepath, reason=e)) from e
+
+    builds = graph.get("builds") if isinstance(graph, dict) else None
+    if not isinstance(builds, dict) or not builds:
+        raise GraphError(
+            ERROR_GRAPH_FILE.format(filepath=filepath, reason="no 'builds' mapping")
+        )
+
+    directory = os.path.dirname(os.path.abspath(filepath))
+    specs = []
+    for name, build in builds.items():
+        if not isinstance(build, dict) or "path" not in build:
+            reason = f"build '{name}' has no 'path'"
+            raise GraphError(ERROR_GRAPH_FILE.format(filepath=filepath, reason=reason))
+
+        build_args = build.get("build_args", [])
+        if isinstance(build_args, dict):
+            build_args = [f"{var}={value}" for var, value in build_args.items()]
+
+        specs.append(
+            BuildSpec(
+                name=str(name),
+                path=os.path.join(directory, str(build["path"])),
+                file=build.get("file", "Dockerfile"),
+                tag=build.get("tag", ""),
+                build_args=list(build_args),
+                from_=build.get("from"),
+                depends_on=list(build.get("depends_on", [])),
+            )
+        )
+
+    return specs
+
+
+def dockerfile_base(path, file, from_=None):
+    """
+    The image a build of the Dockerfile 'file' in 'path' starts from, i.e.,
+    'from_' if given and otherwise the image of its 'FROM', or None if unknown.
+    """
+    if from_ is not None:
+        return from_
+
+    try:
+        with open(os.path.join(path, file), encoding="utf-8") as f:
+            instructions = parse_dockerfile(f.read())
+    except OSError:
+        # kleened reports this when building
+        return None
+
+    for instruction in instructions:
+        if keyword(instruction) == "FROM":
+            return instruction.split()[1] if len(instruction.split()) > 1 else None
+
+    return None
+
+
+def dependencies(specs):
+    """
+    '{name: dependencies}' of the builds, where a build depends on the builds it
+    lists in 'depends_on' and on the build tagging the image of its 'FROM'.
+    """
+    names = {spec.name for spec in specs}
+    tags = {image_reference(spec.tag): spec.name for spec in specs if spec.tag}
+    graph = {}
+    for spec in specs:
+        depends = set()
+        for dependency in spec.depends_on:
+            if dependency not in names:
+                raise GraphError(
+                    ERROR_UNKNOWN_DEPENDENCY.format(
+                        name=spec.name, dependency=dependency
+                    )
+                )
+            depends.add(dependency)
+
+        base = dockerfile_base(spec.path, spec.file, spec.from_)
+        if base is not None and image_reference(base) in tags:
+            depends.add(tags[image_reference(base)])
+
+        depends.discard(spec.name)
+        graph[spec.name] = depends
+
+    _check_acyclic(graph)
+    return graph
+
+
+def critical_path(graph, outcomes):
+    """
+    The chain of builds, each depending on the one before, with the longest total
+    duration, and that duration. It bounds how fast the graph can be built.
+    """
+    finish = {}
+    previous = {}
+
+    def visit(name):
+        if name not in finish:
+            before = max(graph[name], key=visit, default=None)
+            previous[name] = before
+            finish[name] = outcomes[name].seconds + (
+                0 if before is None else finish[before]
+            )
+        return finish[name]
+
+    if not outcomes:
+        return [], 0
+
+    last = max(outcomes, key=visit)
+    path = []
+    while last is not None:
+        path.append(last)
+        last = previous[last]
+
+    return path[::-1], finish[path[0]]
+
+
+def run_graph(specs, graph, build_config, parallel=DEFAULT_PARALLEL):
+    """
+    Build every image of 'specs' with at most 'parallel' builds at a time, each as
+    soon as the builds it depends on (see 'dependencies') have succeeded. The
+    configuration sent to kleened is 'build_config(spec)'. Returns the exit code
+    of klee after printing a summary: 0 if every image was built, otherwise 1.
+    """
+    started = time.perf_counter()
+    outcomes = {}
+    asyncio.run(_run_all(specs, graph, build_config, parallel, outcomes, started))
+    return _print_summary(specs, graph, outcomes, time.perf_counter() - started)
+
+
+async def _run_all(specs, graph, build_config, parallel, outcomes, started):
+    semaphore = asyncio.Semaphore(parallel)
+    width = max(len(spec.name) for spec in specs)
+    tasks = {}
+
+    async def run_one(spec):
+        for dependency in sorted(graph[spec.name]):
+            await tasks[dependency]
+            if not outcomes[dependency].succeeded:
+                message = ERROR_DEPENDENCY_FAILED.format(dependency=dependency)
+                outcomes[spec.name] = BuildOutcome(False, "", None, 0, message)
+                return
+
+        async with semaphore:
+            prefixer = LinePrefixer(f"{spec.name:<{width}}{PREFIX_SEPARATOR}")
+            outcomes[spec.name] = await _build(
+                build_config(spec), spec.tag, prefixer, started
+            )
+
+    for spec in specs:
+        tasks[spec.name] = asyncio.ensure_future(run_one(spec))
+
+    try:
+        await asyncio.gather(*tasks.values())
+    finally:
+        for task in tasks.values():
+            task.cancel()
+        await close_async_client()
+
+
+async def _build(config, tag, prefixer, started):
+    def write(message):
+        if is_status_message(message) and not message.endswith("\n"):
+            message += "\n"
+        _write(prefixer.feed(message))
+
+    start = time.perf_counter()
+    run = await run_build(config, write, tag)
+    _write(prefixer.flush())
+    message = run.message
+    if run.snapshot:
+        message = ERROR_BUILD_FAILED.format(message=message, snapshot=run.snapshot)
+
+    return BuildOutcome(
+        run.succeeded, run.image_id, start - started, run.seconds, message
+    )
+
+
+def _check_acyclic(graph):
+    visiting = []
+    visited = set()
+
+    def visit(name):
+        if name in visited:
+            return
+        if name in visiting:
+            cycle = visiting[visiting.index(name) :] + [name]
+            raise GraphError(ERROR_DEPENDENCY_CYCLE.format(cycle=" -> ".join(cycle)))
+
+        visiting.append(name)
+        for dependency in sorted(graph[name]):
+            visit(dependency)
+        visiting.pop()
+        visited.add(name)
+
+    for name in graph:
+        visit(name)
+
+
+def _print_summary(specs, graph, outcomes, seconds):
+    rows = []
+    for spec in specs:
+        outcome = outcomes[spec.name]
+        rows.append(
+            [
+                spec.name,
+                outcome.image_id,
+                "" if outcome.started is None else f"{outcome.started:.1f}s",
+                "" if outcome.started is None else f"{outcome.seconds:.1f}s",
+                "built" if outcome.succeeded else outcome.message,
+            ]
+        )
+    print_table(rows, GRAPH_SUMMARY_COLUMNS)
+
+    built = {name: outcome for name, outcome in outcomes.items() if outcome.succeeded}
+    echo_bold(
+        GRAPH_SUMMARY.format(succeeded=len(built), total=len(specs), seconds=seconds)
+    )
+    path, path_seconds = critical_path(
+        {name: graph[name] & built.keys() for name in built}, built
+    )
+    if path:
+        echo_bold(
+            GRAPH_CRITICAL_PATH.format(path=" -> ".join(path), seconds=path_seconds)
+        )
+
+    if len(built) < len(specs):
+        return 1
+
+    return 0
@@ -0,0 +1,87 @@
+from collections import namedtuple
+
+from . import jsoncodec
+from .buildstats import StepTimer, record_build
+from .connection import create_websocket
+from .parallel import ERROR_CONNECTION
+from .session import closing_message
+
+WS_IMAGE_BUILD_ENDPOINT = "/images/build"
+
+ERROR_UNEXPECTED_MESSAGE = "unexpected message from kleened: {error}"
+
+# The outcome of a build. 'image_id' is set once kleened has started the build,
+# so failed builds have it too, 'snapshot' is the most recent snapshot of a failed
+# build, and 'steps' are the 'StepTiming's of the steps that ran.
+BuildRun = namedtuple(
+    "BuildRun",
+    ["started", "succeeded", "image_id", "snapshot", "message", "steps", "seconds"],
+)
+
+
+async def run_build(config, write, tag="", on_start=None):
+    """
+    Build an image with the JSON configuration 'config' and return its
+    'BuildRun'. 'on_start(image_id)' is called once kleened has started the
+    build, and 'write(message)' with every message of the build as it arrives.
+    The steps are timed, and the build is added to the history of 'tag', if any.
+
+    Errors, be it of the connection or of the build, are not raised but reported
+    in the message of the 'BuildRun'.
+    """
+    from websockets.exceptions import ConnectionClosed, WebSocketException
+
+    timer = StepTimer()
+    started = False
+    image_id = ""
+    try:
+        async with create_websocket(WS_IMAGE_BUILD_ENDPOINT) as websocket:
+            await websocket.send(config)
+            try:
+                start_msg = jsoncodec.loads(await websocket.recv())
+            except ConnectionClosed:
+                start_msg = closing_message(websocket)
+
+            if start_msg.get("msg_type") != "starting":
+                message = start_msg.get("message", "")
+                return BuildRun(False, False, "", "", message, [], timer.finish())
+
+            started = True
+            image_id = start_msg.get("data", "")
+            if on_start is not None:
+                on_start(image_id)
+
+            while True:
+                try:
+                    message = await websocket.recv()
+                except ConnectionClosed:
+                    break
+
+                timer.feed(message)
+                write(message)
+    except (WebSocketException, OSError) as e:
+        closing = {"msg_type": "error", "message": ERROR_CONNECTION.format(error=e)}
+    except jsoncodec.JSONDecodeError as e:
+        message = ERROR_UNEXPECTED_MESSAGE.format(error=e)
+        closing = {"msg_type": "error", "message": message}
+    else:
+        closing = closing_message(websocket)
+
+    seconds = timer.finish()
+    succeeded = started and closing.get("msg_type") != "error"
+    snapshot = "" if succeeded else closing.get("data", "")
+    if succeeded:
+        image_id = closing.get("data", "")
+
+    if tag and started:
+        record_build(tag, image_id, seconds, succeeded, timer.steps)
+
+    return BuildRun(
+        started,
+        succeeded,
+        image_id,
+        snapshot,
+        closing.get("message", ""),
+        timer.steps,
+        seconds,
+    )
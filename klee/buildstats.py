@@ -0,0 +1,302 @@
+import os
+import re
+import time
+import sqlite3
+import datetime
+import statistics
+from contextlib import closing
+from collections import namedtuple
+
+from .printing import echo_bold, echo_error, print_table
+from .utils import human_duration, image_reference
+
+# The durations of the steps of earlier builds, keyed by the tag of the image
+BUILD_HISTORY_PATH = "~/.klee/build_history.db"
+
+# A step is a regression when it took this many times as long as the median of
+# the earlier builds, and at least 'REGRESSION_MIN_SECONDS' longer
+REGRESSION_FACTOR = 1.5
+REGRESSION_MIN_SECONDS = 1.0
+
+# The status message kleened sends when a step of the Dockerfile starts
+STEP_PATTERN = re.compile(r"Step (\d+)/\d+ : (.*)", re.DOTALL)
+
+HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS builds (
+    id INTEGER PRIMARY KEY,
+    tag TEXT NOT NULL,
+    image_id TEXT NOT NULL,
+    finished TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    succeeded INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS builds_tag ON builds (tag, id);
+CREATE TABLE IF NOT EXISTS steps (
+    build_id INTEGER NOT NULL REFERENCES builds (id),
+    step INTEGER NOT NULL,
+    instruction TEXT NOT NULL,
+    seconds REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS steps_build ON steps (build_id);
+"""
+
+STEP_TIMING_COLUMNS = [
+    ("STEP", {"style": "cyan", "justify": "right"}),
+    ("INSTRUCTION", {"style": "bold aquamarine1"}),
+    ("DURATION", {"style": "bright_white", "justify": "right"}),
+    ("SHARE", {"style": "bright_white", "justify": "right"}),
+]
+
+BUILD_STATS_COLUMNS = [
+    ("STEP", {"style": "cyan", "justify": "right"}),
+    ("INSTRUCTION", {"style": "bold aquamarine1"}),
+    ("LAST", {"style": "bright_white", "justify": "right"}),
+    ("PREVIOUS", {"style": "bright_white", "justify": "right"}),
+    ("MEDIAN", {"style": "bright_white", "justify": "right"}),
+    ("CHANGE", {"justify": "right"}),
+]
+
+STEP_TIMING_TOTAL = "{steps} steps in {seconds:.1f}s"
+BUILD_STATS_HEADER = "{tag}: {result} {ago} ago in {seconds:.1f}s"
+BUILD_STATS_COMPARED = "compared with {earlier} earlier builds"
+BUILD_STATS_REGRESSIONS = "slower than usual: {steps}"
+BUILD_STATS_STEP = "step {number}"
+BUILD_STATS_NO_REGRESSIONS = "no steps are slower than usual"
+ERROR_NO_HISTORY = "no builds of {tag} have been recorded"
+
+StepTiming = namedtuple("StepTiming", ["step", "instruction", "seconds"])
+BuildRecord = namedtuple(
+    "BuildRecord", ["image_id", "finished", "seconds", "succeeded", "steps"]
+)
+# A step of the last build compared to the same instruction in earlier builds.
+# 'previous' and 'median' are None if the earlier builds did not have it.
+StepComparison = namedtuple(
+    "StepComparison",
+    ["step", "instruction", "seconds", "previous", "median", "regression"],
+)
+
+
+class StepTimer:
+    """
+    Times the steps of a build from the status messages kleened sends when each
+    step starts. A step ends when the next one starts or the build completes.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self.started = clock()
+        self.steps = []
+        self._current = None
+
+    def feed(self, message):
+        match = STEP_PATTERN.match(message.strip())
+        if match is None:
+            return
+
+        now = self._clock()
+        self._end_step(now)
+        instruction = " ".join(match.group(2).split())
+        self._current = (int(match.group(1)), instruction, now)
+
+    def finish(self):
+        """End the last step and return the duration of the build."""
+        now = self._clock()
+        self._end_step(now)
+        return now - self.started
+
+    def _end_step(self, now):
+        if self._current is not None:
+            step, instruction, started = self._current
+            self.steps.append(StepTiming(step, instruction, now - started))
+            self._current = None
+
+
+def print_step_timings(steps, seconds):
+    from rich.markup import escape
+
+    rows = [
+        [
+            str(step.step),
+            escape(step.instruction),
+            f"{step.seconds:.1f}s",
+            f"{step.seconds / seconds:.0%}" if seconds > 0 else "",
+        ]
+        for step in steps
+    ]
+    print_table(rows, STEP_TIMING_COLUMNS)
+    echo_bold(STEP_TIMING_TOTAL.format(steps=len(steps), seconds=seconds))
+
+
+def record_build(tag, image_id, seconds, succeeded, steps, filepath=BUILD_HISTORY_PATH):
+    """
+    Add a build of the image 'tag' with the 'StepTiming's 'steps' to the history.
+    Returns whether the history could be written.
+    """
+    finished = datetime.datetime.now(datetime.timezone.utc)
+    try:
+        with closing(_connect(filepath)) as db, db:
+            cursor = db.execute(
+                "INSERT INTO builds (tag, image_id, finished, seconds, succeeded)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (
+                    image_reference(tag),
+                    image_id or "",
+                    finished.isoformat(),
+                    seconds,
+                    int(succeeded),
+                ),
+            )
+            db.executemany(
+                "INSERT INTO steps (build_id, step, instruction, seconds)"
+                " VALUES (?, ?, ?, ?)",
+                [
+                    (cursor.lastrowid, step.step, step.instruction, step.seconds)
+                    for step in steps
+                ],
+            )
+    except (OSError, sqlite3.Error):
+        return False
+
+    return True
+
+
+def load_history(tag, limit, filepath=BUILD_HISTORY_PATH):
+    """The last 'limit' 'BuildRecord's of the image 'tag', the most recent first."""
+    if not os.path.exists(os.path.expanduser(filepath)):
+        return []
+
+    with closing(_connect(filepath)) as db:
+        builds = db.execute(
+            "SELECT id, image_id, finished, seconds, succeeded FROM builds"
+            " WHERE tag = ? ORDER BY id DESC LIMIT ?",
+            (image_reference(tag), limit),
+        ).fetchall()
+        history = []
+        for build_id, image_id, finished, seconds, succeeded in builds:
+            steps = db.execute(
+                "SELECT step, instruction, seconds FROM steps"
+                " WHERE build_id = ? ORDER BY step",
+                (build_id,),
+            ).fetchall()
+            history.append(
+                BuildRecord(
+                    image_id,
+                    finished,
+                    seconds,
+                    bool(succeeded),
+                    [StepTiming(*step) for step in steps],
+                )
+            )
+
+    return history
+
+
+def compare_steps(last, earlier):
+    """
+    The 'StepComparison' of every step of the build 'last' with the same
+    instruction in the successful builds of 'earlier', the most recent first.
+    Instructions are matched by their text, and repeated instructions by their
+    order, since inserting a step renumbers the steps after it.
+    """
+    durations = {}
+    for build in earlier:
+        if not build.succeeded:
+            # The step that failed did not run to completion
+            continue
+
+        for key, step in _keyed_steps(build.steps):
+            durations.setdefault(key, []).append(step.seconds)
+
+    comparisons = []
+    for key, step in _keyed_steps(last.steps):
+        seconds = durations.get(key)
+        previous = seconds[0] if seconds else None
+        median = statistics.median(seconds) if seconds else None
+        regression = median is not None and step.seconds > max(
+            median * REGRESSION_FACTOR, median + REGRESSION_MIN_SECONDS
+        )
+        comparisons.append(
+            StepComparison(
+                step.step, step.instruction, step.seconds, previous, median, regression
+            )
+        )
+
+    return comparisons
+
+
+def print_build_stats(tag, runs, filepath=BUILD_HISTORY_PATH):
+    """
+    Print how long each step of the last build of 'tag' took compared to the
+    'runs' builds before it. Returns the exit code of klee.
+    """
+    from rich.markup import escape
+
+    try:
+        history = load_history(tag, runs + 1, filepath)
+    except sqlite3.Error as e:
+        echo_error(str(e))
+        return 1
+
+    if not history:
+        echo_error(ERROR_NO_HISTORY.format(tag=image_reference(tag)))
+        return 1
+
+    last, earlier = history[0], history[1:]
+    echo_bold(
+        BUILD_STATS_HEADER.format(
+            tag=image_reference(tag),
+            result="built" if last.succeeded else "failed",
+            ago=human_duration(last.finished).lower(),
+            seconds=last.seconds,
+        )
+    )
+    echo_bold(BUILD_STATS_COMPARED.format(earlier=len(earlier)))
+
+    comparisons = compare_steps(last, earlier)
+    rows = []
+    for step in comparisons:
+        change = ""
+        if step.median is not None:
+            change = f"{step.seconds - step.median:+.1f}s"
+            if step.regression:
+                change = f"[bold red]{change}[/bold red]"
+
+        rows.append(
+            [
+                str(step.step),
+                escape(step.instruction),
+                f"{step.seconds:.1f}s",
+                "" if step.previous is None else f"{step.previous:.1f}s",
+                "" if step.median is None else f"{step.median:.1f}s",
+                change,
+            ]
+        )
+    print_table(rows, BUILD_STATS_COLUMNS)
+
+    regressions = [
+        BUILD_STATS_STEP.format(number=step.step)
+        for step in comparisons
+        if step.regression
+    ]
+    if regressions:
+        echo_error(BUILD_STATS_REGRESSIONS.format(steps=", ".join(regressions)))
+    else:
+        echo_bold(BUILD_STATS_NO_REGRESSIONS)
+
+    return 0
+
+
+def _keyed_steps(steps):
+    occurrences = {}
+    for step in steps:
+        n = occurrences.get(step.instruction, 0)
+        occurrences[step.instruction] = n + 1
+        yield (step.instruction, n), step
+
+
+def _connect(filepath):
+    filepath = os.path.expanduser(filepath)
+    os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+    db = sqlite3.connect(filepath)
+    db.executescript(HISTORY_SCHEMA)
+    return db
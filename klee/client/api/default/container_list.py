@@ -1,9 +1,11 @@
+from contextlib import contextmanager
 from http import HTTPStatus
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Union
 
 import httpx
 
 from ... import errors
+from .... import jsoncodec
 from ...client import AuthenticatedClient, Client
 from ...models.container_summary import ContainerSummary
 from ...types import UNSET, Response, Unset
@@ -33,7 +35,7 @@ def _parse_response(
 ) -> Optional[List["ContainerSummary"]]:
     if response.status_code == HTTPStatus.OK:
         response_200 = []
-        _response_200 = response.json()
+        _response_200 = jsoncodec.loads(response.content)
         for componentsschemas_container_summary_list_item_data in _response_200:
             componentsschemas_container_summary_list_item = ContainerSummary.from_dict(
                 componentsschemas_container_summary_list_item_data
@@ -60,7 +62,6 @@ def _build_response(
 
 
 def sync_detailed(
-    transport,
     *,
     client: Union[AuthenticatedClient, Client],
     all_: Union[Unset, None, bool] = UNSET,
@@ -88,12 +89,33 @@ def sync_detailed(
         )
     )
 
-    client = httpx.Client(base_url=client._base_url, transport=transport)
-    response = client.request(**kwargs)
+    response = client.get_httpx_client().request(**kwargs)
 
     return _build_response(client=client, response=response)
 
 
+@contextmanager
+def stream_detailed(
+    *,
+    client: Union[AuthenticatedClient, Client],
+    all_: Union[Unset, None, bool] = UNSET,
+    **kwargs,
+) -> Iterator[httpx.Response]:
+    """
+    Like 'sync_detailed', but yields the 'httpx.Response' before its body is read.
+    Nothing is decoded, so the body can be passed on as it arrives.
+    """
+
+    kwargs.update(
+        _get_kwargs(
+            all_=all_,
+        )
+    )
+
+    with client.get_httpx_client().stream(**kwargs) as response:
+        yield response
+
+
 def sync(
     *,
     client: Union[AuthenticatedClient, Client],
@@ -125,6 +147,7 @@ async def asyncio_detailed(
     *,
     client: Union[AuthenticatedClient, Client],
     all_: Union[Unset, None, bool] = UNSET,
+    **kwargs,
 ) -> Response[List["ContainerSummary"]]:
     """container list
 
@@ -142,8 +165,10 @@ async def asyncio_detailed(
         Response[List['ContainerSummary']]
     """
 
-    kwargs = _get_kwargs(
-        all_=all_,
+    kwargs.update(
+        _get_kwargs(
+            all_=all_,
+        )
     )
 
     response = await client.get_async_httpx_client().request(**kwargs)
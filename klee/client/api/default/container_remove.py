@@ -1,9 +1,11 @@
+from contextlib import contextmanager
 from http import HTTPStatus
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Iterator, Optional, Union
 
 import httpx
 
 from ... import errors
+from .... import jsoncodec
 from ...client import AuthenticatedClient, Client
 from ...models.error_response import ErrorResponse
 from ...models.id_response import IdResponse
@@ -28,19 +30,19 @@ def _parse_response(
     *, client: Union[AuthenticatedClient, Client], response: httpx.Response
 ) -> Optional[Union[ErrorResponse, IdResponse]]:
     if response.status_code == HTTPStatus.OK:
-        response_200 = IdResponse.from_dict(response.json())
+        response_200 = IdResponse.from_dict(jsoncodec.loads(response.content))
 
         return response_200
     if response.status_code == HTTPStatus.NOT_FOUND:
-        response_404 = ErrorResponse.from_dict(response.json())
+        response_404 = ErrorResponse.from_dict(jsoncodec.loads(response.content))
 
         return response_404
     if response.status_code == HTTPStatus.CONFLICT:
-        response_409 = ErrorResponse.from_dict(response.json())
+        response_409 = ErrorResponse.from_dict(jsoncodec.loads(response.content))
 
         return response_409
     if response.status_code == HTTPStatus.INTERNAL_SERVER_ERROR:
-        response_500 = ErrorResponse.from_dict(response.json())
+        response_500 = ErrorResponse.from_dict(jsoncodec.loads(response.content))
 
         return response_500
     if client.raise_on_unexpected_status:
@@ -61,7 +63,6 @@ def _build_response(
 
 
 def sync_detailed(
-    transport,
     container_id: str,
     *,
     client: Union[AuthenticatedClient, Client],
@@ -88,12 +89,33 @@ def sync_detailed(
         )
     )
 
-    client = httpx.Client(base_url=client._base_url, transport=transport)
-    response = client.request(**kwargs)
+    response = client.get_httpx_client().request(**kwargs)
 
     return _build_response(client=client, response=response)
 
 
+@contextmanager
+def stream_detailed(
+    container_id: str,
+    *,
+    client: Union[AuthenticatedClient, Client],
+    **kwargs,
+) -> Iterator[httpx.Response]:
+    """
+    Like 'sync_detailed', but yields the 'httpx.Response' before its body is read.
+    Nothing is decoded, so the body can be passed on as it arrives.
+    """
+
+    kwargs.update(
+        _get_kwargs(
+            container_id=container_id,
+        )
+    )
+
+    with client.get_httpx_client().stream(**kwargs) as response:
+        yield response
+
+
 def sync(
     container_id: str,
     *,
@@ -121,9 +143,7 @@ def sync(
 
 
 async def asyncio_detailed(
-    container_id: str,
-    *,
-    client: Union[AuthenticatedClient, Client],
+    container_id: str, *, client: Union[AuthenticatedClient, Client], **kwargs
 ) -> Response[Union[ErrorResponse, IdResponse]]:
     """container remove
 
@@ -140,8 +160,10 @@ async def asyncio_detailed(
         Response[Union[ErrorResponse, IdResponse]]
     """
 
-    kwargs = _get_kwargs(
-        container_id=container_id,
+    kwargs.update(
+        _get_kwargs(
+            container_id=container_id,
+        )
     )
 
     response = await client.get_async_httpx_client().request(**kwargs)
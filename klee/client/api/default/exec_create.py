@@ -1,9 +1,11 @@
+from contextlib import contextmanager
 from http import HTTPStatus
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Iterator, Optional, Union
 
 import httpx
 
 from ... import errors
+from .... import jsoncodec
 from ...client import AuthenticatedClient, Client
 from ...models.error_response import ErrorResponse
 from ...models.exec_config import ExecConfig
@@ -31,15 +33,15 @@ def _parse_response(
     *, client: Union[AuthenticatedClient, Client], response: httpx.Response
 ) -> Optional[Union[ErrorResponse, IdResponse]]:
     if response.status_code == HTTPStatus.CREATED:
-        response_201 = IdResponse.from_dict(response.json())
+        response_201 = IdResponse.from_dict(jsoncodec.loads(response.content))
 
         return response_201
     if response.status_code == HTTPStatus.NOT_FOUND:
-        response_404 = ErrorResponse.from_dict(response.json())
+        response_404 = ErrorResponse.from_dict(jsoncodec.loads(response.content))
 
         return response_404
     if response.status_code == HTTPStatus.INTERNAL_SERVER_ERROR:
-        response_500 = ErrorResponse.from_dict(response.json())
+        response_500 = ErrorResponse.from_dict(jsoncodec.loads(response.content))
 
         return response_500
     if client.raise_on_unexpected_status:
@@ -60,7 +62,6 @@ def _build_response(
 
 
 def sync_detailed(
-    transport,
     *,
     client: Union[AuthenticatedClient, Client],
     json_body: ExecConfig,
@@ -89,12 +90,33 @@ def sync_detailed(
         )
     )
 
-    client = httpx.Client(base_url=client._base_url, transport=transport)
-    response = client.request(**kwargs)
+    response = client.get_httpx_client().request(**kwargs)
 
     return _build_response(client=client, response=response)
 
 
+@contextmanager
+def stream_detailed(
+    *,
+    client: Union[AuthenticatedClient, Client],
+    json_body: ExecConfig,
+    **kwargs,
+) -> Iterator[httpx.Response]:
+    """
+    Like 'sync_detailed', but yields the 'httpx.Response' before its body is read.
+    Nothing is decoded, so the body can be passed on as it arrives.
+    """
+
+    kwargs.update(
+        _get_kwargs(
+            json_body=json_body,
+        )
+    )
+
+    with client.get_httpx_client().stream(**kwargs) as response:
+        yield response
+
+
 def sync(
     *,
     client: Union[AuthenticatedClient, Client],
@@ -124,9 +146,7 @@ def sync(
 
 
 async def asyncio_detailed(
-    *,
-    client: Union[AuthenticatedClient, Client],
-    json_body: ExecConfig,
+    *, client: Union[AuthenticatedClient, Client], json_body: ExecConfig, **kwargs
 ) -> Response[Union[ErrorResponse, IdResponse]]:
     """exec create
 
@@ -145,8 +165,10 @@ async def asyncio_detailed(
         Response[Union[ErrorResponse, IdResponse]]
     """
 
-    kwargs = _get_kwargs(
-        json_body=json_body,
+    kwargs.update(
+        _get_kwargs(
+            json_body=json_body,
+        )
     )
 
     response = await client.get_async_httpx_client().request(**kwargs)
@@ -1,9 +1,11 @@
+from contextlib import contextmanager
 from http import HTTPStatus
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Iterator, Optional, Union
 
 import httpx
 
 from ... import errors
+from .... import jsoncodec
 from ...client import AuthenticatedClient, Client
 from ...models.exec_start_config import ExecStartConfig
 from ...models.web_socket_message import WebSocketMessage
@@ -30,7 +32,7 @@ def _parse_response(
     *, client: Union[AuthenticatedClient, Client], response: httpx.Response
 ) -> Optional[WebSocketMessage]:
     if response.status_code == HTTPStatus.OK:
-        response_200 = WebSocketMessage.from_dict(response.json())
+        response_200 = WebSocketMessage.from_dict(jsoncodec.loads(response.content))
 
         return response_200
     if client.raise_on_unexpected_status:
@@ -51,7 +53,6 @@ def _build_response(
 
 
 def sync_detailed(
-    transport,
     *,
     client: Union[AuthenticatedClient, Client],
     json_body: ExecStartConfig,
@@ -122,12 +123,33 @@ def sync_detailed(
         )
     )
 
-    client = httpx.Client(base_url=client._base_url, transport=transport)
-    response = client.request(**kwargs)
+    response = client.get_httpx_client().request(**kwargs)
 
     return _build_response(client=client, response=response)
 
 
+@contextmanager
+def stream_detailed(
+    *,
+    client: Union[AuthenticatedClient, Client],
+    json_body: ExecStartConfig,
+    **kwargs,
+) -> Iterator[httpx.Response]:
+    """
+    Like 'sync_detailed', but yields the 'httpx.Response' before its body is read.
+    Nothing is decoded, so the body can be passed on as it arrives.
+    """
+
+    kwargs.update(
+        _get_kwargs(
+            json_body=json_body,
+        )
+    )
+
+    with client.get_httpx_client().stream(**kwargs) as response:
+        yield response
+
+
 def sync(
     *,
     client: Union[AuthenticatedClient, Client],
@@ -199,9 +221,7 @@ def sync(
 
 
 async def asyncio_detailed(
-    *,
-    client: Union[AuthenticatedClient, Client],
-    json_body: ExecStartConfig,
+    *, client: Union[AuthenticatedClient, Client], json_body: ExecStartConfig, **kwargs
 ) -> Response[WebSocketMessage]:
     """exec start
 
@@ -262,8 +282,10 @@ async def asyncio_detailed(
         Response[WebSocketMessage]
     """
 
-    kwargs = _get_kwargs(
-        json_body=json_body,
+    kwargs.update(
+        _get_kwargs(
+            json_body=json_body,
+        )
     )
 
     response = await client.get_async_httpx_client().request(**kwargs)
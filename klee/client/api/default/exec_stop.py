@@ -1,9 +1,11 @@
+from contextlib import contextmanager
 from http import HTTPStatus
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Iterator, Optional, Union
 
 import httpx
 
 from ... import errors
+from .... import jsoncodec
 from ...client import AuthenticatedClient, Client
 from ...models.error_response import ErrorResponse
 from ...models.id_response import IdResponse
@@ -39,15 +41,15 @@ def _parse_response(
     *, client: Union[AuthenticatedClient, Client], response: httpx.Response
 ) -> Optional[Union[ErrorResponse, IdResponse]]:
     if response.status_code == HTTPStatus.OK:
-        response_200 = IdResponse.from_dict(response.json())
+        response_200 = IdResponse.from_dict(jsoncodec.loads(response.content))
 
         return response_200
     if response.status_code == HTTPStatus.NOT_FOUND:
-        response_404 = ErrorResponse.from_dict(response.json())
+        response_404 = ErrorResponse.from_dict(jsoncodec.loads(response.content))
 
         return response_404
     if response.status_code == HTTPStatus.INTERNAL_SERVER_ERROR:
-        response_500 = ErrorResponse.from_dict(response.json())
+        response_500 = ErrorResponse.from_dict(jsoncodec.loads(response.content))
 
         return response_500
     if client.raise_on_unexpected_status:
@@ -68,7 +70,6 @@ def _build_response(
 
 
 def sync_detailed(
-    transport,
     exec_id: str,
     *,
     client: Union[AuthenticatedClient, Client],
@@ -101,12 +102,37 @@ def sync_detailed(
         )
     )
 
-    client = httpx.Client(base_url=client._base_url, transport=transport)
-    response = client.request(**kwargs)
+    response = client.get_httpx_client().request(**kwargs)
 
     return _build_response(client=client, response=response)
 
 
+@contextmanager
+def stream_detailed(
+    exec_id: str,
+    *,
+    client: Union[AuthenticatedClient, Client],
+    force_stop: bool,
+    stop_container: bool,
+    **kwargs,
+) -> Iterator[httpx.Response]:
+    """
+    Like 'sync_detailed', but yields the 'httpx.Response' before its body is read.
+    Nothing is decoded, so the body can be passed on as it arrives.
+    """
+
+    kwargs.update(
+        _get_kwargs(
+            exec_id=exec_id,
+            force_stop=force_stop,
+            stop_container=stop_container,
+        )
+    )
+
+    with client.get_httpx_client().stream(**kwargs) as response:
+        yield response
+
+
 def sync(
     exec_id: str,
     *,
@@ -145,6 +171,7 @@ async def asyncio_detailed(
     client: Union[AuthenticatedClient, Client],
     force_stop: bool,
     stop_container: bool,
+    **kwargs,
 ) -> Response[Union[ErrorResponse, IdResponse]]:
     """exec stop
 
@@ -163,10 +190,12 @@ async def asyncio_detailed(
         Response[Union[ErrorResponse, IdResponse]]
     """
 
-    kwargs = _get_kwargs(
-        exec_id=exec_id,
-        force_stop=force_stop,
-        stop_container=stop_container,
+    kwargs.update(
+        _get_kwargs(
+            exec_id=exec_id,
+            force_stop=force_stop,
+            stop_container=stop_container,
+        )
     )
 
     response = await client.get_async_httpx_client().request(**kwargs)
@@ -1,9 +1,11 @@
+from contextlib import contextmanager
 from http import HTTPStatus
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Iterator, Optional, Union
 
 import httpx
 
 from ... import errors
+from .... import jsoncodec
 from ...client import AuthenticatedClient, Client
 from ...models.image_create_config import ImageCreateConfig
 from ...models.web_socket_message import WebSocketMessage
@@ -30,11 +32,11 @@ def _parse_response(
     *, client: Union[AuthenticatedClient, Client], response: httpx.Response
 ) -> Optional[WebSocketMessage]:
     if response.status_code == HTTPStatus.OK:
-        response_200 = WebSocketMessage.from_dict(response.json())
+        response_200 = WebSocketMessage.from_dict(jsoncodec.loads(response.content))
 
         return response_200
     if response.status_code == HTTPStatus.BAD_REQUEST:
-        response_400 = WebSocketMessage.from_dict(response.json())
+        response_400 = WebSocketMessage.from_dict(jsoncodec.loads(response.content))
 
         return response_400
     if client.raise_on_unexpected_status:
@@ -55,7 +57,6 @@ def _build_response(
 
 
 def sync_detailed(
-    transport,
     *,
     client: Union[AuthenticatedClient, Client],
     json_body: ImageCreateConfig,
@@ -125,12 +126,33 @@ def sync_detailed(
         )
     )
 
-    client = httpx.Client(base_url=client._base_url, transport=transport)
-    response = client.request(**kwargs)
+    response = client.get_httpx_client().request(**kwargs)
 
     return _build_response(client=client, response=response)
 
 
+@contextmanager
+def stream_detailed(
+    *,
+    client: Union[AuthenticatedClient, Client],
+    json_body: ImageCreateConfig,
+    **kwargs,
+) -> Iterator[httpx.Response]:
+    """
+    Like 'sync_detailed', but yields the 'httpx.Response' before its body is read.
+    Nothing is decoded, so the body can be passed on as it arrives.
+    """
+
+    kwargs.update(
+        _get_kwargs(
+            json_body=json_body,
+        )
+    )
+
+    with client.get_httpx_client().stream(**kwargs) as response:
+        yield response
+
+
 def sync(
     *,
     client: Union[AuthenticatedClient, Client],
@@ -204,6 +226,7 @@ async def asyncio_detailed(
     *,
     client: Union[AuthenticatedClient, Client],
     json_body: ImageCreateConfig,
+    **kwargs,
 ) -> Response[WebSocketMessage]:
     """image create
 
@@ -263,8 +286,10 @@ async def asyncio_detailed(
         Response[WebSocketMessage]
     """
 
-    kwargs = _get_kwargs(
-        json_body=json_body,
+    kwargs.update(
+        _get_kwargs(
+            json_body=json_body,
+        )
     )
 
     response = await client.get_async_httpx_client().request(**kwargs)
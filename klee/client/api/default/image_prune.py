@@ -1,9 +1,11 @@
+from contextlib import contextmanager
 from http import HTTPStatus
-from typing import Any, Dict, List, Optional, Union, cast
+from typing import Any, Dict, Iterator, List, Optional, Union, cast
 
 import httpx
 
 from ... import errors
+from .... import jsoncodec
 from ...client import AuthenticatedClient, Client
 from ...types import UNSET, Response
 
@@ -31,7 +33,7 @@ def _parse_response(
     *, client: Union[AuthenticatedClient, Client], response: httpx.Response
 ) -> Optional[List[str]]:
     if response.status_code == HTTPStatus.OK:
-        response_200 = cast(List[str], response.json())
+        response_200 = cast(List[str], jsoncodec.loads(response.content))
 
         return response_200
     if client.raise_on_unexpected_status:
@@ -52,7 +54,7 @@ def _build_response(
 
 
 def sync_detailed(
-    transport, *, client: Union[AuthenticatedClient, Client], all_: bool, **kwargs
+    *, client: Union[AuthenticatedClient, Client], all_: bool, **kwargs
 ) -> Response[List[str]]:
     """image prune
 
@@ -75,12 +77,30 @@ def sync_detailed(
         )
     )
 
-    client = httpx.Client(base_url=client._base_url, transport=transport)
-    response = client.request(**kwargs)
+    response = client.get_httpx_client().request(**kwargs)
 
     return _build_response(client=client, response=response)
 
 
+@contextmanager
+def stream_detailed(
+    *, client: Union[AuthenticatedClient, Client], all_: bool, **kwargs
+) -> Iterator[httpx.Response]:
+    """
+    Like 'sync_detailed', but yields the 'httpx.Response' before its body is read.
+    Nothing is decoded, so the body can be passed on as it arrives.
+    """
+
+    kwargs.update(
+        _get_kwargs(
+            all_=all_,
+        )
+    )
+
+    with client.get_httpx_client().stream(**kwargs) as response:
+        yield response
+
+
 def sync(
     *,
     client: Union[AuthenticatedClient, Client],
@@ -108,9 +128,7 @@ def sync(
 
 
 async def asyncio_detailed(
-    *,
-    client: Union[AuthenticatedClient, Client],
-    all_: bool,
+    *, client: Union[AuthenticatedClient, Client], all_: bool, **kwargs
 ) -> Response[List[str]]:
     """image prune
 
@@ -127,8 +145,10 @@ async def asyncio_detailed(
         Response[List[str]]
     """
 
-    kwargs = _get_kwargs(
-        all_=all_,
+    kwargs.update(
+        _get_kwargs(
+            all_=all_,
+        )
     )
 
     response = await client.get_async_httpx_client().request(**kwargs)
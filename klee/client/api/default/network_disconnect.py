@@ -1,9 +1,11 @@
+from contextlib import contextmanager
 from http import HTTPStatus
-from typing import Any, Dict, Optional, Union, cast
+from typing import Any, Dict, Iterator, Optional, Union, cast
 
 import httpx
 
 from ... import errors
+from .... import jsoncodec
 from ...client import AuthenticatedClient, Client
 from ...models.error_response import ErrorResponse
 from ...types import Response
@@ -32,11 +34,11 @@ def _parse_response(
         response_204 = cast(Any, None)
         return response_204
     if response.status_code == HTTPStatus.NOT_FOUND:
-        response_404 = ErrorResponse.from_dict(response.json())
+        response_404 = ErrorResponse.from_dict(jsoncodec.loads(response.content))
 
         return response_404
     if response.status_code == HTTPStatus.INTERNAL_SERVER_ERROR:
-        response_500 = ErrorResponse.from_dict(response.json())
+        response_500 = ErrorResponse.from_dict(jsoncodec.loads(response.content))
 
         return response_500
     if client.raise_on_unexpected_status:
@@ -57,7 +59,6 @@ def _build_response(
 
 
 def sync_detailed(
-    transport,
     network_id: str,
     container_id: str,
     *,
@@ -89,12 +90,35 @@ def sync_detailed(
         )
     )
 
-    client = httpx.Client(base_url=client._base_url, transport=transport)
-    response = client.request(**kwargs)
+    response = client.get_httpx_client().request(**kwargs)
 
     return _build_response(client=client, response=response)
 
 
+@contextmanager
+def stream_detailed(
+    network_id: str,
+    container_id: str,
+    *,
+    client: Union[AuthenticatedClient, Client],
+    **kwargs,
+) -> Iterator[httpx.Response]:
+    """
+    Like 'sync_detailed', but yields the 'httpx.Response' before its body is read.
+    Nothing is decoded, so the body can be passed on as it arrives.
+    """
+
+    kwargs.update(
+        _get_kwargs(
+            network_id=network_id,
+            container_id=container_id,
+        )
+    )
+
+    with client.get_httpx_client().stream(**kwargs) as response:
+        yield response
+
+
 def sync(
     network_id: str,
     container_id: str,
@@ -131,6 +155,7 @@ async def asyncio_detailed(
     container_id: str,
     *,
     client: Union[AuthenticatedClient, Client],
+    **kwargs,
 ) -> Response[Union[Any, ErrorResponse]]:
     """network disconnect
 
@@ -150,9 +175,11 @@ async def asyncio_detailed(
         Response[Union[Any, ErrorResponse]]
     """
 
-    kwargs = _get_kwargs(
-        network_id=network_id,
-        container_id=container_id,
+    kwargs.update(
+        _get_kwargs(
+            network_id=network_id,
+            container_id=container_id,
+        )
     )
 
     response = await client.get_async_httpx_client().request(**kwargs)
@@ -1,9 +1,11 @@
+from contextlib import contextmanager
 from http import HTTPStatus
-from typing import Any, Dict, List, Optional, Union, cast
+from typing import Any, Dict, Iterator, List, Optional, Union, cast
 
 import httpx
 
 from ... import errors
+from .... import jsoncodec
 from ...client import AuthenticatedClient, Client
 from ...models.error_response import ErrorResponse
 from ...types import Response
@@ -23,11 +25,11 @@ def _parse_response(
     *, client: Union[AuthenticatedClient, Client], response: httpx.Response
 ) -> Optional[Union[ErrorResponse, List[str]]]:
     if response.status_code == HTTPStatus.OK:
-        response_200 = cast(List[str], response.json())
+        response_200 = cast(List[str], jsoncodec.loads(response.content))
 
         return response_200
     if response.status_code == HTTPStatus.INTERNAL_SERVER_ERROR:
-        response_500 = ErrorResponse.from_dict(response.json())
+        response_500 = ErrorResponse.from_dict(jsoncodec.loads(response.content))
 
         return response_500
     if client.raise_on_unexpected_status:
@@ -48,7 +50,7 @@ def _build_response(
 
 
 def sync_detailed(
-    transport, *, client: Union[AuthenticatedClient, Client], **kwargs
+    *, client: Union[AuthenticatedClient, Client], **kwargs
 ) -> Response[Union[ErrorResponse, List[str]]]:
     """network prune
 
@@ -64,12 +66,26 @@ def sync_detailed(
 
     kwargs.update(_get_kwargs())
 
-    client = httpx.Client(base_url=client._base_url, transport=transport)
-    response = client.request(**kwargs)
+    response = client.get_httpx_client().request(**kwargs)
 
     return _build_response(client=client, response=response)
 
 
+@contextmanager
+def stream_detailed(
+    *, client: Union[AuthenticatedClient, Client], **kwargs
+) -> Iterator[httpx.Response]:
+    """
+    Like 'sync_detailed', but yields the 'httpx.Response' before its body is read.
+    Nothing is decoded, so the body can be passed on as it arrives.
+    """
+
+    kwargs.update(_get_kwargs())
+
+    with client.get_httpx_client().stream(**kwargs) as response:
+        yield response
+
+
 def sync(
     *,
     client: Union[AuthenticatedClient, Client],
@@ -92,8 +108,7 @@ def sync(
 
 
 async def asyncio_detailed(
-    *,
-    client: Union[AuthenticatedClient, Client],
+    *, client: Union[AuthenticatedClient, Client], **kwargs
 ) -> Response[Union[ErrorResponse, List[str]]]:
     """network prune
 
@@ -107,7 +122,7 @@ async def asyncio_detailed(
         Response[Union[ErrorResponse, List[str]]]
     """
 
-    kwargs = _get_kwargs()
+    kwargs.update(_get_kwargs())
 
     response = await client.get_async_httpx_client().request(**kwargs)
 
@@ -1,42 +1,103 @@
 """ Contains all the data models used in inputs/outputs """
 
-from .container import Container
-from .container_config import ContainerConfig
-from .container_config_network_driver import ContainerConfigNetworkDriver
-from .container_config_restart_policy import ContainerConfigRestartPolicy
-from .container_inspect import ContainerInspect
-from .container_network_driver import ContainerNetworkDriver
-from .container_restart_policy import ContainerRestartPolicy
-from .container_summary import ContainerSummary
-from .end_point import EndPoint
-from .end_point_config import EndPointConfig
-from .error_response import ErrorResponse
-from .exec_config import ExecConfig
-from .exec_start_config import ExecStartConfig
-from .id_response import IdResponse
-from .image import Image
-from .image_build_config import ImageBuildConfig
-from .image_build_config_buildargs import ImageBuildConfigBuildargs
-from .image_create_config import ImageCreateConfig
-from .image_create_config_method import ImageCreateConfigMethod
-from .mount_point import MountPoint
-from .mount_point_config import MountPointConfig
-from .mount_point_config_type import MountPointConfigType
-from .mount_point_type import MountPointType
-from .network import Network
-from .network_config import NetworkConfig
-from .network_config_type import NetworkConfigType
-from .network_inspect import NetworkInspect
-from .network_type import NetworkType
-from .published_port import PublishedPort
-from .published_port_config import PublishedPortConfig
-from .published_port_config_protocol import PublishedPortConfigProtocol
-from .published_port_protocol import PublishedPortProtocol
-from .volume import Volume
-from .volume_config import VolumeConfig
-from .volume_inspect import VolumeInspect
-from .web_socket_message import WebSocketMessage
-from .web_socket_message_msg_type import WebSocketMessageMsgType
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .container import Container
+    from .container_config import ContainerConfig
+    from .container_config_network_driver import ContainerConfigNetworkDriver
+    from .container_config_restart_policy import ContainerConfigRestartPolicy
+    from .container_inspect import ContainerInspect
+    from .container_network_driver import ContainerNetworkDriver
+    from .container_restart_policy import ContainerRestartPolicy
+    from .container_summary import ContainerSummary
+    from .end_point import EndPoint
+    from .end_point_config import EndPointConfig
+    from .error_response import ErrorResponse
+    from .exec_config import ExecConfig
+    from .exec_start_config import ExecStartConfig
+    from .id_response import IdResponse
+    from .image import Image
+    from .image_build_config import ImageBuildConfig
+    from .image_build_config_buildargs import ImageBuildConfigBuildargs
+    from .image_create_config import ImageCreateConfig
+    from .image_create_config_method import ImageCreateConfigMethod
+    from .mount_point import MountPoint
+    from .mount_point_config import MountPointConfig
+    from .mount_point_config_type import MountPointConfigType
+    from .mount_point_type import MountPointType
+    from .network import Network
+    from .network_config import NetworkConfig
+    from .network_config_type import NetworkConfigType
+    from .network_inspect import NetworkInspect
+    from .network_type import NetworkType
+    from .published_port import PublishedPort
+    from .published_port_config import PublishedPortConfig
+    from .published_port_config_protocol import PublishedPortConfigProtocol
+    from .published_port_protocol import PublishedPortProtocol
+    from .volume import Volume
+    from .volume_config import VolumeConfig
+    from .volume_inspect import VolumeInspect
+    from .web_socket_message import WebSocketMessage
+    from .web_socket_message_msg_type import WebSocketMessageMsgType
+
+# Model name -> the module defining it. The modules are imported on first access,
+# so decoding a response only loads the models it contains.
+_MODEL_MODULES = {
+    "Container": "container",
+    "ContainerConfig": "container_config",
+    "ContainerConfigNetworkDriver": "container_config_network_driver",
+    "ContainerConfigRestartPolicy": "container_config_restart_policy",
+    "ContainerInspect": "container_inspect",
+    "ContainerNetworkDriver": "container_network_driver",
+    "ContainerRestartPolicy": "container_restart_policy",
+    "ContainerSummary": "container_summary",
+    "EndPoint": "end_point",
+    "EndPointConfig": "end_point_config",
+    "ErrorResponse": "error_response",
+    "ExecConfig": "exec_config",
+    "ExecStartConfig": "exec_start_config",
+    "IdResponse": "id_response",
+    "Image": "image",
+    "ImageBuildConfig": "image_build_config",
+    "ImageBuildConfigBuildargs": "image_build_config_buildargs",
+    "ImageCreateConfig": "image_create_config",
+    "ImageCreateConfigMethod": "image_create_config_method",
+    "MountPoint": "mount_point",
+    "MountPointConfig": "mount_point_config",
+    "MountPointConfigType": "mount_point_config_type",
+    "MountPointType": "mount_point_type",
+    "Network": "network",
+    "NetworkConfig": "network_config",
+    "NetworkConfigType": "network_config_type",
+    "NetworkInspect": "network_inspect",
+    "NetworkType": "network_type",
+    "PublishedPort": "published_port",
+    "PublishedPortConfig": "published_port_config",
+    "PublishedPortConfigProtocol": "published_port_config_protocol",
+    "PublishedPortProtocol": "published_port_protocol",
+    "Volume": "volume",
+    "VolumeConfig": "volume_config",
+    "VolumeInspect": "volume_inspect",
+    "WebSocketMessage": "web_socket_message",
+    "WebSocketMessageMsgType": "web_socket_message_msg_type",
+}
+
+
+def __getattr__(name):
+    if name not in _MODEL_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module = importlib.import_module(f".{_MODEL_MODULES[name]}", __name__)
+    model = getattr(module, name)
+    globals()[name] = model
+    return model
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_MODEL_MODULES))
+
 
 __all__ = (
     "Container",
@@ -1,7 +1,6 @@
 import os
 import sys
 
-import yaml
 import click
 
 
@@ -86,11 +85,15 @@ class ConfigSingleton:
                 with open(filepath, "r", encoding="utf8") as f:
                     data = f.read()
 
-                config = yaml.safe_load(data)
-
             except FileNotFoundError:
                 continue
 
+            # Deferred since it is only needed if a config file exists
+            import yaml
+
+            try:
+                config = yaml.safe_load(data)
+
             except yaml.parser.ParserError:
                 click.echo(f"Error! Could not parse config at {filepath}")
                 continue
@@ -1,10 +1,10 @@
 import ssl
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, contextmanager
 
 from urllib.parse import urlparse
 
+import certifi
 import httpx
-import websockets
 
 from .client.client import Client
 from .printing import echo_bold
@@ -16,6 +16,10 @@ ERROR_TLSKEY_WITH_TLSCERT = (
     "When '--tlscert' is set you must also provide the '--tlskey'"
 )
 
+_client = None
+_async_client = None
+_ssl_contexts = {}
+
 
 def valid_connection_params():
     valid = True
@@ -39,59 +43,156 @@ def request(endpoint, kwargs):
     if not valid_connection_params():
         return
 
-    transport_kwargs = {}
-    if config.host.scheme == "https":
-        # Configuring TLS if it is used
-        if config.tlscacert is not None:
-            verify = config.tlscacert
-        else:
-            verify = config.tlsverify
+    return endpoint(client=get_client(), **kwargs)
+
+
+async def async_request(endpoint, kwargs):
+    """
+    Like 'request' but for the 'asyncio_detailed' variant of an endpoint.
+
+    All coroutines share one 'httpx.AsyncClient', so many requests can be in flight
+    at once from a single event loop.
+    """
+    if not valid_connection_params():
+        return
+
+    return await endpoint(client=get_async_client(), **kwargs)
+
+
+@contextmanager
+def stream_request(endpoint, kwargs):
+    """
+    Like 'request' but for the 'stream_detailed' variant of an endpoint, yielding the
+    'httpx.Response' before its body has been read.
+    """
+    if not valid_connection_params():
+        yield None
+        return
+
+    with endpoint(client=get_client(), **kwargs) as response:
+        yield response
+
+
+def get_client():
+    """
+    The API client shared by every request made in this process.
+
+    It is created on first use and keeps its connections to kleened alive between
+    requests, so a command issuing many requests only connects (and does the TLS
+    handshake) once. Release it with 'close_client'.
+    """
+    global _client  # pylint: disable=global-statement
+
+    if _client is None:
+        url, uds, transport_kwargs = _transport_settings()
+        transport = httpx.HTTPTransport(uds=uds, **transport_kwargs)
+        httpx_client = httpx.Client(base_url=url, transport=transport, timeout=60.0)
+        _client = Client(base_url=url).set_httpx_client(httpx_client)
+
+    return _client
+
+
+def get_async_client():
+    """
+    The asynchronous counterpart of 'get_client', used by 'async_request'.
+
+    An 'httpx.AsyncClient' is bound to the event loop it is first used in, so
+    it must be released with 'close_async_client' before that loop ends.
+    """
+    global _async_client  # pylint: disable=global-statement
+
+    if _async_client is None:
+        url, uds, transport_kwargs = _transport_settings()
+        transport = httpx.AsyncHTTPTransport(uds=uds, **transport_kwargs)
+        httpx_client = httpx.AsyncClient(
+            base_url=url, transport=transport, timeout=60.0
+        )
+        _async_client = Client(base_url=url).set_async_httpx_client(httpx_client)
+
+    return _async_client
 
-        if config.tlscert is not None:
-            cert = (config.tlscert, config.tlskey)
-        else:
-            cert = None
 
-        transport_kwargs.update({"cert": cert, "verify": verify})
+def close_client():
+    global _client  # pylint: disable=global-statement
 
+    if _client is not None:
+        _client.get_httpx_client().close()
+        _client = None
+
+
+async def close_async_client():
+    global _async_client  # pylint: disable=global-statement
+
+    if _async_client is not None:
+        await _async_client.get_async_httpx_client().aclose()
+        _async_client = None
+
+
+def ssl_context():
+    """
+    The TLS context shared by the HTTP clients and every websocket of this process.
+
+    Loading the CA bundle and the client certificate is the expensive part of
+    setting up TLS, so it is done once per TLS configuration rather than once per
+    client or websocket. The server certificate is verified if 'tlsverify' is set
+    or a 'tlscacert' is given, using the CA bundle provided by Certifi unless
+    'tlscacert' is set.
+    """
+    key = (config.tlsverify, config.tlscacert, config.tlscert, config.tlskey)
+    if key not in _ssl_contexts:
+        _ssl_contexts[key] = _create_ssl_context()
+
+    return _ssl_contexts[key]
+
+
+def _create_ssl_context():
+    if config.tlscacert is not None or config.tlsverify:
+        cafile = config.tlscacert if config.tlscacert is not None else certifi.where()
+        tls_ctx = ssl.create_default_context(
+            purpose=ssl.Purpose.SERVER_AUTH, cafile=cafile
+        )
+    else:
+        # Nothing to verify against, so skip loading any CA bundle.
+        tls_ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        tls_ctx.check_hostname = False
+        tls_ctx.verify_mode = ssl.CERT_NONE
+
+    if config.tlscert is not None:
+        tls_ctx.load_cert_chain(config.tlscert, keyfile=config.tlskey)
+
+    return tls_ctx
+
+
+def _transport_settings():
+    """
+    Base url, unix-socket path and TLS settings for the transports of both clients.
+    """
+    if config.host.scheme == "https":
+        transport_kwargs = {"verify": ssl_context()}
     else:
-        transport_kwargs.update({"verify": False})
+        transport_kwargs = {"verify": False}
 
     if config.host.netloc == "":
         # If the connection is to a unix-socket
         url = urlparse(f"{config.host.scheme}://localhost").geturl()
-        transport = httpx.HTTPTransport(uds=config.host.path, **transport_kwargs)
+        uds = config.host.path
     else:
         url = config.host.geturl()
-        transport = httpx.HTTPTransport(**transport_kwargs)
+        uds = None
 
-    # Try to connect to backend
-    client = Client(base_url=url, timeout=60.0)
-    return endpoint(transport, client=client, **kwargs)
+    return url, uds, transport_kwargs
 
 
 @asynccontextmanager
 async def create_websocket(endpoint):
-    cafile = None
+    # Deferred so that commands without websockets do not import it
+    import websockets
+
     tls_ctx = None
     url_scheme = "ws"
     server_hostname = None
     if config.host.scheme == "https":
-        # Configuring TLS if it is used
-        if config.tlscacert is not None:
-            cafile = config.tlscacert
-
-        tls_ctx = ssl.create_default_context(
-            purpose=ssl.Purpose.SERVER_AUTH, cafile=cafile
-        )
-
-        if not config.tlsverify:
-            tls_ctx.check_hostname = False
-            tls_ctx.verify_mode = ssl.CERT_NONE
-
-        if config.tlscert is not None:
-            tls_ctx.load_cert_chain(config.tlscert, keyfile=config.tlskey)
-
+        tls_ctx = ssl_context()
         url_scheme = "wss"
 
     if config.host.netloc == "":
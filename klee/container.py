@@ -1,28 +1,36 @@
 import signal
 import asyncio
 import sys
+import time
 import functools
-import tty
-import termios
-import json
+from contextlib import AsyncExitStack
 
-import websockets
 import click
 
 from .client.api.default.container_create import (
     sync_detailed as container_create_endpoint,
+    asyncio_detailed as container_create_async_endpoint,
+)
+from .client.api.default.container_list import (
+    stream_detailed as container_list_stream_endpoint,
 )
-from .client.api.default.container_list import sync_detailed as container_list_endpoint
 from .client.api.default.container_remove import (
     sync_detailed as container_remove_endpoint,
+    asyncio_detailed as container_remove_async_endpoint,
 )
 from .client.api.default.container_prune import (
     sync_detailed as container_prune_endpoint,
 )
-from .client.api.default.container_stop import sync_detailed as container_stop_endpoint
-from .client.api.default.exec_create import sync_detailed as exec_create_endpoint
+from .client.api.default.container_stop import (
+    sync_detailed as container_stop_endpoint,
+    asyncio_detailed as container_stop_async_endpoint,
+)
+from .client.api.default.exec_create import (
+    sync_detailed as exec_create_endpoint,
+    asyncio_detailed as exec_create_async_endpoint,
+)
 from .client.api.default.container_inspect import (
-    sync_detailed as container_inspect_endpoint,
+    stream_detailed as container_inspect_stream_endpoint,
 )
 from .client.api.default.container_update import (
     sync_detailed as container_update_endpoint,
@@ -30,8 +38,9 @@ from .client.api.default.container_update import (
 
 from .client.models.container_config import ContainerConfig
 from .client.models.exec_config import ExecConfig
-from .network import _connect
+from .network import _connect, _async_connect
 from .printing import (
+    echo,
     echo_bold,
     echo_error,
     command_cls,
@@ -47,23 +56,67 @@ from .printing import (
     unexpected_error,
 )
 from .name_generator import random_name
-from .connection import create_websocket
+from . import jsoncodec
+from .connection import create_websocket, async_request, close_async_client
 from .utils import (
+    _exit_on_connection_errors,
     human_duration,
     request_and_print_response,
-    listen_for_messages,
+    async_request_and_print_response,
+    stream_and_print_response,
     decode_mount,
     decode_public_ports,
 )
 from .prune import prune_command
 from .inspect import inspect_command
-from .options import container_create_options, exec_options
+from .listing import listing_printer
+from .rowviews import ContainerSummaryView
+from .parallel import (
+    DEFAULT_PARALLEL,
+    run_parallel,
+    request_operation,
+    response_outcome,
+)
+from .timing import PhaseTimer
+from .streaming import OutputStats, relay_output, pump_input, raw_terminal
+from .batch import read_batch, run_batch
+from .multiplex import (
+    ERROR_ATTACH_SEVERAL,
+    ERROR_NO_CONTAINERS_SELECTED,
+    run_multiplexed,
+    select_containers,
+)
+from .sync import container_sync
+from .transfer import container_cp
+from .options import (
+    container_create_options,
+    exec_options,
+    listing_options,
+    parallel_options,
+    selection_options,
+)
 
 HELP_PUBLISH_FLAG = """
 Publish ports using the syntax **HOST_PORT[:CONTAINER_PORT][/PROTOCOL]** or
 **INTERFACE:HOST_PORT:CONTAINER_PORT[/PROTOCOL]**.
 **CONTAINER_PORT** defaults to **HOST_PORT** and **PROTOCOL** defaults to 'tcp'.
 """
+HELP_CONTAINER_FLAG = """
+Run the command in this container. Can be repeated, and combined with `--all` and
+`--filter`. With several containers, COMMAND is given without a CONTAINER and each
+line of output is prefixed with the name of its container.
+"""
+HELP_BATCH_FLAG = """
+Run the commands in **FILE** (or STDIN if it is '-'), one per line, in a single shell
+session in CONTAINER, reporting the output and exit code of each. COMMAND is not
+given then.
+"""
+HELP_EXEC_PARALLEL_FLAG = (
+    "With several containers, run the command in at most **N** of them at a time."
+)
+HELP_STATS_FLAG = (
+    "Print the amount and throughput of the output to STDERR when the command exits."
+)
 
 WS_EXEC_START_ENDPOINT = "/exec/start"
 
@@ -73,8 +126,19 @@ EXEC_INSTANCE_CREATE_ERROR = (
 )
 EXEC_START_ERROR = "error starting container"
 
-START_ONLY_ONE_CONTAINER_WHEN_ATTACHED = (
-    "only one container can be started when attaching to container I/O."
+# Sent at the end of piped input to a process with a TTY
+EOT = b"\x04"
+
+ERROR_BATCH_OPTIONS = (
+    "a batch runs in a single container, attached, without input, a TTY or COMMAND"
+)
+ERROR_DETACH_SEVERAL = "a command can only be run detached in a single container"
+ERROR_OPTION_AFTER_CONTAINER = (
+    "'{option}' is part of COMMAND, options must be given before CONTAINER"
+)
+# Without a TTY, the process cannot be told that its input has ended
+ERROR_INPUT_WITHOUT_TTY = (
+    "input that is not a terminal can only be attached with --tty, e.g., '-it'"
 )
 
 CONTAINER_LIST_COLUMNS = [
@@ -137,12 +201,20 @@ def container_list(name, hidden=False):
     )
     def listing(**kwargs):
         """List containers"""
-        request_and_print_response(
-            container_list_endpoint,
+        printer = listing_printer(
+            _print_container,
+            ContainerSummaryView,
+            "id",
+            kwargs["quiet"],
+            kwargs["output_format"],
+        )
+        stream_and_print_response(
+            container_list_stream_endpoint,
             kwargs={"all_": kwargs["all"]},
-            statuscode2printer={200: _print_container, 500: print_backend_error},
+            statuscode2printer={200: printer, 500: print_backend_error},
         )
 
+    listing = listing_options(listing)
     return listing
 
 
@@ -157,8 +229,13 @@ def container_remove(name, hidden=False):
         help="Stop containers before removing them.",
     )
     @click.argument("containers", required=True, nargs=-1)
-    def remove(force, containers):
+    def remove(force, containers, parallel, unordered):
         """Remove one or more containers"""
+        if parallel is not None:
+            operation = functools.partial(_remove_container, force=force)
+            exit_code = run_parallel(containers, operation, parallel, not unordered)
+            sys.exit(exit_code)
+
         for container_id in containers:
             if force:
                 _stop([container_id], silent=True)
@@ -177,20 +254,37 @@ def container_remove(name, hidden=False):
                 sys.exit(1)
                 break
 
+    remove = parallel_options(remove)
     return remove
 
 
 def container_start(name, hidden=False):
 
     @click.command(cls=command_cls(), name=name, hidden=hidden, no_args_is_help=True)
-    def start(detach, interactive, tty, containers):
+    def start(detach, interactive, tty, parallel, all_, filters, containers):
         """Start one or more stopped containers.
-        Attach only if a single container is started
+        The output of several attached containers is prefixed with their names
         """
-        _start(detach, interactive, tty, containers)
+        if all_ or filters:
+            containers = select_containers(containers, all_, filters, running=False)
+
+        _start(detach, interactive, tty, containers, parallel)
 
     start = exec_options(start)
-    start.params.append(click.Argument(["containers"], required=True, nargs=-1))
+    start.params.extend(
+        [
+            click.Option(
+                ["--parallel"],
+                default=DEFAULT_PARALLEL,
+                show_default=True,
+                type=click.IntRange(min=1),
+                metavar="N",
+                help="When starting several containers, start at most **N** of them at a time.",
+            ),
+            click.Argument(["containers"], nargs=-1),
+        ]
+    )
+    start = selection_options(start, "stopped")
     return start
 
 
@@ -198,10 +292,16 @@ def container_stop(name, hidden=False):
 
     @click.command(cls=command_cls(), name=name, hidden=hidden, no_args_is_help=True)
     @click.argument("containers", nargs=-1)
-    def stop(containers):
+    def stop(containers, parallel, unordered):
         """Stop one or more running containers"""
+        if parallel is not None:
+            operation = request_operation(container_stop_async_endpoint, "container_id")
+            exit_code = run_parallel(containers, operation, parallel, not unordered)
+            sys.exit(exit_code)
+
         _stop(containers)
 
+    stop = parallel_options(stop)
     return stop
 
 
@@ -209,8 +309,14 @@ def container_restart(name, hidden=False):
 
     @click.command(cls=command_cls(), name=name, hidden=hidden, no_args_is_help=True)
     @click.argument("containers", nargs=-1)
-    def restart(containers):
+    def restart(containers, parallel, unordered):
         """Restart one or more containers"""
+        if parallel is not None:
+            exit_code = run_parallel(
+                containers, _restart_container, parallel, not unordered
+            )
+            sys.exit(exit_code)
+
         for container_id in containers:
             response = request_and_print_response(
                 container_stop_endpoint,
@@ -233,6 +339,7 @@ def container_restart(name, hidden=False):
                 start_container="true",
             )
 
+    restart = parallel_options(restart)
     return restart
 
 
@@ -244,16 +351,85 @@ def container_exec(name, hidden=False):
         hidden=hidden,
         no_args_is_help=True,
         # We use this to avoid problems option-parts of the "command" argument, i.e., 'klee container exec -a /bin/sh -c echo lol
-        context_settings={"ignore_unknown_options": True},
+        # Options after CONTAINER belong to the command, e.g., the '-c' of 'sh -c'
+        context_settings={
+            "ignore_unknown_options": True,
+            "allow_interspersed_args": False,
+        },
     )
-    def exec_(detach, interactive, tty, env, user, container, command):
+    def exec_(
+        detach,
+        interactive,
+        tty,
+        env,
+        user,
+        stats,
+        containers,
+        parallel,
+        all_,
+        filters,
+        batch,
+        container,
+        command,
+    ):
         """
-        Run a command in a container
+        Run a command in one or more containers
         """
+        if batch is not None:
+            if containers or all_ or filters or command or detach or interactive or tty:
+                echo_error(ERROR_BATCH_OPTIONS)
+                sys.exit(1)
+
+            if container is None:
+                echo_error(ERROR_NO_CONTAINERS_SELECTED)
+                sys.exit(1)
+
+            with _exit_on_connection_errors():
+                exit_code = run_batch(container, read_batch(batch), env, user)
+            sys.exit(exit_code)
+
+        if containers or all_ or filters:
+            # CONTAINER is the first part of the command when the containers are
+            # selected with options
+            command = (container, *command) if container is not None else command
+
+        if command and command[0].startswith("-"):
+            # E.g., 'klee exec db -e A=1 env', which no executable could run
+            echo_error(ERROR_OPTION_AFTER_CONTAINER.format(option=command[0]))
+            sys.exit(1)
+
+        if containers or all_ or filters:
+            containers = select_containers(containers, all_, filters, running=True)
+            if detach:
+                echo_error(ERROR_DETACH_SEVERAL)
+                sys.exit(1)
+
+            if interactive or tty:
+                echo_error(ERROR_ATTACH_SEVERAL)
+                sys.exit(1)
+
+            sys.exit(run_multiplexed(containers, command, parallel, env, user))
+
+        if container is None:
+            echo_error(ERROR_NO_CONTAINERS_SELECTED)
+            sys.exit(1)
+
+        _exit_if_input_would_not_end(interactive and not detach, tty)
         start_container = "true"
+        output_stats = OutputStats() if stats else None
         _execution_create_and_start(
-            container, tty, interactive, detach, start_container, command, env, user
+            container,
+            tty,
+            interactive,
+            detach,
+            start_container,
+            command,
+            env,
+            user,
+            output_stats,
         )
+        if output_stats is not None and output_stats.finished is not None:
+            output_stats.print_stats()
 
     exec_ = exec_options(exec_)
     exec_.params.extend(
@@ -270,11 +446,39 @@ def container_exec(name, hidden=False):
                 default="",
                 help="Username or UID of the user running the process",
             ),
-            click.Argument(["container"], nargs=1),
+            click.Option(
+                ["--stats"],
+                default=False,
+                is_flag=True,
+                metavar="flag",
+                help=HELP_STATS_FLAG,
+            ),
+            click.Option(
+                ["--container", "-c", "containers"],
+                multiple=True,
+                metavar="container",
+                help=HELP_CONTAINER_FLAG,
+            ),
+            click.Option(
+                ["--parallel"],
+                default=DEFAULT_PARALLEL,
+                show_default=True,
+                type=click.IntRange(min=1),
+                metavar="N",
+                help=HELP_EXEC_PARALLEL_FLAG,
+            ),
+            click.Option(
+                ["--batch"],
+                default=None,
+                type=click.File("r"),
+                metavar="FILE",
+                help=HELP_BATCH_FLAG,
+            ),
+            click.Argument(["container"], required=False, nargs=1),
             click.Argument(["command"], nargs=-1),
         ]
     )
-
+    exec_ = selection_options(exec_, "running")
     return exec_
 
 
@@ -401,19 +605,30 @@ def container_run(name, hidden=False):
             "interactive": kwargs.pop("interactive"),
             "tty": kwargs.pop("tty"),
         }
+        _exit_if_input_would_not_end(kwargs_start["interactive"], kwargs_start["tty"])
+        timer = PhaseTimer()
+        timings = kwargs.pop("timings")
+        output_stats = OutputStats()
 
-        container_id = _create_container_and_connect_to_network(**kwargs)
-        if container_id is None:
-            return
+        asyncio.run(_run(kwargs, timer=timer, stats=output_stats, **kwargs_start))
 
-        kwargs_start["containers"] = [container_id]
-        _start(**kwargs_start)
+        if timings:
+            timer.print_timings()
+            if output_stats.finished is not None:
+                output_stats.print_stats()
 
     run.params.extend(container_create_options())
     run = exec_options(run)
     opts_args = [
         click.Option(["--name"], default=None, help="Assign a name to the container"),
         click.Option(["--publish", "-p"], multiple=True, help=HELP_PUBLISH_FLAG),
+        click.Option(
+            ["--timings"],
+            default=False,
+            is_flag=True,
+            metavar="flag",
+            help="Print how much time was spent in each phase of running the container, and the throughput of its output.",
+        ),
         click.Argument(["image"], nargs=1),
         click.Argument(["command"], nargs=-1),
     ]
@@ -428,7 +643,7 @@ def container_inspect(name, hidden=False):
         argument="container",
         id_var="container_id",
         docs="Display detailed information on a container.",
-        endpoint=container_inspect_endpoint,
+        endpoint=container_inspect_stream_endpoint,
     )
 
 
@@ -451,9 +666,103 @@ root.add_command(container_exec("exec"), name="exec")
 root.add_command(container_update("update"), name="update")
 root.add_command(container_rename("rename"), name="rename")
 root.add_command(container_run("run"), name="run")
+root.add_command(container_cp("cp"), name="cp")
+root.add_command(container_sync("sync"), name="sync")
+
+
+CONTAINER_CREATE_PRINTERS = {
+    201: print_response_id,
+    404: print_nothing,
+    500: print_nothing,
+}
 
 
 def _create_container_and_connect_to_network(**kwargs):
+    container_config = _container_config(kwargs)
+
+    # Create container
+    response = request_and_print_response(
+        container_create_endpoint,
+        kwargs={"json_body": container_config},
+        statuscode2printer=CONTAINER_CREATE_PRINTERS,
+    )
+    container_id = _created_container_id(response)
+
+    if kwargs["network"] is None:
+        return container_id
+
+    # Connect to network,
+    response = _connect(**_connect_kwargs(kwargs, container_id))
+    _exit_if_not_connected(response)
+
+    return container_id
+
+
+async def _run(kwargs, detach, interactive, tty, timer, stats):
+    """
+    'container run' as a pipeline on the shared async client: the /exec/start
+    websocket (TLS and websocket handshakes) is opened while the container and
+    its execution instance are being created, and the configuration is sent
+    once the execution instance exists.
+    """
+    if interactive:
+        detach = False
+
+    container_config = _container_config(kwargs)
+
+    async with AsyncExitStack() as stack:
+        websocket_task = asyncio.ensure_future(_open_exec_websocket(stack, timer))
+        # Let the handshake get going before the HTTP client is set up
+        await asyncio.sleep(0)
+        try:
+            with timer.phase("container create"):
+                response = await async_request_and_print_response(
+                    container_create_async_endpoint,
+                    kwargs={"json_body": container_config},
+                    statuscode2printer=CONTAINER_CREATE_PRINTERS,
+                )
+            container_id = _created_container_id(response)
+
+            if kwargs["network"] is not None:
+                with timer.phase("network connect"):
+                    response = await _async_connect(
+                        **_connect_kwargs(kwargs, container_id)
+                    )
+                _exit_if_not_connected(response)
+
+            with timer.phase("exec create"):
+                exec_id = await _async_create_exec_instance(container_id, tty)
+
+            if exec_id is None:
+                return
+
+            with timer.phase("websocket wait"):
+                websocket = await websocket_task
+
+        finally:
+            if websocket_task.done() and not websocket_task.cancelled():
+                # Mark a failed handshake as seen if an HTTP request failed first
+                websocket_task.exception()
+            websocket_task.cancel()
+            await close_async_client()
+
+        exec_config = jsoncodec.dumps(
+            {"exec_id": exec_id, "attach": not detach, "start_container": True}
+        )
+        with timer.phase("execution"):
+            if detach:
+                if not await _execute_on(websocket, exec_config):
+                    echo_bold(EXEC_START_ERROR)
+            else:
+                await _attach(websocket, exec_config, interactive, tty, stats)
+
+
+async def _open_exec_websocket(stack, timer):
+    with timer.phase("websocket handshake"):
+        return await stack.enter_async_context(create_websocket(WS_EXEC_START_ENDPOINT))
+
+
+def _container_config(kwargs):
     if kwargs["network"] is None and kwargs["driver"] is None:
         kwargs["driver"] = "host"
 
@@ -477,51 +786,40 @@ def _create_container_and_connect_to_network(**kwargs):
     }
 
     try:
-        container_config = ContainerConfig.from_dict(container_config)
+        return ContainerConfig.from_dict(container_config)
     except ValueError as error_msg:
         echo_bold(
             f"[red]Error![/red] Could not validate container configuration: {error_msg}"
         )
         sys.exit(1)
 
-    # Create container
-    response = request_and_print_response(
-        container_create_endpoint,
-        kwargs={"json_body": container_config},
-        statuscode2printer={
-            201: print_response_id,
-            404: print_nothing,
-            500: print_nothing,
-        },
-    )
 
+def _created_container_id(response):
     if response is None or response.status_code != 201:
         if response is not None:
             echo_error(f"could not create container: {response.parsed.message}")
             sys.exit(1)
 
-    container_id = response.parsed.id
+    return response.parsed.id
 
-    if kwargs["network"] is None:
-        return container_id
 
-    # Connect to network,
-    kwargs_connect = {
+def _connect_kwargs(kwargs, container_id):
+    return {
         "ip": kwargs["ip"],
         "ip6": kwargs["ip6"],
         "network": kwargs["network"],
         "container": container_id,
     }
-    response = _connect(**kwargs_connect)
+
+
+def _exit_if_not_connected(response):
     if response is None or response.status_code != 204:
         echo_error(f"could not connect container: {response.parsed.message}")
         sys.exit(1)
 
-    return container_id
-
 
-def _print_container(response):
-    containers = response.parsed
+def _print_container(containers):
+    now = time.time()
 
     def command_json2command_human(command):
         if command is None:
@@ -529,30 +827,46 @@ def _print_container(response):
 
         return " ".join(command)
 
-    containers = [
+    containers = (
         [
             c.id,
             c.name,
             print_image_column(c.image_name, c.image_tag, c.image_id),
             command_json2command_human(c.cmd),
-            human_duration(c.created) + " ago",
+            human_duration(c.created, now) + " ago",
             "[b]yes[/b]" if c.restart_policy == "on-startup" else "no",
             is_running_str(c.running),
             "" if c.jid is None else str(c.jid),
         ]
         for c in containers
-    ]
+    )
 
     print_table(containers, CONTAINER_LIST_COLUMNS)
 
 
-def _start(detach, interactive, tty, containers):
+def _start(detach, interactive, tty, containers, parallel=DEFAULT_PARALLEL):
     if interactive:
         detach = False
 
-    if not detach and len(containers) != 1:
-        echo_bold(START_ONLY_ONE_CONTAINER_WHEN_ATTACHED)
+    if not containers:
+        echo_error(ERROR_NO_CONTAINERS_SELECTED)
+        sys.exit(1)
+
+    if not detach and len(containers) > 1:
+        if interactive or tty:
+            echo_error(ERROR_ATTACH_SEVERAL)
+            sys.exit(1)
+
+        # Attached to each container's own command, with prefixed output
+        sys.exit(run_multiplexed(containers, parallel=parallel))
+    elif len(containers) > 1:
+        # Every execution instance is created right away, whereas the websockets
+        # starting them are limited to 'parallel' at a time.
+        operation = _detached_start_operation(tty, parallel)
+        exit_code = run_parallel(containers, operation, len(containers), ordered=False)
+        sys.exit(exit_code)
     else:
+        _exit_if_input_would_not_end(interactive, tty)
         for container in containers:
             start_container = True
             _execution_create_and_start(
@@ -560,6 +874,14 @@ def _start(detach, interactive, tty, containers):
             )
 
 
+def _exit_if_input_would_not_end(interactive, tty):
+    # With a TTY, piped input is ended with '^D'. Without one, the process would
+    # wait for more input, and klee for the process, forever.
+    if interactive and not tty and not sys.stdin.isatty():
+        echo_error(ERROR_INPUT_WITHOUT_TTY)
+        sys.exit(1)
+
+
 def _stop(containers, silent=False):
 
     def silent_(_):
@@ -585,24 +907,103 @@ def _stop(containers, silent=False):
             break
 
 
+async def _remove_container(container_id, force):
+    if force:
+        # A failure to stop is reported by the removal itself
+        await async_request(
+            container_stop_async_endpoint, {"container_id": container_id}
+        )
+
+    response = await async_request(
+        container_remove_async_endpoint, {"container_id": container_id}
+    )
+    return response_outcome(response)
+
+
+async def _restart_container(container_id):
+    response = await async_request(
+        container_stop_async_endpoint, {"container_id": container_id}
+    )
+    stopped, message = response_outcome(response)
+    if not stopped:
+        return stopped, message
+
+    return await _start_detached(response.parsed.id, tty=False)
+
+
+def _detached_start_operation(tty, parallel):
+    websocket_slots = None
+
+    async def operation(container_id):
+        nonlocal websocket_slots
+        if websocket_slots is None:
+            # Created here rather than above, so it belongs to the running event loop
+            websocket_slots = asyncio.Semaphore(parallel)
+
+        return await _start_detached(container_id, tty, websocket_slots)
+
+    return operation
+
+
+async def _start_detached(container_id, tty, websocket_slots=None):
+    exec_config = ExecConfig.from_dict(
+        {"container_id": container_id, "cmd": [], "env": [], "user": "", "tty": tty}
+    )
+    response = await async_request(
+        exec_create_async_endpoint, {"json_body": exec_config}
+    )
+    created, message = response_outcome(response, success=201)
+    if not created:
+        return created, message
+
+    exec_config = jsoncodec.dumps(
+        {"exec_id": response.parsed.id, "attach": False, "start_container": True}
+    )
+    if websocket_slots is None:
+        started = await _execute_detached(exec_config)
+    else:
+        async with websocket_slots:
+            started = await _execute_detached(exec_config)
+
+    if started:
+        return True, container_id
+
+    return False, EXEC_START_ERROR
+
+
 def _execution_create_and_start(
-    container_id, tty, interactive, detach, start_container, cmd=None, env=None, user=""
+    container_id,
+    tty,
+    interactive,
+    detach,
+    start_container,
+    cmd=None,
+    env=None,
+    user="",
+    stats=None,
 ):
     cmd = [] if cmd is None else cmd
     env = [] if env is None else env
     attach = not detach
     exec_id = _create_exec_instance(container_id, tty, cmd, env, user)
     if exec_id is not None:
-        exec_config = json.dumps(
+        exec_config = jsoncodec.dumps(
             {"exec_id": exec_id, "attach": attach, "start_container": start_container}
         )
 
         if attach:
-            asyncio.run(_attached_execute(exec_config, interactive))
+            asyncio.run(_attached_execute(exec_config, interactive, tty, stats))
         else:
             asyncio.run(_execute(exec_config))
 
 
+EXEC_CREATE_PRINTERS = {
+    201: print_nothing,
+    404: print_response_msg,
+    500: print_backend_error,
+}
+
+
 def _create_exec_instance(container_id, tty, cmd, env, user):
     exec_config = ExecConfig.from_dict(
         {"container_id": container_id, "cmd": cmd, "env": env, "user": user, "tty": tty}
@@ -610,12 +1011,30 @@ def _create_exec_instance(container_id, tty, cmd, env, user):
     response = request_and_print_response(
         exec_create_endpoint,
         kwargs={"json_body": exec_config},
-        statuscode2printer={
-            201: print_nothing,
-            404: print_response_msg,
-            500: print_backend_error,
-        },
+        statuscode2printer=EXEC_CREATE_PRINTERS,
+    )
+    return _exec_instance_id(response, container_id)
+
+
+async def _async_create_exec_instance(container_id, tty, cmd=(), env=(), user=""):
+    exec_config = ExecConfig.from_dict(
+        {
+            "container_id": container_id,
+            "cmd": list(cmd),
+            "env": list(env),
+            "user": user,
+            "tty": tty,
+        }
+    )
+    response = await async_request_and_print_response(
+        exec_create_async_endpoint,
+        kwargs={"json_body": exec_config},
+        statuscode2printer=EXEC_CREATE_PRINTERS,
     )
+    return _exec_instance_id(response, container_id)
+
+
+def _exec_instance_id(response, container_id):
     if response.status_code == 201:
         echo_bold(EXEC_INSTANCE_CREATED.format(exec_id=response.parsed.id))
         return response.parsed.id
@@ -629,58 +1048,76 @@ def _create_exec_instance(container_id, tty, cmd, env, user):
 
 
 async def _execute(config):
+    if not await _execute_detached(config):
+        echo_bold(EXEC_START_ERROR)
+
+
+async def _execute_detached(config):
     async with create_websocket(WS_EXEC_START_ENDPOINT) as websocket:
-        await websocket.send(config)
-        await websocket.wait_closed()
-        if websocket.close_code != 1001:
-            echo_bold(EXEC_START_ERROR)
+        return await _execute_on(websocket, config)
 
 
-async def _attached_execute(config, interactive):
-    loop = asyncio.get_running_loop()
-    try:
-        async with create_websocket(WS_EXEC_START_ENDPOINT) as websocket:
-            if interactive:
-                for signame in ["SIGINT", "SIGTERM"]:
-                    loop.add_signal_handler(
-                        getattr(signal, signame),
-                        functools.partial(_close_websocket, websocket),
-                    )
+async def _execute_on(websocket, config):
+    await websocket.send(config)
+    await websocket.wait_closed()
+    return websocket.close_code == 1001
+
 
-            await websocket.send(config)
-            starting_frame = await websocket.recv()
-            start_msg = json.loads(starting_frame)
+async def _attached_execute(config, interactive, tty=False, stats=None):
+    async with create_websocket(WS_EXEC_START_ENDPOINT) as websocket:
+        await _attach(websocket, config, interactive, tty, stats)
+
+
+async def _attach(websocket, config, interactive, tty=False, stats=None):
+    from websockets.exceptions import ConnectionClosedError
 
-            if start_msg["msg_type"] == "starting":
-                if interactive:
-                    loop = asyncio.get_event_loop()
-                    # The data from stdin should be available immediately:
-                    tty.setraw(sys.stdin.fileno(), when=termios.TCSANOW)
-                    loop.add_reader(sys.stdin.fileno(), _send_user_input, websocket)
-                closing_message = await listen_for_messages(websocket)
-                if closing_message["data"] == "":
-                    print_websocket_closing(closing_message, ["message"])
+    loop = asyncio.get_running_loop()
+    try:
+        if interactive:
+            for signame in ["SIGINT", "SIGTERM"]:
+                loop.add_signal_handler(
+                    getattr(signal, signame),
+                    functools.partial(_close_websocket, websocket),
+                )
 
-                else:
-                    print_websocket_closing(closing_message, ["message", "data"])
+        await websocket.send(config)
+        starting_frame = await websocket.recv()
+        start_msg = jsoncodec.loads(starting_frame)
 
-            elif start_msg["msg_type"] == "error":
+        if start_msg["msg_type"] == "starting":
+            closing_message = await _relay(websocket, interactive, tty, stats)
+            echo("")
+            if closing_message["data"] == "":
                 print_websocket_closing(closing_message, ["message"])
 
             else:
-                unexpected_error()
+                print_websocket_closing(closing_message, ["message", "data"])
+
+        elif start_msg["msg_type"] == "error":
+            print_websocket_closing(closing_message, ["message"])
 
-    except websockets.exceptions.ConnectionClosedError as e:
+        else:
+            unexpected_error()
+
+    except ConnectionClosedError as e:
         echo_error(
             f"Kleened returned an error with error code {e.code} and reason #{e.reason}"
         )
 
 
-def _send_user_input(websocket):
-    tasks = []
-    input_line = sys.stdin.buffer.read(1)
-    task = asyncio.ensure_future(websocket.send(input_line))
-    tasks.append(task)
+async def _relay(websocket, interactive, tty, stats):
+    if not interactive:
+        return await relay_output(websocket, stats=stats)
+
+    # With a TTY, ending piped input with ^D (EOT) lets the pseudo-TTY of the
+    # process signal end of input. Without one, the protocol has no way to.
+    eof_frame = EOT if tty else None
+    with raw_terminal():
+        input_task = asyncio.ensure_future(pump_input(websocket, eof_frame=eof_frame))
+        try:
+            return await relay_output(websocket, stats=stats)
+        finally:
+            input_task.cancel()
 
 
 def _close_websocket(websocket):
@@ -42,6 +42,10 @@ class DocsCommand(click.Command):
 def _commands(self, ctx):
     cnames = []
     clinks = []
+    # Load any lazily imported subcommands, see 'lazy_group_cls' in 'root.py'
+    for subcommand in self.list_commands(ctx):
+        self.get_command(ctx, subcommand)
+
     for subcommand, cmd in self.commands.items():
         # What is this, the tool lied about a command. Ignore it
         if cmd is None:
@@ -1,19 +1,29 @@
-import json
 import asyncio
 import os
 import sys
+import time
+from collections import namedtuple
 
 import click
-import websockets
 
-from .client.api.default.image_list import sync_detailed as image_list_endpoint
-from .client.api.default.image_remove import sync_detailed as image_remove_endpoint
+from .client.api.default.image_list import (
+    sync_detailed as image_list_endpoint,
+    stream_detailed as image_list_stream_endpoint,
+)
+from .client.api.default.image_remove import (
+    sync_detailed as image_remove_endpoint,
+    asyncio_detailed as image_remove_async_endpoint,
+)
 from .client.api.default.image_tag import sync_detailed as image_tag_endpoint
-from .client.api.default.image_inspect import sync_detailed as image_inspect_endpoint
+from .client.api.default.image_inspect import (
+    sync_detailed as image_inspect_endpoint,
+    stream_detailed as image_inspect_stream_endpoint,
+)
 from .client.api.default.image_prune import sync_detailed as image_prune_endpoint
 from .client.models.end_point_config import EndPointConfig
 
-from .connection import create_websocket
+from . import jsoncodec
+from .connection import create_websocket, request
 from .printing import (
     echo,
     echo_bold,
@@ -26,19 +36,26 @@ from .printing import (
     print_response_id,
     print_backend_error,
     print_id_list,
+    print_nothing,
     connection_closed_unexpectedly,
     unexpected_error,
 )
 from .inspect import inspect_command
+from .listing import listing_printer
+from .rowviews import ImageView
+from .parallel import DEFAULT_PARALLEL, run_parallel, request_operation
 from .utils import (
+    _exit_on_connection_errors,
     human_duration,
+    image_reference,
     listen_for_messages,
     request_and_print_response,
+    stream_and_print_response,
     decode_mount,
 )
-from .options import container_create_options
+from .options import container_create_options, listing_options, parallel_options
+from .watch import DEFAULT_INTERVAL, snapshot, wait_for_change, wait_until_settled
 
-WS_IMAGE_BUILD_ENDPOINT = "/images/build"
 WS_IMAGE_CREATE_ENDPOINT = "/images/create"
 
 IMAGE_LIST_COLUMNS = [
@@ -48,9 +65,56 @@ IMAGE_LIST_COLUMNS = [
     ("CREATED", {"style": "bright_white"}),
 ]
 
+# The outcome of a build: the ID of the image, which is also set for builds that
+# failed after they started, and the most recent snapshot of a failed build
+BuildResult = namedtuple("BuildResult", ["succeeded", "image_id", "snapshot"])
+
 BUILD_START_MESSAGE = "Started to build image with ID {image_id}"
 BUILD_FAILED = "Failed to build image {image_id}. Most recent snapshot is {snapshot}"
 
+HELP_CACHE_FROM_FLAG = """
+Continue the build from the snapshot of an existing image sharing the longest
+prefix of instructions with the Dockerfile. 'auto' considers every image, otherwise
+only the image **IMAGE** is.
+"""
+
+CACHE_STEP_REUSED = "Step {step}/{total} : {instruction} (cached)"
+CACHE_CONTINUING = "Continuing from snapshot {image_id}@{snapshot}"
+CACHE_NO_MATCH = "No cached snapshot matches the Dockerfile, building all steps"
+CACHE_UNAVAILABLE = "Building all steps, the cached build is not possible: {reason}"
+ERROR_CACHE_FROM_WITH_FROM = "--cache-from cannot be used together with --from"
+
+HELP_GRAPH_FLAG = """
+Build the images described in the YAML file **FILE** instead of **PATH**, each as soon
+as the images it is built from are. See the documentation for the format.
+"""
+HELP_GRAPH_PARALLEL_FLAG = f"With `--graph`, run at most **N** builds at a time.  [default: {DEFAULT_PARALLEL}]"
+ERROR_GRAPH_OPTIONS = (
+    "--graph cannot be used together with PATH, --cache-from, --file, --from, --tag"
+    " or --skip-unchanged"
+)
+ERROR_PARALLEL_WITHOUT_GRAPH = "--parallel can only be used together with --graph"
+ERROR_NO_PATH = "either PATH or --graph is required"
+
+HELP_WATCH_FLAG = """
+Keep running and build the image again whenever files in **PATH** have changed. A
+rebuild continues from the most recent snapshot of the build before it that is still
+valid.
+"""
+HELP_INTERVAL_FLAG = "Seconds between checks of **PATH** for changes with `--watch`."
+BUILD_WATCHING = "Watching {path} for changes"
+BUILD_CHANGED = "Files in {path} changed, building again"
+ERROR_WATCH_OPTIONS = "--watch cannot be used together with --graph or --skip-unchanged"
+
+HELP_SKIP_UNCHANGED_FLAG = """
+Skip the build if the context, the Dockerfile and the options are the same as for
+an earlier build whose image still exists, and print the ID of that image instead.
+"""
+BUILD_UNCHANGED = "Nothing changed since image {image_id} was built, skipping the build"
+DIGEST_UNAVAILABLE = "Unable to compute the digest of the build: {reason}"
+
+DEFAULT_HISTORY_RUNS = 10
+
 
 # pylint: disable=unused-argument
 @click.group(cls=group_cls())
@@ -141,7 +205,53 @@ def image_build(name, hidden=False):
         Note that `user` and `env` options will be overwritten by the 'USER' and 'ENV'
         Dockerfile instructions, respectively.
         """
-        asyncio.run(_build_image_and_listen_for_messages(**kwargs))
+        from .builddigest import record_digest
+        from .buildcache import record_base_image
+
+        graph = kwargs.pop("graph")
+        parallel = kwargs.pop("parallel")
+        cache_from = kwargs.pop("cache_from")
+        skip_unchanged = kwargs.pop("skip_unchanged")
+        watch = kwargs.pop("watch")
+        interval = kwargs.pop("interval")
+        if watch and (graph is not None or skip_unchanged):
+            echo_error(ERROR_WATCH_OPTIONS)
+            sys.exit(1)
+
+        if graph is not None:
+            _build_graph(graph, parallel, cache_from, skip_unchanged, kwargs)
+            return
+
+        if parallel is not None:
+            echo_error(ERROR_PARALLEL_WITHOUT_GRAPH)
+            sys.exit(1)
+
+        if kwargs["path"] is None:
+            echo_error(ERROR_NO_PATH)
+            sys.exit(1)
+
+        if cache_from is not None and kwargs["from"] is not None:
+            echo_error(ERROR_CACHE_FROM_WITH_FROM)
+            sys.exit(1)
+
+        if watch:
+            _watch_and_build(kwargs, cache_from, interval)
+            return
+
+        digest = _skip_if_unchanged(kwargs) if skip_unchanged else None
+
+        cached_path, base = _prepare_build(kwargs, cache_from)
+        try:
+            image_id = asyncio.run(_build_image_and_listen_for_messages(**kwargs))
+        finally:
+            if cached_path is not None:
+                os.remove(cached_path)
+
+        if base is not None and image_id:
+            record_base_image(image_id, base)
+
+        if digest is not None and image_id:
+            record_digest(digest, image_id)
 
     def remove_irrelevant_options(option):
         return option.name not in ("persist", "restart")
@@ -188,24 +298,105 @@ def image_build(name, hidden=False):
             metavar="list",
             help="Set build-time variables (e.g. `--build-arg FIRST=hello --build-arg SECOND=world`)",
         ),
-        click.Argument(["path"], nargs=1),
+        click.Option(
+            ["--cache-from"],
+            default=None,
+            metavar="auto|IMAGE",
+            help=HELP_CACHE_FROM_FLAG,
+        ),
+        click.Option(
+            ["--graph"],
+            default=None,
+            type=click.Path(exists=True, dir_okay=False),
+            metavar="FILE",
+            help=HELP_GRAPH_FLAG,
+        ),
+        click.Option(
+            ["--parallel"],
+            default=None,
+            type=click.IntRange(min=1),
+            metavar="N",
+            help=HELP_GRAPH_PARALLEL_FLAG,
+        ),
+        click.Option(
+            ["--skip-unchanged"],
+            is_flag=True,
+            default=False,
+            metavar="flag",
+            help=HELP_SKIP_UNCHANGED_FLAG,
+        ),
+        click.Option(
+            ["--watch", "-w"],
+            is_flag=True,
+            default=False,
+            metavar="flag",
+            help=HELP_WATCH_FLAG,
+        ),
+        click.Option(
+            ["--interval"],
+            default=DEFAULT_INTERVAL,
+            show_default=True,
+            type=click.FloatRange(min=0.1),
+            metavar="seconds",
+            help=HELP_INTERVAL_FLAG,
+        ),
+        click.Argument(["path"], required=False, nargs=1),
     ]
     build.params.extend(build_options)
 
     return build
 
 
+def image_build_stats(name, hidden=False):
+
+    @click.command(
+        cls=command_cls(),
+        name=name,
+        hidden=hidden,
+        no_args_is_help=True,
+        short_help="Show how long the steps of builds took",
+    )
+    @click.option(
+        "--runs",
+        "-n",
+        default=DEFAULT_HISTORY_RUNS,
+        show_default=True,
+        type=click.IntRange(min=1),
+        metavar="N",
+        help="Compare the last build with the **N** builds before it.",
+    )
+    @click.argument("nametag", nargs=1)
+    def build_stats(runs, nametag):
+        """
+        Show how long each step of the last build of **NAMETAG** took, compared to
+        earlier builds of it.
+
+        Builds using `--tag` are recorded by `klee image build` on this machine.
+        Steps that are markedly slower than the median of the earlier builds are
+        highlighted.
+        """
+        from .buildstats import print_build_stats
+
+        sys.exit(print_build_stats(nametag, runs))
+
+    return build_stats
+
+
 def image_list(name, hidden=False):
 
     @click.command(cls=command_cls(), name=name, hidden=hidden)
-    def _image_list():
+    def _image_list(quiet, output_format):
         """List images"""
-        request_and_print_response(
-            image_list_endpoint,
+        printer = listing_printer(
+            _print_image_list, ImageView, "id", quiet, output_format
+        )
+        stream_and_print_response(
+            image_list_stream_endpoint,
             kwargs={},
-            statuscode2printer={200: _print_image_list, 500: print_backend_error},
+            statuscode2printer={200: printer, 500: print_backend_error},
         )
 
+    _image_list = listing_options(_image_list)
     return _image_list
 
 
@@ -213,8 +404,13 @@ def image_remove(name, hidden=False):
 
     @click.command(cls=command_cls(), name=name, hidden=hidden, no_args_is_help=True)
     @click.argument("images", required=True, nargs=-1)
-    def remove(images):
+    def remove(images, parallel, unordered):
         """Remove one or more images"""
+        if parallel is not None:
+            operation = request_operation(image_remove_async_endpoint, "image_id")
+            exit_code = run_parallel(images, operation, parallel, not unordered)
+            sys.exit(exit_code)
+
         for image_id in images:
             response = request_and_print_response(
                 image_remove_endpoint,
@@ -228,6 +424,7 @@ def image_remove(name, hidden=False):
             if response is None or response.status_code != 200:
                 sys.exit(1)
 
+    remove = parallel_options(remove)
     return remove
 
 
@@ -299,12 +496,13 @@ def image_inspect(name, hidden=False):
         argument="image",
         id_var="image_id",
         docs="Display detailed information on an image",
-        endpoint=image_inspect_endpoint,
+        endpoint=image_inspect_stream_endpoint,
     )
 
 
 root.add_command(image_create("create"), name="create")
 root.add_command(image_build("build"), name="build")
+root.add_command(image_build_stats("build-stats"), name="build-stats")
 root.add_command(image_list("ls"), name="ls")
 root.add_command(image_inspect("inspect"), name="inspect")
 root.add_command(image_remove("rm"), name="rm")
@@ -348,20 +546,22 @@ def _create(tag, dns, localtime, update, autotag, method, source):
         "update": update,
         "autotag": autotag,
     }
-    config_json = json.dumps(config)
+    config_json = jsoncodec.dumps(config)
     asyncio.run(_create_image_and_listen_for_messages(config_json))
 
 
 async def _create_image_and_listen_for_messages(config_json):
+    from websockets.exceptions import ConnectionClosedError
+
     try:
         async with create_websocket(WS_IMAGE_CREATE_ENDPOINT) as websocket:
             await websocket.send(config_json)
             starting_frame = await websocket.recv()
-            start_msg = json.loads(starting_frame)
+            start_msg = jsoncodec.loads(starting_frame)
             if start_msg["msg_type"] == "starting":
                 try:
                     closing_message = await listen_for_messages(websocket)
-                except json.decoder.JSONDecodeError:
+                except jsoncodec.JSONDecodeError:
                     echo_error("Kleened returned an unknown error")
                     return
 
@@ -377,19 +577,257 @@ async def _create_image_and_listen_for_messages(config_json):
             else:
                 unexpected_error()
 
-    except websockets.exceptions.ConnectionClosedError:
+    except ConnectionClosedError:
         connection_closed_unexpectedly()
 
 
-def process_build_messages(message):
-    snapshot_message = "--> Snapshot created: @"
-    if snapshot_message in message:
-        echo_bold(message)
+def _build_graph(filepath, parallel, cache_from, skip_unchanged, kwargs):
+    from .buildgraph import GraphError, dependencies, load_graph, run_graph
 
-    elif "Step " in message and " : " in message:
-        echo_bold(message)
+    if (
+        kwargs["path"] is not None
+        or cache_from is not None
+        or skip_unchanged
+        or kwargs["file"] != "Dockerfile"
+        or kwargs["from"] is not None
+        or kwargs["tag"] != ""
+    ):
+        echo_error(ERROR_GRAPH_OPTIONS)
+        sys.exit(1)
+
+    try:
+        specs = load_graph(filepath)
+        graph = dependencies(specs)
+    except GraphError as e:
+        echo_error(str(e))
+        sys.exit(1)
+
+    def build_config(spec):
+        # The options of the command apply to every build of the graph
+        return _build_config(
+            {
+                **kwargs,
+                "path": spec.path,
+                "file": spec.file,
+                "tag": spec.tag,
+                "from": spec.from_,
+                "build_arg": [*kwargs["build_arg"], *spec.build_args],
+            }
+        )
+
+    parallel = DEFAULT_PARALLEL if parallel is None else parallel
+    sys.exit(run_graph(specs, graph, build_config, parallel))
+
+
+def _watch_and_build(kwargs, cache_from, interval):
+    try:
+        asyncio.run(_watch_builds(kwargs, cache_from, interval))
+    except KeyboardInterrupt:
+        sys.exit(130)
+
+
+async def _watch_builds(kwargs, cache_from, interval):
+    """
+    Build the image, and build it again whenever the files of the context have
+    changed and then stayed the same for 'interval' seconds. Changes made while
+    a build runs, however many, lead to a single rebuild after it.
 
-    elif "Using user-supplied parent image:" in message:
+    Every rebuild uses the last image with a snapshot as '--cache-from', i.e., the
+    image of the last successful build or of a failed build that got as far as
+    taking a snapshot.
+    """
+    from .builddigest import read_ignore_file
+
+    path = os.path.abspath(kwargs["path"])
+    exclude = read_ignore_file(path)
+    loop = asyncio.get_running_loop()
+    files = await loop.run_in_executor(None, snapshot, path, exclude)
+    while True:
+        changed = asyncio.ensure_future(wait_for_change(path, files, exclude, interval))
+        try:
+            result = await _watched_build(dict(kwargs), cache_from)
+        except BaseException:
+            changed.cancel()
+            raise
+
+        # Snapshots cannot be reused when '--from' replaces the parent image
+        if kwargs["from"] is None and (result.succeeded or result.snapshot):
+            cache_from = result.image_id
+
+        echo_bold(BUILD_WATCHING.format(path=path))
+        files = await wait_until_settled(path, await changed, exclude, interval)
+        echo_bold(BUILD_CHANGED.format(path=path))
+
+
+async def _watched_build(kwargs, cache_from):
+    from .buildcache import record_base_image
+
+    cached_path, base = _prepare_build(kwargs, cache_from)
+    try:
+        result = await _build_image(kwargs)
+    finally:
+        if cached_path is not None:
+            os.remove(cached_path)
+
+    if base is not None and result.image_id:
+        record_base_image(result.image_id, base)
+    return result
+
+
+def _skip_if_unchanged(kwargs):
+    """
+    Exit after printing the ID of the image built from the same digest as the
+    build in 'kwargs', if it still exists, and otherwise return the digest.
+    """
+    from .builddigest import context_digest, load_digest_cache
+
+    path = os.path.abspath(kwargs["path"])
+    try:
+        digest = context_digest(
+            path, kwargs["file"], _build_config(kwargs), _base_image_id(kwargs)
+        )
+    except OSError as e:
+        echo_error(DIGEST_UNAVAILABLE.format(reason=e))
+        return None
+
+    image_id = load_digest_cache().get(digest)
+    if image_id is None or not _image_exists(image_id, kwargs["tag"]):
+        return digest
+
+    if not kwargs["quiet"]:
+        echo_bold(BUILD_UNCHANGED.format(image_id=image_id))
+    echo_bold(image_id)
+    sys.exit(0)
+
+
+def _base_image_id(kwargs):
+    """
+    The ID of the image the build in 'kwargs' starts from, followed by the
+    '@SNAPSHOT' it names, if any, or '' if there is no such image.
+    """
+    from .buildgraph import dockerfile_base
+
+    path = os.path.abspath(kwargs["path"])
+    base = dockerfile_base(path, kwargs["file"], kwargs["from"])
+    if base is None:
+        return ""
+
+    image, at, snapshot = base.partition("@")
+    # An ID, or a name with or without its tag
+    for reference in dict.fromkeys([image, image_reference(image)]):
+        with _exit_on_connection_errors():
+            response = request(image_inspect_endpoint, {"image_id": reference})
+
+        if response is not None and response.status_code == 200:
+            return f"{response.parsed.id}{at}{snapshot}"
+
+    # kleened reports this when building
+    return ""
+
+
+def _image_exists(image_id, tag):
+    """Whether the image exists and, if 'tag' is set, still has that tag."""
+    with _exit_on_connection_errors():
+        response = request(image_inspect_endpoint, {"image_id": image_id})
+
+    if response is None or response.status_code != 200:
+        return False
+
+    if not tag:
+        return True
+
+    image = response.parsed
+    return f"{image.name}:{image.tag}" == image_reference(tag)
+
+
+def _prepare_build(kwargs, cache_from):
+    """
+    With 'cache_from', change the build in 'kwargs' to continue from the best
+    snapshot to reuse, if any. Returns the path of the Dockerfile written for it,
+    if any, and the image the build starts from, as referred to by '--from' or the
+    'FROM' of the Dockerfile. The latter is recorded for the image built, since
+    later cached builds can only reuse its snapshots if it is known.
+    """
+    from .buildcache import (
+        cached_dockerfile,
+        find_cache_match,
+        load_base_images,
+        parse_dockerfile,
+        resolve_base,
+        write_cached_dockerfile,
+    )
+
+    path = os.path.abspath(kwargs["path"])
+    try:
+        with open(os.path.join(path, kwargs["file"]), encoding="utf-8") as f:
+            instructions = parse_dockerfile(f.read())
+    except OSError as e:
+        if cache_from is not None:
+            echo_error(CACHE_UNAVAILABLE.format(reason=e))
+        return None, None
+
+    response = request_and_print_response(
+        image_list_endpoint,
+        kwargs={},
+        statuscode2printer={200: print_nothing, 500: print_backend_error},
+    )
+    if response is None or response.status_code != 200:
+        sys.exit(1)
+
+    if kwargs["from"] is not None:
+        base = resolve_base([f"FROM {kwargs['from']}"], response.parsed)
+    else:
+        base = resolve_base(instructions, response.parsed)
+
+    if cache_from is None:
+        return None, base
+
+    match = find_cache_match(
+        instructions,
+        response.parsed,
+        path,
+        kwargs["build_arg"],
+        cache_from,
+        load_base_images(),
+    )
+    if match is None:
+        if not kwargs["quiet"]:
+            echo_bold(CACHE_NO_MATCH)
+        return None, base
+
+    try:
+        dockerfile = write_cached_dockerfile(cached_dockerfile(instructions, match))
+    except OSError as e:
+        echo_error(CACHE_UNAVAILABLE.format(reason=e))
+        return None, base
+
+    if not kwargs["quiet"]:
+        _print_reused_steps(instructions, match)
+
+    # kleened reads the Dockerfile from a path relative to the context
+    kwargs["file"] = os.path.relpath(dockerfile, path)
+    kwargs["from"] = f"{match.image_id}@{match.snapshot}"
+    return dockerfile, base
+
+
+def _print_reused_steps(instructions, match):
+    from rich.markup import escape
+
+    for n, instruction in enumerate(instructions[: match.reused], start=1):
+        echo_bold(
+            escape(
+                CACHE_STEP_REUSED.format(
+                    step=n, total=len(instructions), instruction=instruction
+                )
+            )
+        )
+    echo_bold(CACHE_CONTINUING.format(image_id=match.image_id, snapshot=match.snapshot))
+
+
+def process_build_messages(message):
+    from .buildgraph import is_status_message
+
+    if is_status_message(message):
         echo_bold(message)
 
     else:
@@ -397,6 +835,49 @@ def process_build_messages(message):
 
 
 async def _build_image_and_listen_for_messages(**kwargs):
+    """Build the image and return its ID, exiting if it was not built."""
+    result = await _build_image(kwargs)
+    if not result.succeeded:
+        sys.exit(1)
+
+    return result.image_id
+
+
+async def _build_image(kwargs):
+    """Build the image and return the 'BuildResult'."""
+    from .buildrun import run_build
+    from .buildstats import print_step_timings
+
+    def started(image_id):
+        if image_id != "":
+            echo_bold(BUILD_START_MESSAGE.format(image_id=image_id))
+
+    run = await run_build(
+        _build_config(kwargs), process_build_messages, kwargs["tag"], started
+    )
+    if not run.started:
+        echo_error(run.message)
+        return BuildResult(False, run.image_id, "")
+
+    echo("")
+    if run.steps and not kwargs["quiet"]:
+        print_step_timings(run.steps, run.seconds)
+
+    if not run.succeeded:
+        echo_error(run.message)
+        if run.snapshot != "":
+            echo_bold(BUILD_FAILED.format(snapshot=run.snapshot, image_id=run.image_id))
+        return BuildResult(False, run.image_id, run.snapshot)
+
+    echo_bold(run.message)
+    if run.image_id != "":
+        echo_bold(run.image_id)
+
+    return BuildResult(True, run.image_id, "")
+
+
+def _build_config(kwargs):
+    """The JSON configuration of a build with the options of 'klee image build'."""
     quiet = "true" if kwargs["quiet"] else "false"
     network_driver = kwargs["driver"] if kwargs["driver"] is not None else "host"
     path = os.path.abspath(kwargs["path"])
@@ -433,7 +914,7 @@ async def _build_image_and_listen_for_messages(**kwargs):
         container_config["network_driver"] = _default_if_none(kwargs, "driver", "host")
         networks = []
 
-    build_config = json.dumps(
+    return jsoncodec.dumps(
         {
             "context": path,
             "dockerfile": kwargs["file"],
@@ -445,47 +926,6 @@ async def _build_image_and_listen_for_messages(**kwargs):
             "networks": networks,
         }
     )
-    try:
-        async with create_websocket(WS_IMAGE_BUILD_ENDPOINT) as websocket:
-            await websocket.send(build_config)
-            starting_frame = await websocket.recv()
-            start_msg = json.loads(starting_frame)
-            if start_msg["msg_type"] == "starting":
-                if start_msg["data"] != "":
-                    image_id = start_msg["data"]
-                    echo_bold(BUILD_START_MESSAGE.format(image_id=image_id))
-                try:
-                    closing_message = await listen_for_messages(
-                        websocket, message_processor=process_build_messages
-                    )
-                except json.JSONDecodeError:
-                    unexpected_error()
-                    sys.exit(1)
-
-                if closing_message["msg_type"] == "error":
-                    if closing_message["data"] != "":
-                        snapshot = closing_message["data"]
-                        echo_bold(
-                            BUILD_FAILED.format(snapshot=snapshot, image_id=image_id)
-                        )
-                    sys.exit(1)
-
-                elif closing_message["data"] == "":
-                    echo_bold(closing_message["message"])
-
-                else:
-                    echo_bold(closing_message["message"])
-                    echo_bold(closing_message["data"])
-
-            elif start_msg["msg_type"] == "error":
-                echo_bold(start_msg["message"])
-                sys.exit(1)
-            else:
-                unexpected_error()
-                sys.exit(1)
-
-    except websockets.exceptions.ConnectionClosedError:
-        connection_closed_unexpectedly()
 
 
 def _default_if_none(kwargs, key, default):
@@ -495,9 +935,10 @@ def _default_if_none(kwargs, key, default):
     return kwargs[key]
 
 
-def _print_image_list(response):
-    images = [
-        [img.id, img.name, img.tag, human_duration(img.created) + " ago"]
-        for img in response.parsed
-    ]
+def _print_image_list(images):
+    now = time.time()
+    images = (
+        [img.id, img.name, img.tag, human_duration(img.created, now) + " ago"]
+        for img in images
+    )
     print_table(images, IMAGE_LIST_COLUMNS)
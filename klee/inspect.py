@@ -1,21 +1,45 @@
+import sys
+
 import click
 
-from .utils import request_and_print_response
-from .printing import command_cls, print_json, print_response_msg, print_backend_error
+from .utils import stream_and_print_response
+from .printing import (
+    command_cls,
+    print_json_pretty,
+    print_json_stream,
+    print_streamed_response_msg,
+    print_backend_error,
+)
+
+HELP_RAW_FLAG = """
+Print the JSON from Kleened as-is, without formatting it.
+This is the default when the output is not a terminal.
+"""
 
 
 def inspect_command(name, docs, argument, id_var, endpoint, hidden=False):
+    """
+    'endpoint' is the 'stream_detailed' variant of the inspect endpoint, so the
+    response can be passed on as it is received.
+    """
+
     @click.command(
         cls=command_cls(), name=name, hidden=hidden, help=docs, no_args_is_help=True
     )
+    @click.option("--raw", is_flag=True, default=False, help=HELP_RAW_FLAG)
     @click.argument(argument, nargs=1)
-    def inspect(**kwargs):
-        request_and_print_response(
+    def inspect(raw, **kwargs):
+        if raw or not sys.stdout.isatty():
+            print_json = print_json_stream
+        else:
+            print_json = print_json_pretty
+
+        stream_and_print_response(
             endpoint,
             kwargs={id_var: kwargs[argument]},
             statuscode2printer={
                 200: print_json,
-                404: print_response_msg,
+                404: print_streamed_response_msg,
                 500: print_backend_error,
             },
         )
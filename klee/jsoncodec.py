@@ -0,0 +1,100 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# The library used when it is installed, 'json' otherwise
+BACKEND = "json" if orjson is None else "orjson"
+
+JSONDecodeError = json.JSONDecodeError
+
+# orjson decodes integers beyond 64 bits into floats rather than rejecting them.
+# Those have at least 19 digits, so documents with such a number are decoded by
+# 'json' instead. Mapping every digit to '0' and searching for 19 of them is
+# several times faster than a regular expression. It is done a chunk at a time,
+# so the document is never copied whole, and a run only counts if it starts a
+# number, i.e., follows '[', ',' or ':', so IDs inside strings do not.
+_LONG_DIGITS = "0" * 19
+_LONG_DIGITS_BYTES = b"0" * 19
+_DIGITS_TO_ZERO = str.maketrans("123456789", "000000000")
+_DIGITS_TO_ZERO_BYTES = bytes.maketrans(b"123456789", b"000000000")
+_SCAN_CHUNK_SIZE = 1 << 16
+# The digits, the whitespace, what precedes a number, and its sign, as they are
+# indexed from a 'str' and from bytes
+_CHARACTERS = ("0123456789", " \t\n\r", "[,:", "-")
+_BYTES = tuple(b"0123456789"), tuple(b" \t\n\r"), tuple(b"[,:"), ord("-")
+
+
+def loads(data):
+    """
+    Decode the JSON document 'data', given as 'str' or 'bytes'.
+
+    Raises 'JSONDecodeError' if it is not valid JSON. The decoded objects are the
+    same with either backend.
+    """
+    if orjson is not None and not _has_long_integer(data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson rejects a few documents that 'json' accepts, e.g., 'NaN'
+            # and lone surrogates. 'json' decodes those and raises its own,
+            # more descriptive, error for invalid documents.
+            pass
+
+    return json.loads(data)
+
+
+def dumps(obj):
+    """
+    Encode 'obj' as compact JSON, i.e., without whitespace, as a 'str'.
+
+    Non-ASCII characters are written as they are. The output is the same with
+    either backend, except for floats: orjson writes, e.g., '1e16' and 'null' for
+    NaN where 'json' writes '1e+16' and 'NaN'. Nothing klee sends contains floats.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj).decode()
+        except TypeError:
+            # E.g., non-string keys or integers beyond 64 bits
+            pass
+
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def _has_long_integer(data):
+    if isinstance(data, str):
+        digits, table, characters = _LONG_DIGITS, _DIGITS_TO_ZERO, _CHARACTERS
+    else:
+        # Indexing gives the byte values, like 'bytes', for any bytes-like 'data'
+        data = memoryview(data).cast("B")
+        digits, table, characters = _LONG_DIGITS_BYTES, _DIGITS_TO_ZERO_BYTES, _BYTES
+
+    # The chunks overlap by a run, so runs across their boundaries are found
+    for offset in range(0, len(data), _SCAN_CHUNK_SIZE):
+        chunk = data[offset : offset + _SCAN_CHUNK_SIZE + len(digits) - 1]
+        chunk = (chunk if isinstance(chunk, str) else bytes(chunk)).translate(table)
+        position = chunk.find(digits)
+        while position != -1:
+            if _starts_number(data, offset + position, characters):
+                return True
+            position = chunk.find(digits, position + 1)
+
+    return False
+
+
+def _starts_number(data, index, characters):
+    """Whether the digit at 'index' of 'data' is the first one of a number."""
+    digits, whitespace, starts, minus = characters
+    index -= 1
+    if index >= 0 and data[index] in digits:
+        return False
+
+    if index >= 0 and data[index] == minus:
+        index -= 1
+    while index >= 0 and data[index] in whitespace:
+        index -= 1
+
+    return index < 0 or data[index] in starts
@@ -0,0 +1,205 @@
+import re
+import json
+import codecs
+
+ERROR_NOT_AN_ARRAY = "expected a JSON array"
+ERROR_TRUNCATED = "JSON array ended unexpectedly"
+
+_decoder = json.JSONDecoder()
+
+_WHITESPACE = " \t\n\r"
+
+# What changes the nesting of an element outside and inside of strings, and what
+# ends a number or a literal like 'true'
+_STRUCTURE = re.compile(r'["\[\]{}]')
+_STRING_END = re.compile(r'["\\]')
+_SCALAR_END = re.compile(r"[ \t\n\r,\]]")
+
+
+def iter_json_array(chunks):
+    """
+    Yield the elements of the JSON array received as the byte 'chunks', e.g., from
+    'httpx.Response.iter_bytes', one at a time as soon as each is complete.
+
+    Only the element being decoded is kept in memory, not the whole document.
+    Raises 'json.JSONDecodeError' if the document is not a valid JSON array.
+    """
+    parser = _ArrayParser()
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    for chunk in chunks:
+        yield from parser.feed(decoder.decode(chunk))
+
+    yield from parser.feed(decoder.decode(b"", final=True), final=True)
+
+
+class _ArrayParser:
+    def __init__(self):
+        self.buffer = ""
+        self.position = 0
+        # One of '[', 'first value', 'value', ',' and 'done'
+        self.expecting = "["
+        # The chunks of an element that has not been received in full, and the
+        # '_ElementScanner' looking for its end in each new chunk
+        self.pending = None
+        self.scanner = None
+
+    def feed(self, text, final=False):
+        if self.pending is not None:
+            # Each chunk is scanned once and the element is joined and decoded
+            # once, so large elements take linear rather than quadratic time
+            self.pending.append(text)
+            if self.scanner.scan(text) < 0 and not final:
+                return
+
+            self.buffer = "".join(self.pending)
+            self.pending = None
+        else:
+            self.buffer = self.buffer[self.position :] + text
+        self.position = 0
+
+        while self._skip_whitespace():
+            if self.expecting == "[":
+                self._expect("[", ERROR_NOT_AN_ARRAY)
+                self.expecting = "first value"
+
+            elif self.expecting == "first value" and self.buffer[self.position] == "]":
+                self.position += 1
+                self.expecting = "done"
+
+            elif self.expecting in ("first value", "value"):
+                element = self._decode_value(final)
+                if element is _INCOMPLETE:
+                    return
+                yield element
+
+            elif self.expecting == ",":
+                if self.buffer[self.position] == "]":
+                    self.position += 1
+                    self.expecting = "done"
+                else:
+                    self._expect(",", ERROR_TRUNCATED)
+                    self.expecting = "value"
+
+            else:
+                raise self._error("extra data after the JSON array")
+
+        if final and self.expecting != "done":
+            raise self._error(ERROR_TRUNCATED)
+
+    def _skip_whitespace(self):
+        while (
+            self.position < len(self.buffer)
+            and self.buffer[self.position] in _WHITESPACE
+        ):
+            self.position += 1
+
+        return self.position < len(self.buffer)
+
+    def _expect(self, character, message):
+        if self.buffer[self.position] != character:
+            raise self._error(message)
+
+        self.position += 1
+
+    def _decode_value(self, final):
+        if (
+            not final
+            and self.buffer[self.position] not in '[{"'
+            and _SCALAR_END.search(self.buffer, self.position) is None
+        ):
+            # A number or a literal, e.g., '1.' or 'tr', that might continue in
+            # the next chunk
+            return self._wait_for_rest()
+
+        try:
+            element, end = _decoder.raw_decode(self.buffer, self.position)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            # Most likely the rest of the element has not been received yet
+            return self._wait_for_rest()
+
+        self.position = end
+        self.expecting = ","
+        return element
+
+    def _wait_for_rest(self):
+        scanner = _ElementScanner()
+        if scanner.scan(self.buffer, self.position) >= 0:
+            # The element is complete, so it is invalid
+            _decoder.raw_decode(self.buffer, self.position)
+
+        self.pending = [self.buffer[self.position :]]
+        self.scanner = scanner
+        self.buffer = ""
+        self.position = 0
+        return _INCOMPLETE
+
+    def _error(self, message):
+        return json.JSONDecodeError(message, self.buffer, self.position)
+
+
+_INCOMPLETE = object()
+
+
+class _ElementScanner:
+    """
+    Finds the end of a JSON value that is received in chunks, by following the
+    nesting of arrays, objects and strings. Whether the value is valid is left to
+    the decoder.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.scalar = None
+
+    def scan(self, text, position=0):
+        """
+        The index in 'text' just after the end of the value, or -1 if it does
+        not end in 'text'. Every chunk of the value is passed in order.
+        """
+        if self.scalar is None:
+            self.scalar = text[position] not in '[{"'
+
+        if self.scalar:
+            match = _SCALAR_END.search(text, position)
+            return -1 if match is None else match.start()
+
+        while True:
+            if self.escaped:
+                if position >= len(text):
+                    return -1
+                position += 1
+                self.escaped = False
+
+            if self.in_string:
+                match = _STRING_END.search(text, position)
+                if match is None:
+                    return -1
+
+                position = match.end()
+                if match.group() == "\\":
+                    self.escaped = True
+                    continue
+
+                self.in_string = False
+                if self.depth == 0:
+                    return position
+                continue
+
+            match = _STRUCTURE.search(text, position)
+            if match is None:
+                return -1
+
+            position = match.end()
+            character = match.group()
+            if character == '"':
+                self.in_string = True
+            elif character in "[{":
+                self.depth += 1
+            else:
+                self.depth -= 1
+                if self.depth <= 0:
+                    return position
@@ -0,0 +1,114 @@
+import re
+import sys
+import itertools
+import functools
+
+from . import jsoncodec
+from .jsonstream import iter_json_array
+from .printing import echo_error, print_json_stream
+
+FORMAT_JSON = "json"
+FORMAT_NDJSON = "ndjson"
+
+# A field of a '--format' template, e.g., '{{.name}}' or '{{ .ID }}'
+TEMPLATE_FIELD = re.compile(r"\{\{\s*\.(\w+)\s*\}\}")
+TEMPLATE_ESCAPES = {"\\t": "\t", "\\n": "\n"}
+
+ERROR_UNKNOWN_FIELD = "unknown field '{field}' in format template"
+
+# Lines of output written at a time
+WRITE_BATCH_SIZE = 1000
+
+
+def listing_printer(table_printer, model, id_key, quiet=False, output_format=None):
+    """
+    The printer of a successful response from the 'stream_detailed' variant of a
+    list endpoint, depending on '--quiet'/'--format'.
+
+    The objects are decoded one at a time as the response is received. By default
+    they are decoded with 'model.from_dict', where 'model' is a generated model or
+    a row view (see 'rowviews.py'), and passed to 'table_printer' as an iterator.
+    The other printers work on the JSON objects themselves and never build a
+    table. 'id_key' is the key printed by '--quiet'.
+    """
+    if quiet:
+        return functools.partial(_print_ids, id_key=id_key)
+
+    if output_format is None:
+        return functools.partial(
+            _print_models, table_printer=table_printer, model=model
+        )
+
+    if output_format == FORMAT_JSON:
+        return print_json_stream
+
+    if output_format == FORMAT_NDJSON:
+        return _print_ndjson
+
+    return functools.partial(_print_template, template=output_format)
+
+
+def _items(response):
+    return iter_json_array(response.iter_bytes())
+
+
+def _print_models(response, table_printer, model):
+    table_printer(model.from_dict(item) for item in _items(response))
+
+
+def _print_ids(response, id_key):
+    _write_lines(item[id_key] for item in _items(response))
+
+
+def _print_ndjson(response):
+    _write_lines(jsoncodec.dumps(item) for item in _items(response))
+
+
+def _print_template(response, template):
+    for escape, character in TEMPLATE_ESCAPES.items():
+        template = template.replace(escape, character)
+
+    items = _items(response)
+    first = next(items, None)
+    if first is None:
+        return
+
+    # Every other element is a field name, starting with the text before the first
+    pieces = TEMPLATE_FIELD.split(template)
+    # Fields are matched case-insensitively, so that '{{.ID}}' works as well
+    keys = {key.lower(): key for key in first}
+    texts, fields = pieces[::2], []
+    for field in pieces[1::2]:
+        if field.lower() not in keys:
+            echo_error(ERROR_UNKNOWN_FIELD.format(field=field))
+            sys.exit(1)
+
+        fields.append(keys[field.lower()])
+
+    def render(item):
+        values = [_template_value(item.get(field)) for field in fields]
+        return "".join(text + value for text, value in zip(texts, values + [""]))
+
+    _write_lines(map(render, itertools.chain([first], items)))
+
+
+def _template_value(value):
+    if value is None:
+        return ""
+
+    if isinstance(value, str):
+        return value
+
+    return jsoncodec.dumps(value)
+
+
+def _write_lines(lines):
+    lines = iter(lines)
+    while True:
+        batch = list(itertools.islice(lines, WRITE_BATCH_SIZE))
+        if not batch:
+            break
+
+        sys.stdout.write("\n".join(batch) + "\n")
+
+    sys.stdout.flush()
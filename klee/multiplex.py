@@ -0,0 +1,149 @@
+import sys
+import fnmatch
+
+from .client.api.default.container_list import (
+    sync_detailed as container_list_endpoint,
+)
+from .connection import request
+from .parallel import DEFAULT_PARALLEL, run_parallel
+from .printing import echo_error
+from .session import ExecError, closing_message, exec_session, exit_code
+from .utils import _exit_on_connection_errors
+
+ERROR_LISTING_CONTAINERS = "could not list the containers: {message}"
+ERROR_NO_CONTAINERS_SELECTED = "no containers selected"
+ERROR_NO_EXIT_CODE = "the process did not exit normally"
+ERROR_ATTACH_SEVERAL = (
+    "input and a TTY can only be attached when running in a single container"
+)
+
+MULTIPLEX_EXITED = "{container} exited with exit-code {code}"
+MULTIPLEX_FAILED = "exited with exit-code {code}"
+
+PREFIX_SEPARATOR = " | "
+
+
+def select_containers(containers, all_=False, filters=(), running=True):
+    """
+    The containers given, followed by every container that is running (or
+    stopped, if 'running' is false) when 'all_' is set, or whose name or ID
+    matches one of the glob patterns 'filters'. Each container is included once.
+    """
+    selected = list(containers)
+    if all_ or filters:
+        with _exit_on_connection_errors():
+            response = request(container_list_endpoint, {"all_": True})
+
+        if response is None or response.status_code != 200:
+            message = getattr(getattr(response, "parsed", None), "message", None)
+            echo_error(ERROR_LISTING_CONTAINERS.format(message=message))
+            sys.exit(1)
+
+        for container in response.parsed:
+            if container.running != running:
+                continue
+
+            if all_ or any(
+                fnmatch.fnmatchcase(container.name, pattern)
+                or fnmatch.fnmatchcase(container.id, pattern)
+                for pattern in filters
+            ):
+                selected.append(container.name)
+
+    # Keep the order while removing duplicates
+    return list(dict.fromkeys(selected))
+
+
+def run_multiplexed(containers, cmd=(), parallel=DEFAULT_PARALLEL, env=(), user=""):
+    """
+    Run 'cmd' in every container, or the command of the container if 'cmd' is
+    empty, with at most 'parallel' of them attached at a time. Their output is
+    written line by line as it arrives, each line prefixed with the name of the
+    container, and a summary of the exit codes follows. Returns the exit code of
+    klee: 0 if every process exited with 0, otherwise 1.
+    """
+    if not containers:
+        echo_error(ERROR_NO_CONTAINERS_SELECTED)
+        return 1
+
+    width = max(len(container) for container in containers)
+
+    async def operation(container):
+        prefixer = LinePrefixer(f"{container:<{width}}{PREFIX_SEPARATOR}")
+        return await _attach_prefixed(container, cmd, env, user, prefixer)
+
+    return run_parallel(containers, operation, parallel, ordered=False)
+
+
+class LinePrefixer:
+    """
+    Splits the output of a process into lines, each starting with 'prefix'.
+    Output is only written once a line is complete, so lines from several
+    processes do not get mixed up.
+    """
+
+    def __init__(self, prefix):
+        self.prefix = prefix.encode()
+        self._partial = b""
+
+    def feed(self, data):
+        """The complete lines of 'data' and earlier partial data, prefixed."""
+        if isinstance(data, str):
+            data = data.encode()
+
+        data = self._partial + data
+        end = data.rfind(b"\n") + 1
+        self._partial = data[end:]
+        if end == 0:
+            return b""
+
+        return b"".join(
+            self.prefix + line for line in data[:end].splitlines(keepends=True)
+        )
+
+    def flush(self):
+        """The last line if it did not end with a newline, prefixed."""
+        if not self._partial:
+            return b""
+
+        line = self.prefix + self._partial + b"\n"
+        self._partial = b""
+        return line
+
+
+async def _attach_prefixed(container, cmd, env, user, prefixer):
+    from websockets.exceptions import ConnectionClosed
+
+    try:
+        async with exec_session(container, cmd, env=env, user=user) as websocket:
+            while True:
+                try:
+                    frame = await websocket.recv()
+                except ConnectionClosed:
+                    break
+
+                _write(prefixer.feed(frame))
+
+            _write(prefixer.flush())
+    except ExecError as e:
+        return False, str(e)
+
+    closing = closing_message(websocket)
+    code = exit_code(closing)
+    if code == 0:
+        return True, MULTIPLEX_EXITED.format(container=container, code=code)
+
+    if code is None:
+        return False, closing.get("message") or ERROR_NO_EXIT_CODE
+
+    return False, MULTIPLEX_FAILED.format(code=code)
+
+
+def _write(data):
+    if not data:
+        return
+
+    # Summaries are printed through 'sys.stdout', so it is flushed first
+    sys.stdout.flush()
+    sys.stdout.buffer.write(data)
+    sys.stdout.buffer.flush()
@@ -1,17 +1,25 @@
+import sys
+
 import click
 
 from .client.api.default.network_create import sync_detailed as network_create_endpoint
 from .client.api.default.network_connect import (
     sync_detailed as network_connect_endpoint,
+    asyncio_detailed as network_connect_async_endpoint,
 )
 from .client.api.default.network_disconnect import (
     sync_detailed as network_disconnect_endpoint,
 )
-from .client.api.default.network_list import sync_detailed as network_list_endpoint
+from .client.api.default.network_list import (
+    stream_detailed as network_list_stream_endpoint,
+)
 from .client.api.default.network_inspect import (
-    sync_detailed as network_inspect_endpoint,
+    stream_detailed as network_inspect_stream_endpoint,
+)
+from .client.api.default.network_remove import (
+    sync_detailed as network_remove_endpoint,
+    asyncio_detailed as network_remove_async_endpoint,
 )
-from .client.api.default.network_remove import sync_detailed as network_remove_endpoint
 from .client.api.default.network_prune import sync_detailed as network_prune_endpoint
 
 from .client.models.end_point_config import EndPointConfig
@@ -28,7 +36,15 @@ from .printing import (
 )
 from .prune import prune_command
 from .inspect import inspect_command
-from .utils import request_and_print_response
+from .listing import listing_printer
+from .rowviews import NetworkView
+from .parallel import run_parallel, request_operation
+from .options import listing_options, parallel_options
+from .utils import (
+    request_and_print_response,
+    async_request_and_print_response,
+    stream_and_print_response,
+)
 
 NETWORK_LIST_COLUMNS = [
     ("ID", {"style": "cyan"}),
@@ -150,10 +166,15 @@ def network_remove(name, hidden=False):
 
     @click.command(cls=command_cls(), name=name, hidden=hidden, no_args_is_help=True)
     @click.argument("networks", required=True, nargs=-1)
-    def remove(networks):
+    def remove(networks, parallel, unordered):
         """
         Remove one or more networks. Any connected containers will be disconnected.
         """
+        if parallel is not None:
+            operation = request_operation(network_remove_async_endpoint, "network_id")
+            exit_code = run_parallel(networks, operation, parallel, not unordered)
+            sys.exit(exit_code)
+
         for network_id in networks:
             response = request_and_print_response(
                 network_remove_endpoint,
@@ -167,24 +188,29 @@ def network_remove(name, hidden=False):
             if response is None or response.status_code != 200:
                 break
 
+    remove = parallel_options(remove)
     return remove
 
 
 def network_list(name, hidden=False):
 
-    def _print_networks(response):
-        networks = [[nw.id, nw.name, nw.type, nw.subnet] for nw in response.parsed]
+    def _print_networks(networks):
+        networks = ([nw.id, nw.name, nw.type, nw.subnet] for nw in networks)
         print_table(networks, NETWORK_LIST_COLUMNS)
 
     @click.command(cls=command_cls(), name=name, hidden=hidden)
-    def listing():
+    def listing(quiet, output_format):
         """List networks"""
-        request_and_print_response(
-            network_list_endpoint,
+        printer = listing_printer(
+            _print_networks, NetworkView, "id", quiet, output_format
+        )
+        stream_and_print_response(
+            network_list_stream_endpoint,
             kwargs={},
-            statuscode2printer={200: _print_networks, 500: print_backend_error},
+            statuscode2printer={200: printer, 500: print_backend_error},
         )
 
+    listing = listing_options(listing)
     return listing
 
 
@@ -195,7 +221,7 @@ def network_inspect(name, hidden=False):
         argument="network",
         id_var="network_id",
         docs="Display detailed information on a network.",
-        endpoint=network_inspect_endpoint,
+        endpoint=network_inspect_stream_endpoint,
     )
 
 
@@ -250,7 +276,31 @@ def network_disconnect(name, hidden=False):
     return disconnect
 
 
+NETWORK_CONNECT_PRINTERS = {
+    204: print_nothing,
+    404: print_response_msg,
+    409: print_response_msg,
+    500: print_backend_error,
+}
+
+
 def _connect(ip, ip6, network, container):
+    return request_and_print_response(
+        network_connect_endpoint,
+        kwargs={"json_body": _endpoint_config(ip, ip6, network, container)},
+        statuscode2printer=NETWORK_CONNECT_PRINTERS,
+    )
+
+
+async def _async_connect(ip, ip6, network, container):
+    return await async_request_and_print_response(
+        network_connect_async_endpoint,
+        kwargs={"json_body": _endpoint_config(ip, ip6, network, container)},
+        statuscode2printer=NETWORK_CONNECT_PRINTERS,
+    )
+
+
+def _endpoint_config(ip, ip6, network, container):
     ip = "<auto>" if ip is None else ip
     ip6 = "<auto>" if ip6 is None else ip6
 
@@ -268,16 +318,7 @@ def _connect(ip, ip6, network, container):
             {"network": network, "container": container}
         )
 
-    return request_and_print_response(
-        network_connect_endpoint,
-        kwargs={"json_body": endpoint_config},
-        statuscode2printer={
-            204: print_nothing,
-            404: print_response_msg,
-            409: print_response_msg,
-            500: print_backend_error,
-        },
-    )
+    return endpoint_config
 
 
 root.add_command(network_create("create"), name="create")
@@ -4,9 +4,7 @@ HELP_DETACH_FLAG = """
 Do not output STDOUT/STDERR to the terminal.
 If this is set, Klee will exit and return the container ID when the container has started.
 """
-HELP_INTERACTIVE_FLAG = (
-    "Send terminal input to container's STDIN. If set, `detach` will be ignored."
-)
+HELP_INTERACTIVE_FLAG = "Send terminal input to container's STDIN. If set, `detach` will be ignored. Piped input also needs `tty`."
 HELP_IP_FLAG = "IPv4 address used for the container. If omitted, an unused ip is allocated from the IPv4 subnet of `network`."
 HELP_IP6_FLAG = "IPv6 address used for the container. If omitted, an unused ip is allocated from the IPv6 subnet of `network`."
 HELP_NETWORK_DRIVER_FLAG = """
@@ -14,6 +12,20 @@ Network driver of the container.
 Possible values: 'ipnet', 'host', 'vnet', and 'disabled'. If no `network` and no `driver` is supplied,
 the network driver is set to 'host'. If a `network` is set but no `driver`, it is set to 'ipnet'.
 """
+HELP_PARALLEL_FLAG = """
+Process up to **N** arguments concurrently. All of them are attempted, even if some fail,
+and a summary is printed at the end. Without this, arguments are processed one at a time.
+"""
+HELP_ALL_CONTAINERS_FLAG = "Select every {state} container."
+HELP_FILTER_FLAG = """
+Select the {state} containers whose name or ID matches the glob pattern **PATTERN**,
+e.g., `'web-*'`. Can be repeated.
+"""
+HELP_QUIET_FLAG = "Only display {id_name}s, one per line."
+HELP_FORMAT_FLAG = """
+Format the output: 'json' prints the response from Kleened as-is, 'ndjson' one JSON object per line,
+and anything else is a template such as `'{{.id}}\\t{{.name}}'`, where the fields are keys of the JSON objects.
+"""
 
 
 def exec_options(cmd):
@@ -44,6 +56,67 @@ def exec_options(cmd):
     return cmd
 
 
+def parallel_options(cmd):
+    options = [
+        click.Option(
+            ["--parallel"],
+            default=None,
+            type=click.IntRange(min=1),
+            metavar="N",
+            help=HELP_PARALLEL_FLAG,
+        ),
+        click.Option(
+            ["--unordered"],
+            default=False,
+            is_flag=True,
+            metavar="flag",
+            help="With `parallel`, report each result as soon as it completes instead of in the order given.",
+        ),
+    ]
+    cmd.params.extend(options)
+    return cmd
+
+
+def selection_options(cmd, state):
+    options = [
+        click.Option(
+            ["--all", "all_"],
+            default=False,
+            is_flag=True,
+            metavar="flag",
+            help=HELP_ALL_CONTAINERS_FLAG.format(state=state),
+        ),
+        click.Option(
+            ["--filter", "filters"],
+            multiple=True,
+            metavar="pattern",
+            help=HELP_FILTER_FLAG.format(state=state),
+        ),
+    ]
+    cmd.params.extend(options)
+    return cmd
+
+
+def listing_options(cmd, id_name="ID"):
+    options = [
+        click.Option(
+            ["--quiet", "-q"],
+            default=False,
+            is_flag=True,
+            metavar="flag",
+            help=HELP_QUIET_FLAG.format(id_name=id_name),
+        ),
+        click.Option(
+            ["--format", "output_format"],
+            default=None,
+            metavar="string",
+            help=HELP_FORMAT_FLAG,
+        ),
+    ]
+    cmd.params.extend(options)
+    return cmd
+
+
 def container_create_options():
     return [
         click.Option(
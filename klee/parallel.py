@@ -0,0 +1,128 @@
+import sys
+import asyncio
+
+import httpx
+
+from .connection import async_request, close_async_client
+from .printing import echo_bold, echo_error
+
+PARALLEL_SUMMARY = "{succeeded} of {total} succeeded"
+PARALLEL_FAILED = "failed: {items}"
+PARALLEL_INTERRUPTED = "interrupted: {pending} of {total} not completed"
+
+# Items in flight at a time for commands that work on many of them at once by
+# default, e.g., 'klee start --all'
+DEFAULT_PARALLEL = 8
+
+ERROR_CONNECTION = "unable to connect to kleened: {error}"
+ERROR_UNEXPECTED = "unexpected error: {error!r}"
+
+
+def run_parallel(items, operation, parallel, ordered=True):
+    """
+    Run the coroutine function 'operation' on every item with at most 'parallel'
+    of them in flight, all from one event loop.
+
+    'operation(item)' returns a '(succeeded, message)' pair. The messages are
+    printed in the order of 'items' or, if 'ordered' is false, as soon as each
+    operation completes. A summary follows, and the combined exit code (0 if
+    every operation succeeded, otherwise 1) is returned.
+    """
+    outcomes = {}
+    try:
+        asyncio.run(_run_all(items, operation, parallel, ordered, outcomes))
+    except KeyboardInterrupt:
+        _print_summary(items, outcomes)
+        echo_error(
+            PARALLEL_INTERRUPTED.format(
+                pending=len(items) - len(outcomes), total=len(items)
+            )
+        )
+        sys.exit(130)
+
+    return _print_summary(items, outcomes)
+
+
+def request_operation(endpoint, id_var, success=200):
+    """
+    An operation for 'run_parallel' that calls the 'asyncio_detailed' variant
+    'endpoint' with the item as its 'id_var' argument.
+    """
+
+    async def operation(item):
+        response = await async_request(endpoint, {id_var: item})
+        return response_outcome(response, success)
+
+    return operation
+
+
+def response_outcome(response, success=200):
+    """The '(succeeded, message)' pair of an 'IdResponse'/'ErrorResponse' response."""
+    if response is None:
+        return False, "no response from kleened"
+
+    if response.status_code == success:
+        return True, response.parsed.id
+
+    message = getattr(response.parsed, "message", None)
+    if message is None:
+        return False, "unknown backend error"
+
+    return False, message
+
+
+async def _run_all(items, operation, parallel, ordered, outcomes):
+    from websockets.exceptions import WebSocketException
+
+    semaphore = asyncio.Semaphore(parallel)
+
+    async def run_one(index, item):
+        async with semaphore:
+            try:
+                outcomes[index] = await operation(item)
+            except (
+                httpx.HTTPError,
+                WebSocketException,
+                OSError,
+            ) as e:
+                outcomes[index] = (False, ERROR_CONNECTION.format(error=e))
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                # Reported as the failure of this item, the others carry on
+                outcomes[index] = (False, ERROR_UNEXPECTED.format(error=e))
+
+        return index
+
+    tasks = [asyncio.ensure_future(run_one(n, item)) for n, item in enumerate(items)]
+    try:
+        if ordered:
+            for task in tasks:
+                _print_outcome(items, await task, outcomes)
+        else:
+            for task in asyncio.as_completed(tasks):
+                _print_outcome(items, await task, outcomes)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await close_async_client()
+
+
+def _print_outcome(items, index, outcomes):
+    succeeded, message = outcomes[index]
+    if succeeded:
+        echo_bold(message)
+    else:
+        echo_error(f"{items[index]}: {message}")
+
+
+def _print_summary(items, outcomes):
+    failed = [
+        items[n] for n, (succeeded, _) in sorted(outcomes.items()) if not succeeded
+    ]
+    echo_bold(
+        PARALLEL_SUMMARY.format(succeeded=len(outcomes) - len(failed), total=len(items))
+    )
+    if failed:
+        echo_error(PARALLEL_FAILED.format(items=", ".join(failed)))
+        return 1
+
+    return 0
@@ -1,28 +1,53 @@
+import re
+import sys
 import json
 import inspect
+import itertools
 from gettext import gettext
 
 import click
 from click.core import HelpFormatter, Context
 
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich.text import Text
-from rich.markdown import Markdown
-from rich.markup import escape
-from rich import box
-
+from . import jsoncodec
 from .config import config
 
 from .docs_generator import DocsGroup, DocsCommand
+from .shortcuts import SHORTCUTS
 
-console = Console()
+# rich is only imported once something is printed with it. See 'console'.
+_console = None
 
 THEME_FANCY = "fancy"
 THEME_SIMPLE = "simple"
 THEME_DOCSGENERATOR = "docs-generator"
 
+# Tables with more rows than this are printed with 'print_plain_table', even to a
+# terminal, since rich takes seconds to lay out tens of thousands of rows.
+PLAIN_TABLE_THRESHOLD = 1000
+
+# Rows laid out and written at a time by 'print_plain_table'
+PLAIN_TABLE_BATCH_SIZE = 1000
+
+# Markup tags as recognized by rich, e.g., '[b bright_blue]' or '[/green]'
+MARKUP_TAG = re.compile(r"(?<!\\)\[[a-z#/@][^[]*?]")
+
+
+def console():
+    """
+    The rich console used for all of klee's output, created on first use.
+
+    Importing rich is a considerable part of klee's startup time, so commands that
+    never print through rich should not pay for it.
+    """
+    global _console  # pylint: disable=global-statement
+
+    if _console is None:
+        from rich.console import Console
+
+        _console = Console()
+
+    return _console
+
 
 def echo_bold(msg):
     style = None
@@ -30,7 +55,7 @@ def echo_bold(msg):
     if config.theme == THEME_FANCY:
         style = "bold"
 
-    console.print(msg, style=style)
+    console().print(msg, style=style)
 
 
 def echo(msg, newline=True):
@@ -43,7 +68,9 @@ def echo_error(msg):
     if config.theme == THEME_FANCY:
         style = "bold red"
 
-    console.print(escape(msg), style=style)
+    from rich.markup import escape
+
+    console().print(escape(msg), style=style)
 
 
 def connection_closed_unexpectedly():
@@ -96,21 +123,34 @@ def print_websocket_closing(msg, attributes):
         echo_bold(msg[attrib])
 
 
-def print_json(response):
+def print_json_stream(response):
+    """Write the body of a streamed JSON response to stdout as it is received."""
+    sys.stdout.flush()
+    stdout = sys.stdout.buffer
+    for chunk in response.iter_bytes():
+        stdout.write(chunk)
+
+    stdout.write(b"\n")
+    stdout.flush()
+
+
+def print_json_pretty(response):
+    """Pretty-print the body of a streamed JSON response, without decoding models."""
+    content = response.read()
     if config.theme == THEME_FANCY:
-        console.print_json(json.dumps(response.parsed.to_dict()))
+        console().print_json(content.decode())
 
     elif config.theme == THEME_SIMPLE:
-        click.echo(json.dumps(response.parsed.to_dict(), indent=2))
+        click.echo(json.dumps(jsoncodec.loads(content), indent=2))
 
-    # # OpenAPI-spec printing
-    # from rich.pretty import pprint
-    # pprint(response.parsed)
+
+def print_streamed_response_msg(response):
+    echo_bold(jsoncodec.loads(response.read())["message"])
 
 
 def print_json_raw(json_obj):
     if config.theme == THEME_FANCY:
-        console.print_json(json_obj)
+        console().print_json(json_obj)
 
     elif config.theme == THEME_SIMPLE:
         click.echo(json.dumps(json_obj, indent=2))
@@ -134,6 +174,24 @@ def is_running_str(running):
 
 
 def print_table(items, columns):
+    """
+    Print the rows 'items', any iterable of lists of cells, as a table. Tables that
+    are not printed to a terminal, or have more than 'PLAIN_TABLE_THRESHOLD' rows,
+    are printed with 'print_plain_table' while the rows are still being produced.
+    """
+    if not sys.stdout.isatty():
+        print_plain_table(items, columns)
+        return
+
+    items = iter(items)
+    head = list(itertools.islice(items, PLAIN_TABLE_THRESHOLD + 1))
+    if len(head) > PLAIN_TABLE_THRESHOLD:
+        print_plain_table(itertools.chain(head, items), columns)
+        return
+
+    from rich.table import Table
+    from rich import box
+
     if config.theme == THEME_FANCY:
         table = Table(show_edge=False, box=box.SIMPLE)
     else:
@@ -147,10 +205,80 @@ def print_table(items, columns):
                 kwargs.pop("style")
             table.add_column(column_name, **kwargs)
 
-    for item in items:
+    for item in head:
         table.add_row(*item)
 
-    console.print(table, soft_wrap=True)
+    console().print(table, soft_wrap=True)
+
+
+def print_plain_table(items, columns):
+    """
+    Print a table laid out like 'print_table' does, but without rich.
+
+    Markup is stripped and cells that are not strings are converted, with None
+    printed as an empty cell. The rows are written in batches of
+    'PLAIN_TABLE_BATCH_SIZE' as they are produced, so only one batch is held in
+    memory. The column widths are those of the first batch; later cells that are
+    wider are written in full, unless the column has a 'max_width'. Column options
+    other than 'min_width', 'max_width' and 'justify' are ignored.
+    """
+    from .client.types import Unset
+
+    rows = ([_plain_cell(cell, Unset) for cell in item] for item in items)
+    batch = list(itertools.islice(rows, PLAIN_TABLE_BATCH_SIZE))
+
+    layout = []
+    for n, (column_name, kwargs) in enumerate(columns):
+        width = max(
+            len(column_name),
+            kwargs.get("min_width", 0),
+            max((len(cells[n]) for cells in batch), default=0),
+        )
+        max_width = kwargs.get("max_width")
+        if max_width is not None:
+            width = min(width, max_width)
+        layout.append((width, kwargs.get("justify", "left"), max_width is not None))
+
+    if config.theme == THEME_FANCY:
+        separator = "   "
+        rule = "─" * (sum(width + 3 for width, _, _ in layout) - 1)
+    else:
+        separator = " | "
+        rule = "+".join("-" * (width + 2) for width, _, _ in layout)
+
+    def line(cells):
+        fitted = (_fit(cell, *column) for cell, column in zip(cells, layout))
+        return f" {separator.join(fitted)} \n"
+
+    out = sys.stdout
+    out.write(line([column_name for column_name, _ in columns]) + rule + "\n")
+    while batch:
+        out.write("".join(map(line, batch)))
+        batch = list(itertools.islice(rows, PLAIN_TABLE_BATCH_SIZE))
+
+    out.flush()
+
+
+def _plain_cell(cell, unset_type):
+    if cell is None or isinstance(cell, unset_type):
+        # As rich prints None, and unset fields of models
+        return ""
+
+    return MARKUP_TAG.sub("", cell if isinstance(cell, str) else str(cell))
+
+
+def _fit(cell, width, justify, truncate=True):
+    excess = width - len(cell)
+    if excess < 0:
+        return cell[: width - 1] + "…" if truncate else cell
+
+    if justify == "right":
+        return " " * excess + cell
+
+    if justify == "center":
+        return " " * (excess // 2) + cell + " " * (excess - excess // 2)
+
+    return cell + " " * excess
 
 
 class RootGroup(click.Group):
@@ -196,7 +324,7 @@ class RichGroup(click.Group):
         print_options_section(self, ctx)
         print_commands_section(self, ctx)
         if ctx.command_path == "klee":
-            print_shortcuts_section(self)
+            print_shortcuts_section(self, ctx)
 
 
 class RichCommand(click.Command):
@@ -250,11 +378,16 @@ def root_cls():
 SINGLE_SHORTCUTS = {"build", "create", "exec", "restart", "start", "stop", "run"}
 
 
-def print_shortcuts_section(self):
+def print_shortcuts_section(self, ctx):
+    from rich.table import Table
+    from rich.panel import Panel
+    from rich.text import Text
+    from rich.markdown import Markdown
+
     commands_table = Table(highlight=True, box=None, show_header=False)
 
-    # commands = []
-    for name, command in self.commands.items():
+    for name in SHORTCUTS:
+        command = self.get_command(ctx, name)
         # Hidden commands are the shortcuts
         if command.hidden and command.name in SINGLE_SHORTCUTS:
             cmd_help = command.get_short_help_str(limit=200)
@@ -268,12 +401,17 @@ def print_shortcuts_section(self):
     commands_table.add_row(Text("isX", style="bold yellow"), Markdown(is_help))
     commands_table.add_row(Text("rmX", style="bold yellow"), Markdown(rm_help))
     commands_table.add_row(Text("lsX", style="bold yellow"), Markdown(ls_help))
-    console.print(
+    console().print(
         Panel(commands_table, border_style="dim", title="Shortcuts", title_align="left")
     )
 
 
 def print_commands_section(self, ctx):
+    from rich.table import Table
+    from rich.panel import Panel
+    from rich.text import Text
+    from rich.markdown import Markdown
+
     commands_table = Table(highlight=True, box=None, show_header=False)
 
     commands = []
@@ -293,18 +431,20 @@ def print_commands_section(self, ctx):
         subcommand = Text(subcommand, style="bold green")
         commands_table.add_row(subcommand, cmd_help)
 
-    console.print(
+    console().print(
         Panel(commands_table, border_style="dim", title="Commands", title_align="left")
     )
 
 
 def print_usage_line(self, ctx):
+    from rich.text import Text
+
     pieces = []
     pieces.append(ctx.command_path)
     for piece in self.collect_usage_pieces(ctx):
         pieces.append(piece)
 
-    console.print(Text("Usage: ") + Text(" ".join(pieces), style="bold"))
+    console().print(Text("Usage: ") + Text(" ".join(pieces), style="bold"))
 
 
 def print_help_section(self):
@@ -316,9 +456,12 @@ def print_help_section(self):
         text = ""
 
     if text:
+        from rich.table import Table
+        from rich.markdown import Markdown
+
         help_table = Table(highlight=True, box=None, show_header=False, padding=(1, 2))
         help_table.add_row(Markdown(text))
-        console.print(help_table)
+        console().print(help_table)
 
 
 def no_formatting(text):
@@ -326,6 +469,11 @@ def no_formatting(text):
 
 
 def print_options_section(self, ctx):
+    from rich.table import Table
+    from rich.panel import Panel
+    from rich.text import Text
+    from rich.markdown import Markdown
+
     # Building options section
     options_table = Table(highlight=True, box=None, show_header=False)
     style_opt = "bold cyan"
@@ -358,6 +506,6 @@ def print_options_section(self, ctx):
 
         options_table.add_row(opt1, opt2, Markdown(help_))
 
-    console.print(
+    console().print(
         Panel(options_table, border_style="dim", title="Options", title_align="left")
     )
@@ -1,5 +1,6 @@
 import sys
 import argparse
+import importlib
 from urllib.parse import urlparse
 
 import click
@@ -11,6 +12,87 @@ ERROR_INVALID_CONFIG = (
 )
 
 
+SUBCOMMANDS = {
+    # Format: <command name>: (<module>, <click group object>)
+    "container": ("container", "root"),
+    "image": ("image", "root"),
+    "network": ("network", "root"),
+    "volume": ("volume", "root"),
+}
+
+SHORTCUT_COMMANDS = {
+    # This is all the actual shortcuts.
+    # The 'Shortcuts' help section prints a compacted list. See 'printing.py' for details.
+    # Format: <shortcut name>: (<module>, <factory of the click command object>)
+    "build": ("image", "image_build"),
+    "create": ("container", "container_create"),
+    "cp": ("container", "container_cp"),
+    "sync": ("container", "container_sync"),
+    "exec": ("container", "container_exec"),
+    "restart": ("container", "container_restart"),
+    "start": ("container", "container_start"),
+    "stop": ("container", "container_stop"),
+    "run": ("container", "container_run"),
+    "isc": ("container", "container_inspect"),
+    "isi": ("image", "image_inspect"),
+    "isn": ("network", "network_inspect"),
+    "isv": ("volume", "volume_inspect"),
+    "lsc": ("container", "container_list"),
+    "lsi": ("image", "image_list"),
+    "lsn": ("network", "network_list"),
+    "lsv": ("volume", "volume_list"),
+    "rmc": ("container", "container_remove"),
+    "rmi": ("image", "image_remove"),
+    "rmn": ("network", "network_remove"),
+    "rmv": ("volume", "volume_remove"),
+}
+
+
+def lazy_group_cls(cls):
+    """
+    Extend the click group class 'cls' to import the module of a subcommand only
+    when the subcommand is used.
+
+    Every command module imports the API client, httpx and its share of the
+    generated models, which takes far longer than the command itself for
+    something like 'klee lsc'. Only the modules actually needed are imported.
+    """
+
+    class LazyGroup(cls):
+        def __init__(self, *args, lazy_commands=None, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.lazy_commands = {} if lazy_commands is None else lazy_commands
+
+        def list_commands(self, ctx):
+            return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands))
+
+        def get_command(self, ctx, cmd_name):
+            if cmd_name not in self.commands and cmd_name in self.lazy_commands:
+                self.add_command(self._load_command(cmd_name), name=cmd_name)
+
+            return super().get_command(ctx, cmd_name)
+
+        def _load_command(self, cmd_name):
+            module_name, attribute = self.lazy_commands[cmd_name]
+            module = importlib.import_module(f".{module_name}", __package__)
+            command = getattr(module, attribute)
+            if isinstance(command, click.Command):
+                return command
+
+            # A factory of shortcuts, e.g., 'container_list' for 'lsc'
+            return command(cmd_name, hidden=True)
+
+    return LazyGroup
+
+
+def close_client():
+    """Close the connection pool to kleened, if the command made any requests."""
+    # klee.connection (and with it httpx) is only imported by commands that need it
+    connection = sys.modules.get(f"{__package__}.connection")
+    if connection is not None:
+        connection.close_client()
+
+
 def bootstrap_theme_and_config_args():
     parser = argparse.ArgumentParser(prog="bootstrap-config-file", add_help=False)
     parser.add_argument("--theme")
@@ -28,62 +110,13 @@ def create_cli():
     config.update_bootstrap_options(config_file, theme)
     config.load_config_file()
 
-    from .container import (
-        root as container_root,
-        container_create,
-        container_remove,
-        container_inspect,
-        container_exec,
-        container_list,
-        container_start,
-        container_stop,
-        container_restart,
-        container_run,
-    )
-
     from .printing import root_cls
-    from .image import (
-        root as image_root,
-        image_list,
-        image_build,
-        image_remove,
-        image_inspect,
-    )
-    from .network import (
-        root as network_root,
-        network_list,
-        network_remove,
-        network_inspect,
+
+    @click.group(
+        cls=lazy_group_cls(root_cls()),
+        name="klee",
+        lazy_commands={**SUBCOMMANDS, **SHORTCUT_COMMANDS},
     )
-    from .volume import root as volume_root, volume_list, volume_remove, volume_inspect
-    from .shortcuts import SHORTCUTS
-
-    shortcuts2command_obj = {
-        # This is all the actual shortcuts.
-        # The 'Shortcuts' help section prints a compacted list. See 'printing.py' for details.
-        # Format: <shortcut name>: <actual click command object>
-        "build": image_build("build", hidden=True),
-        "create": container_create("create", hidden=True),
-        "exec": container_exec("exec", hidden=True),
-        "restart": container_restart("restart", hidden=True),
-        "start": container_start("start", hidden=True),
-        "stop": container_stop("stop", hidden=True),
-        "run": container_run("run", hidden=True),
-        "isc": container_inspect("isc", hidden=True),
-        "isi": image_inspect("isi", hidden=True),
-        "isn": network_inspect("isn", hidden=True),
-        "isv": volume_inspect("isv", hidden=True),
-        "lsc": container_list("lsc", hidden=True),
-        "lsi": image_list(name="lsi", hidden=True),
-        "lsn": network_list(name="lsn", hidden=True),
-        "lsv": volume_list(name="lsv", hidden=True),
-        "rmc": container_remove("rmc", hidden=True),
-        "rmi": image_remove("rmi", hidden=True),
-        "rmn": network_remove("rmn", hidden=True),
-        "rmv": volume_remove("rmv", hidden=True),
-    }
-
-    @click.group(cls=root_cls(), name="klee")
     @click.version_option(version="0.0.1")
     @click.option("--config", default=None, help="Location of Klee config file.")
     @click.option(
@@ -139,13 +172,7 @@ def create_cli():
 
         config.host = urlparse(config.host)
 
-    cli.add_command(container_root, name="container")
-    cli.add_command(image_root, name="image")
-    cli.add_command(network_root, name="network")
-    cli.add_command(volume_root, name="volume")
-
-    for name in SHORTCUTS.keys():
-        shortcut = shortcuts2command_obj[name]
-        cli.add_command(shortcut)
+        # All requests of a command share one pooled connection to kleened
+        ctx.call_on_close(close_client)
 
     return cli
@@ -0,0 +1,105 @@
+from .client.types import UNSET
+from .client.models.container_summary import ContainerSummary
+from .client.models.container_restart_policy import ContainerRestartPolicy
+from .client.models.image import Image
+from .client.models.network import Network
+from .client.models.network_type import NetworkType
+from .client.models.volume import Volume
+
+
+class RowView:
+    """
+    A read-only view of one object of a list response, used in place of its model.
+
+    Building a model decodes and copies every field of the object, while a listing
+    only shows a few of them. A view keeps the decoded JSON object and decodes the
+    'fields' and 'enum_fields' of the subclass when they are accessed, with the
+    same values as the model would have. Any other attribute, e.g., 'to_dict' or a
+    field with nested models, is taken from the full model, built on first use.
+    """
+
+    __slots__ = ("_source", "_model")
+
+    model = None
+    fields = ()
+    enum_fields = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name in cls.fields:
+            setattr(cls, name, _Field(name))
+
+        for name, enum in cls.enum_fields.items():
+            setattr(cls, name, _Field(name, enum))
+
+    def __init__(self, source):
+        self._source = source
+        self._model = None
+
+    @classmethod
+    def from_dict(cls, src_dict):
+        return cls(src_dict)
+
+    def to_model(self):
+        if self._model is None:
+            self._model = self.model.from_dict(self._source)
+
+        return self._model
+
+    def __getattr__(self, name):
+        # Only called for attributes that are not fields of the view
+        return getattr(self.to_model(), name)
+
+
+class _Field:
+    __slots__ = ("name", "enum")
+
+    def __init__(self, name, enum=None):
+        self.name = name
+        self.enum = enum
+
+    def __get__(self, view, owner):
+        if view is None:
+            return self
+
+        value = view._source.get(self.name, UNSET)  # pylint: disable=protected-access
+        if self.enum is None or value is None or value is UNSET:
+            return value
+
+        return self.enum(value)
+
+
+class ContainerSummaryView(RowView):
+    __slots__ = ()
+    model = ContainerSummary
+    fields = (
+        "id",
+        "name",
+        "image_id",
+        "image_name",
+        "image_tag",
+        "cmd",
+        "created",
+        "running",
+        "jid",
+    )
+    enum_fields = {"restart_policy": ContainerRestartPolicy}
+
+
+class ImageView(RowView):
+    __slots__ = ()
+    model = Image
+    fields = ("id", "name", "tag", "created")
+
+
+class NetworkView(RowView):
+    __slots__ = ()
+    model = Network
+    fields = ("id", "name", "subnet")
+    enum_fields = {"type": NetworkType}
+
+
+class VolumeView(RowView):
+    __slots__ = ()
+    model = Volume
+    fields = ("name", "created")
@@ -0,0 +1,116 @@
+import re
+from contextlib import asynccontextmanager
+
+from . import jsoncodec
+from .client.api.default.exec_create import (
+    asyncio_detailed as exec_create_async_endpoint,
+)
+from .client.models.exec_config import ExecConfig
+from .connection import async_request, create_websocket
+from .parallel import response_outcome
+
+WS_EXEC_START_ENDPOINT = "/exec/start"
+
+ERROR_EXEC_NOT_STARTED = "error starting the execution"
+
+# E.g., 'executable 4a1d... and its container exited with exit-code 0'
+EXIT_CODE = re.compile(r"exit-code (-?\d+)")
+
+
+class ExecError(Exception):
+    """An execution could not be created or started, or it failed."""
+
+
+@asynccontextmanager
+async def exec_session(container_id, cmd, tty=False, env=(), user=""):
+    """
+    Run 'cmd' in the container, starting it if needed, and yield the websocket
+    attached to it once it has started. Unlike 'klee exec', nothing is printed.
+
+    Frames received on the websocket are the output of the process, and frames
+    sent are its input. Raises 'ExecError' if the execution could not be created
+    or started. The caller closes the shared async client when done with it.
+    """
+    from websockets.exceptions import ConnectionClosed
+
+    exec_config = ExecConfig.from_dict(
+        {
+            "container_id": container_id,
+            "cmd": list(cmd),
+            "env": list(env),
+            "user": user,
+            "tty": tty,
+        }
+    )
+    response = await async_request(
+        exec_create_async_endpoint, {"json_body": exec_config}
+    )
+
+    created, message = response_outcome(response, success=201)
+    if not created:
+        raise ExecError(message)
+
+    async with create_websocket(WS_EXEC_START_ENDPOINT) as websocket:
+        await websocket.send(
+            jsoncodec.dumps(
+                {"exec_id": message, "attach": True, "start_container": True}
+            )
+        )
+        try:
+            start_msg = jsoncodec.loads(await websocket.recv())
+        except ConnectionClosed:
+            start_msg = closing_message(websocket)
+
+        if start_msg.get("msg_type") != "starting":
+            reason = start_msg.get("message") or ERROR_EXEC_NOT_STARTED
+            raise ExecError(reason)
+
+        yield websocket
+
+
+async def collect_output(websocket):
+    """All frames received on 'websocket' until it is closed."""
+    from websockets.exceptions import ConnectionClosed
+
+    output = []
+    while True:
+        try:
+            output.append(await websocket.recv())
+        except ConnectionClosed:
+            return output
+
+
+def check_exit(websocket, output):
+    """
+    Raise 'ExecError' unless the process of the closed 'websocket' exited with
+    0. The error has the 'output' of the process, if any, or the closing message.
+    """
+    closing = closing_message(websocket)
+    if exit_code(closing) == 0:
+        return
+
+    text = "".join(
+        frame.decode(errors="replace") if isinstance(frame, bytes) else frame
+        for frame in output
+    ).strip()
+    raise ExecError(text or closing.get("message"))
+
+
+def closing_message(websocket):
+    """The message of a closed execution websocket, e.g., with its exit code."""
+    try:
+        return jsoncodec.loads(websocket.close_reason or "{}")
+    except jsoncodec.JSONDecodeError:
+        return {"msg_type": "error", "message": websocket.close_reason, "data": ""}
+
+
+def exit_code(closing):
+    """
+    The exit code of the process from the 'closing_message' of its websocket, or
+    None if it did not exit normally, e.g., if kleened reported an error.
+    """
+    if closing.get("msg_type") != "closing":
+        return None
+
+    match = EXIT_CODE.search(closing.get("message", ""))
+    return None if match is None else int(match.group(1))
@@ -2,6 +2,8 @@ SHORTCUTS = {
     # Format: (<shortcut name>, <source command>)
     "build": "image build",
     "create": "container create",
+    "cp": "container cp",
+    "sync": "container sync",
     "exec": "container exec",
     "start": "container start",
     "stop": "container stop",
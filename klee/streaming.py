@@ -0,0 +1,308 @@
+import io
+import os
+import sys
+import tty
+import stat
+import time
+import select
+import asyncio
+import termios
+import functools
+from contextlib import contextmanager
+
+import click
+
+from . import jsoncodec
+
+# Frames received but not yet written. When it is full, frames are no longer
+# read from the websocket, whose own queue then fills up and stops reading from
+# the connection, so a slow reader of stdout slows down the sender.
+OUTPUT_QUEUE_SIZE = 64
+
+# Frames already received are joined into writes of up to this size
+OUTPUT_WRITE_SIZE = 256 * 1024
+
+# Input is read and sent in frames of up to this size
+INPUT_READ_SIZE = 64 * 1024
+
+# Frames read from stdin but not yet sent. When it is full, reading is paused.
+INPUT_QUEUE_SIZE = 16
+
+OUTPUT_STATS = (
+    "{size} written in {seconds:.2f}s ({rate}/s), {frames} frames in {writes} writes"
+)
+
+
+class OutputStats:
+    """Throughput of the output relayed by 'relay_output'."""
+
+    def __init__(self):
+        self.started = None
+        self.finished = None
+        self.bytes = 0
+        self.frames = 0
+        self.writes = 0
+
+    def print_stats(self):
+        seconds = self.finished - self.started
+        rate = self.bytes / seconds if seconds > 0 else 0
+        click.echo(
+            OUTPUT_STATS.format(
+                size=human_size(self.bytes),
+                seconds=seconds,
+                rate=human_size(rate),
+                frames=self.frames,
+                writes=self.writes,
+            ),
+            err=True,
+        )
+
+
+async def relay_output(websocket, fileno=None, stats=None):
+    """
+    Write the frames received on 'websocket' to the file descriptor 'fileno' (stdout
+    by default) as bytes until it is closed, and return the decoded close reason.
+
+    The writes are done by a separate task in a worker thread, so that a slow
+    reader does not block the event loop. Frames that arrive while a write is in
+    progress are joined into the next write. Once the reader of the output is
+    gone, e.g., 'klee exec db cat log | head', the rest of it is discarded.
+    """
+    from websockets.exceptions import ConnectionClosed
+
+    write = _output_writer(fileno)
+    stats = OutputStats() if stats is None else stats
+    stats.started = time.perf_counter()
+    # Anything echoed before must come out before the output
+    sys.stdout.flush()
+
+    queue = asyncio.Queue(maxsize=OUTPUT_QUEUE_SIZE)
+    writer = asyncio.ensure_future(_write_frames(queue, write, stats))
+    try:
+        while True:
+            try:
+                frame = await websocket.recv()
+            except ConnectionClosed:
+                break
+
+            if writer.done():
+                # Writing failed, which is raised below
+                break
+
+            stats.frames += 1
+            await queue.put(frame)
+    finally:
+        if not writer.done():
+            await queue.put(None)
+        await writer
+        stats.finished = time.perf_counter()
+
+    return jsoncodec.loads(websocket.close_reason)
+
+
+async def _write_frames(queue, write, stats):
+    loop = asyncio.get_running_loop()
+    done = discarding = False
+    while not done:
+        chunks, size = [], 0
+        frame = await queue.get()
+        while True:
+            if frame is None:
+                done = True
+                break
+
+            chunks.append(_as_bytes(frame))
+            size += len(chunks[-1])
+            if size >= OUTPUT_WRITE_SIZE or queue.empty():
+                break
+
+            frame = queue.get_nowait()
+
+        if chunks and not discarding:
+            try:
+                await loop.run_in_executor(None, write, b"".join(chunks))
+            except BrokenPipeError:
+                discarding = True
+                continue
+
+            stats.bytes += size
+            stats.writes += 1
+
+
+def _output_writer(fileno):
+    if fileno is not None:
+        return functools.partial(_write_all, fileno)
+
+    try:
+        return functools.partial(_write_all, sys.stdout.fileno())
+    except (AttributeError, io.UnsupportedOperation):
+        # E.g., click's 'CliRunner', which captures the output in memory
+        return _write_buffer
+
+
+def _as_bytes(frame):
+    if isinstance(frame, str):
+        return frame.encode()
+
+    return frame
+
+
+def _write_all(fileno, data):
+    view = memoryview(data)
+    while view:
+        try:
+            written = os.write(fileno, view)
+        except BlockingIOError:
+            # E.g., a terminal shared with a process that made it non-blocking
+            select.select([], [fileno], [])
+            continue
+
+        view = view[written:]
+
+
+def _write_buffer(data):
+    sys.stdout.buffer.write(data)
+    sys.stdout.buffer.flush()
+
+
+async def pump_input(websocket, fileno=None, eof_frame=None):
+    """
+    Send what is read from the file descriptor 'fileno' (stdin by default) to
+    'websocket' as binary frames, in order, until end of input or cancellation.
+
+    Whatever is available is read, up to 'INPUT_READ_SIZE' at a time, so piped
+    input is sent at the speed of the pipe while typed input is sent right away.
+    At the end of input, 'eof_frame' is sent, if given.
+    """
+    from websockets.exceptions import ConnectionClosed
+
+    fileno = _stdin_fileno() if fileno is None else fileno
+    queue = asyncio.Queue(maxsize=INPUT_QUEUE_SIZE)
+    reader = _InputReader(fileno, queue)
+    reader.start()
+    try:
+        while True:
+            data = await queue.get()
+            reader.resume()
+            if data is None:
+                break
+
+            await websocket.send(data)
+
+        if eof_frame is not None:
+            await websocket.send(eof_frame)
+
+    except ConnectionClosed:
+        # The execution has ended, which 'relay_output' reports
+        pass
+
+    finally:
+        reader.stop()
+
+
+class _InputReader:
+    """
+    Reads 'fileno' into 'queue' when it is readable, pausing while the queue is
+    full. Regular files, which cannot be waited on, are read in a worker thread,
+    as is the buffer of 'sys.stdin' if 'fileno' is None.
+    """
+
+    def __init__(self, fileno, queue):
+        self.fileno = fileno
+        self.queue = queue
+        self.loop = asyncio.get_running_loop()
+        self.reading = False
+        self.done = False
+        self.thread_read = None
+
+    def start(self):
+        if self.fileno is None:
+            buffer = sys.stdin.buffer
+            read = getattr(buffer, "read1", buffer.read)
+            self.thread_read = asyncio.ensure_future(self._read_in_thread(read))
+        elif stat.S_ISREG(os.fstat(self.fileno).st_mode):
+            read = functools.partial(os.read, self.fileno)
+            self.thread_read = asyncio.ensure_future(self._read_in_thread(read))
+        else:
+            self.resume()
+
+    def resume(self):
+        if self.reading or self.done or self.thread_read is not None:
+            return
+
+        self.loop.add_reader(self.fileno, self._read_available)
+        self.reading = True
+
+    def stop(self):
+        self.done = True
+        self._pause()
+        if self.thread_read is not None:
+            self.thread_read.cancel()
+
+    def _pause(self):
+        if self.reading:
+            self.loop.remove_reader(self.fileno)
+            self.reading = False
+
+    def _read_available(self):
+        try:
+            data = os.read(self.fileno, INPUT_READ_SIZE)
+        except BlockingIOError:
+            return
+
+        if data == b"":
+            self.done = True
+            self._pause()
+            self.queue.put_nowait(None)
+            return
+
+        self.queue.put_nowait(data)
+        if self.queue.full():
+            self._pause()
+
+    async def _read_in_thread(self, read):
+        while True:
+            data = await self.loop.run_in_executor(None, read, INPUT_READ_SIZE)
+            await self.queue.put(data or None)
+            if not data:
+                return
+
+
+@contextmanager
+def raw_terminal(fileno=None):
+    """
+    Put the terminal 'fileno' (stdin by default) in raw mode, so that every key
+    is sent as it is typed, and restore its settings afterwards. Does nothing if
+    it is not a terminal, e.g., for piped input.
+    """
+    fileno = _stdin_fileno() if fileno is None else fileno
+    if fileno is None or not os.isatty(fileno):
+        yield
+        return
+
+    settings = termios.tcgetattr(fileno)
+    tty.setraw(fileno, when=termios.TCSANOW)
+    try:
+        yield
+    finally:
+        termios.tcsetattr(fileno, termios.TCSADRAIN, settings)
+
+
+def _stdin_fileno():
+    try:
+        return sys.stdin.fileno()
+    except (AttributeError, io.UnsupportedOperation):
+        # E.g., click's 'CliRunner', which gives the input from memory
+        return None
+
+
+def human_size(size):
+    for unit in ["B", "KiB", "MiB", "GiB"]:
+        if size < 1024 or unit == "GiB":
+            break
+        size /= 1024
+
+    if unit == "B":
+        return f"{int(size)} {unit}"
+
+    return f"{size:.1f} {unit}"
@@ -0,0 +1,322 @@
+import os
+import sys
+import time
+import asyncio
+import hashlib
+import tarfile
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+import click
+
+from .connection import close_async_client
+from .printing import command_cls, echo_error
+from .session import ExecError, check_exit, collect_output, exec_session
+from .streaming import human_size
+from .transfer import TransferProgress, split_container_path, upload_archive
+from .utils import _exit_on_connection_errors
+from .watch import DEFAULT_INTERVAL, is_excluded, snapshot, wait_for_change
+
+HELP_EXCLUDE_FLAG = """
+Glob pattern of paths to leave out, matched against the path relative to LOCALDIR
+and against its last component, e.g., '*.pyc' or 'node_modules'. Excluded paths
+are not removed from the container either. Can be repeated.
+"""
+HELP_WATCH_FLAG = "Keep running and sync every change made to LOCALDIR."
+HELP_INTERVAL_FLAG = "Seconds between checks of LOCALDIR for changes with `--watch`."
+HELP_COMPRESS_FLAG = "Compress the files with gzip while they are transferred."
+HELP_QUIET_FLAG = "Do not print the progress of the transfer."
+
+ERROR_NO_CONTAINER_PATH = "DESTINATION must be of the form CONTAINER:DIR"
+ERROR_SYNC_FAILED = "syncing failed: {message}"
+
+SYNC_SUMMARY = (
+    "synced {changed} changed and {removed} removed files ({size}) in {seconds:.2f}s"
+)
+SYNC_UP_TO_DATE = "up to date"
+SYNC_WATCHING = "watching {directory} for changes"
+
+# Files are read in blocks of this size when hashing them
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# Paths removed per execution, keeping the command line well within ARG_MAX
+REMOVE_BATCH_SIZE = 1000
+
+# One execution lists the files in the container with the same digests as
+# 'file_digest'. FreeBSD's 'sha256 -r' prints '<digest> <path>' per file.
+MANIFEST_SCRIPT = (
+    'cd "$1" 2>/dev/null || exit 0; '
+    "find . \\( -type f -o -type l \\) -exec sha256 -r {} + 2>/dev/null; exit 0"
+)
+REMOVE_SCRIPT = 'cd "$1" && shift && exec rm -f -- "$@"'
+
+
+def container_sync(name, hidden=False):
+    @click.command(cls=command_cls(), name=name, hidden=hidden, no_args_is_help=True)
+    @click.option(
+        "--exclude", "-e", multiple=True, metavar="pattern", help=HELP_EXCLUDE_FLAG
+    )
+    @click.option(
+        "--watch",
+        "-w",
+        default=False,
+        is_flag=True,
+        metavar="flag",
+        help=HELP_WATCH_FLAG,
+    )
+    @click.option(
+        "--interval",
+        default=DEFAULT_INTERVAL,
+        type=click.FloatRange(min=0.1),
+        metavar="seconds",
+        show_default=True,
+        help=HELP_INTERVAL_FLAG,
+    )
+    @click.option(
+        "--compress",
+        "-z",
+        default=False,
+        is_flag=True,
+        metavar="flag",
+        help=HELP_COMPRESS_FLAG,
+    )
+    @click.option(
+        "--quiet",
+        "-q",
+        default=False,
+        is_flag=True,
+        metavar="flag",
+        help=HELP_QUIET_FLAG,
+    )
+    @click.argument("localdir", nargs=1, type=click.Path(exists=True, file_okay=False))
+    @click.argument("destination", nargs=1)
+    def sync(exclude, watch, interval, compress, quiet, localdir, destination):
+        """
+        Make a directory in a container a copy of a local directory.
+
+        DESTINATION is **CONTAINER:DIR**. Only files that differ from the ones in
+        DIR are transferred, and files in DIR that are not in LOCALDIR are removed.
+        """
+        container, directory = split_container_path(destination)
+        if container is None:
+            echo_error(ERROR_NO_CONTAINER_PATH)
+            sys.exit(1)
+
+        syncer = Syncer(localdir, container, directory, exclude, compress, quiet)
+        with _exit_on_connection_errors():
+            try:
+                succeeded = asyncio.run(_run_sync(syncer, watch, interval))
+            except KeyboardInterrupt:
+                sys.exit(130)
+
+        if not succeeded:
+            sys.exit(1)
+
+    return sync
+
+
+async def _run_sync(syncer, watch, interval):
+    try:
+        if not await syncer.sync(syncer.scan()) and not watch:
+            return False
+
+        if watch:
+            click.echo(SYNC_WATCHING.format(directory=syncer.root))
+            files = syncer.local_files
+            while True:
+                files = await wait_for_change(
+                    syncer.root, files, syncer.exclude, interval
+                )
+                await syncer.sync(files)
+    finally:
+        await close_async_client()
+
+    return True
+
+
+class Syncer:
+    """
+    Syncs the directory 'root' to 'directory' in 'container'.
+
+    The digests of the local files are kept between syncs, together with the
+    'snapshot' entry they were computed for, so only files changed since are
+    hashed again. After a successful sync the local manifest is taken as the
+    manifest of the container, so watching does not list the container on every
+    change.
+    """
+
+    def __init__(
+        self, root, container, directory, exclude=(), compress=False, quiet=False
+    ):
+        self.root = root
+        self.container = container
+        self.directory = directory or "."
+        self.exclude = tuple(exclude)
+        self.compress = compress
+        self.quiet = quiet
+        self.local_files = {}
+        self.remote = None
+        self._digests = {}
+
+    def scan(self):
+        return snapshot(self.root, self.exclude)
+
+    async def sync(self, files):
+        """
+        Transfer the changes needed to make the container match 'files', a
+        'snapshot' of 'root'. Returns whether it succeeded, after printing the
+        outcome.
+        """
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        self.local_files = files
+        self._digests = await loop.run_in_executor(
+            None, hash_files, self.root, files, self._digests
+        )
+        local = {path: digest for path, (_, digest) in self._digests.items()}
+        try:
+            if self.remote is None:
+                self.remote = await fetch_manifest(
+                    self.container, self.directory, self.exclude
+                )
+
+            changed, removed = compare_manifests(local, self.remote)
+            size = sum(files[path][0] for path in changed)
+            if removed:
+                await remove_files(self.container, self.directory, removed)
+
+            if changed:
+                progress = TransferProgress(self.quiet)
+                producer = functools.partial(_pack_files, self.root, changed)
+                await upload_archive(
+                    self.container, self.directory, producer, self.compress, progress
+                )
+                progress.clear()
+        except ExecError as e:
+            # The container is in an unknown state, so it is listed again next time
+            self.remote = None
+            echo_error(ERROR_SYNC_FAILED.format(message=e))
+            return False
+
+        self.remote = local
+        if changed or removed:
+            click.echo(
+                SYNC_SUMMARY.format(
+                    changed=len(changed),
+                    removed=len(removed),
+                    size=human_size(size),
+                    seconds=time.perf_counter() - started,
+                )
+            )
+        else:
+            click.echo(SYNC_UP_TO_DATE)
+
+        return True
+
+
+def file_digest(path):
+    """The SHA-256 hex digest of the file at 'path', following symbolic links."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(HASH_BLOCK_SIZE)
+            if not block:
+                break
+
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def hash_files(root, files, previous=None):
+    """
+    Hash the files of 'files', a 'snapshot' of 'root', on a thread per CPU.
+
+    Returns '{path: (stat, digest)}', reusing the digests of 'previous' (an
+    earlier result) for files with the same 'snapshot' entry. Files that cannot
+    be read, e.g., dangling symbolic links, are left out. hashlib releases the
+    GIL while hashing, so the threads use all cores.
+    """
+    previous = previous or {}
+    digests = {}
+    stale = []
+    for path, stat in files.items():
+        known = previous.get(path)
+        if known is not None and known[0] == stat:
+            digests[path] = known
+        else:
+            stale.append(path)
+
+    def _hash(path):
+        try:
+            return file_digest(os.path.join(root, path))
+        except OSError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for path, digest in zip(stale, executor.map(_hash, stale)):
+            if digest is not None:
+                digests[path] = (files[path], digest)
+
+    return digests
+
+
+def compare_manifests(local, remote):
+    """
+    The paths to transfer and the paths to remove to make the manifest 'remote'
+    equal to 'local', both as '{path: digest}'. Paths are sorted.
+    """
+    changed = sorted(
+        path for path, digest in local.items() if remote.get(path) != digest
+    )
+    removed = sorted(path for path in remote if path not in local)
+    return changed, removed
+
+
+def parse_manifest(output, exclude=()):
+    """'{path: digest}' from lines of '<digest> ./<path>' in 'output'."""
+    manifest = {}
+    for line in output.splitlines():
+        digest, separator, path = line.partition(" ")
+        if not separator:
+            continue
+
+        if path.startswith("./"):
+            path = path[2:]
+
+        if not is_excluded(path, exclude):
+            manifest[path] = digest
+
+    return manifest
+
+
+async def fetch_manifest(container, directory, exclude=()):
+    """The files in 'directory' of the container, see 'parse_manifest'."""
+    cmd = ["/bin/sh", "-c", MANIFEST_SCRIPT, "sh", directory]
+    async with exec_session(container, cmd) as websocket:
+        output = await collect_output(websocket)
+
+    check_exit(websocket, output)
+    text = "".join(
+        frame.decode(errors="surrogateescape") if isinstance(frame, bytes) else frame
+        for frame in output
+    )
+    return parse_manifest(text, exclude)
+
+
+async def remove_files(container, directory, paths):
+    for start in range(0, len(paths), REMOVE_BATCH_SIZE):
+        batch = paths[start : start + REMOVE_BATCH_SIZE]
+        cmd = ["/bin/sh", "-c", REMOVE_SCRIPT, "sh", directory, *batch]
+        async with exec_session(container, cmd) as websocket:
+            output = await collect_output(websocket)
+
+        check_exit(websocket, output)
+
+
+def _pack_files(root, paths, fileobj):
+    # Only the files themselves, directories are created as needed by tar
+    with tarfile.open(fileobj=fileobj, mode="w|", format=tarfile.PAX_FORMAT) as tar:
+        for path in paths:
+            tar.add(os.path.join(root, path), path, recursive=False)
+            tar.members.clear()
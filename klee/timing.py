@@ -0,0 +1,44 @@
+import time
+from contextlib import contextmanager
+
+from .printing import print_table
+
+TIMINGS_COLUMNS = [
+    ("PHASE", {"style": "bold aquamarine1"}),
+    ("START", {"style": "bright_white", "justify": "right"}),
+    ("DURATION", {"style": "cyan", "justify": "right"}),
+]
+
+
+class PhaseTimer:
+    """
+    Wall-clock time spent in the named phases of a command.
+
+    Phases may overlap, e.g., when a websocket is opened while HTTP requests are
+    still in flight, so each phase is reported with its start relative to the
+    creation of the timer.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, start, time.perf_counter()))
+
+    def print_timings(self):
+        rows = [
+            [name, _milliseconds(start - self.started), _milliseconds(end - start)]
+            for name, start, end in sorted(self.phases, key=lambda phase: phase[1])
+        ]
+        rows.append(["total", "", _milliseconds(time.perf_counter() - self.started)])
+        print_table(rows, TIMINGS_COLUMNS)
+
+
+def _milliseconds(seconds):
+    return f"{seconds * 1000:.1f} ms"
@@ -0,0 +1,464 @@
+import os
+import sys
+import time
+import zlib
+import queue
+import contextlib
+import shlex
+import asyncio
+import tarfile
+import functools
+import posixpath
+import threading
+
+import click
+
+from .connection import close_async_client
+from .printing import command_cls, echo_error
+from .session import ExecError, check_exit, collect_output, exec_session
+from .streaming import human_size
+from .utils import _exit_on_connection_errors
+
+HELP_COMPRESS_FLAG = "Compress the archive with gzip while it is transferred."
+HELP_QUIET_FLAG = "Do not print the progress and a summary of the transfer."
+
+ERROR_ONE_CONTAINER_PATH = (
+    "exactly one of SOURCE and DESTINATION must be of the form CONTAINER:PATH"
+)
+ERROR_COPY_FAILED = "copying failed: {message}"
+
+COPY_SUMMARY = "copied {size} in {seconds:.2f}s ({rate}/s)"
+COPY_PROGRESS = "\r{size} ({rate}/s) "
+
+# The archive is sent in frames of this size
+CHUNK_SIZE = 64 * 1024
+
+# Chunks between the thread (un)packing the archive and the websocket. This,
+# times the size of a frame, bounds the memory used regardless of the size of
+# the tree being copied.
+CHUNK_QUEUE_SIZE = 16
+
+# Compression is done on the fly, so speed matters more than ratio
+COMPRESS_LEVEL = 1
+
+# Seconds between updates of the progress display
+PROGRESS_INTERVAL = 0.2
+
+
+def container_cp(name, hidden=False):
+    @click.command(cls=command_cls(), name=name, hidden=hidden, no_args_is_help=True)
+    @click.option(
+        "--compress",
+        "-z",
+        default=False,
+        is_flag=True,
+        metavar="flag",
+        help=HELP_COMPRESS_FLAG,
+    )
+    @click.option(
+        "--quiet",
+        "-q",
+        default=False,
+        is_flag=True,
+        metavar="flag",
+        help=HELP_QUIET_FLAG,
+    )
+    @click.argument("source", nargs=1)
+    @click.argument("destination", nargs=1)
+    def cp(compress, quiet, source, destination):
+        """
+        Copy files and directories between a container and the host.
+
+        One of SOURCE and DESTINATION is **CONTAINER:PATH** and the other a path on
+        the host. SOURCE is copied into the directory DESTINATION, which is created
+        if it does not exist. A host path of '-' reads a tar archive from STDIN or
+        writes one to STDOUT.
+        """
+        src_container, src_path = split_container_path(source)
+        dst_container, dst_path = split_container_path(destination)
+        if (src_container is None) == (dst_container is None):
+            echo_error(ERROR_ONE_CONTAINER_PATH)
+            sys.exit(1)
+
+        progress = TransferProgress(quiet)
+        if dst_container is not None:
+            copy = _copy_to_container(
+                src_path, dst_container, dst_path, compress, progress
+            )
+        else:
+            copy = _copy_from_container(
+                src_container, src_path, dst_path, compress, progress
+            )
+
+        with _exit_on_connection_errors():
+            succeeded = asyncio.run(_run_copy(copy))
+
+        if not succeeded:
+            sys.exit(1)
+
+        progress.print_summary()
+
+    return cp
+
+
+def split_container_path(argument):
+    """
+    Split 'CONTAINER:PATH' into its parts, or return '(None, argument)' for a path
+    on the host. As with 'docker cp', a path with a '/' before any ':' is local.
+    """
+    container, separator, path = argument.partition(":")
+    if not separator or "/" in container or container in ("", "."):
+        return None, argument
+
+    return container, path
+
+
+async def _run_copy(copy):
+    try:
+        await copy
+    except ExecError as e:
+        echo_error(ERROR_COPY_FAILED.format(message=e))
+        return False
+    finally:
+        await close_async_client()
+
+    return True
+
+
+async def _copy_to_container(path, container, directory, compress, progress):
+    if path == "-":
+        producer = _copy_stdin
+    else:
+        producer = functools.partial(_pack, path)
+
+    await upload_archive(container, directory, producer, compress, progress)
+
+
+async def upload_archive(container, directory, producer, compress, progress):
+    """
+    Extract the tar archive written by 'producer' (see 'ArchiveWriter') into
+    'directory' in the container, creating it if needed. Raises 'ExecError' if
+    it fails.
+    """
+    directory = shlex.quote(directory or ".")
+    # tar detects a gzip compressed archive by itself
+    cmd = f"mkdir -p {directory} && tar -x -f - -C {directory}"
+    writer = ArchiveWriter(producer, compress)
+    async with exec_session(container, ["/bin/sh", "-c", cmd]) as websocket:
+        receiving = asyncio.ensure_future(collect_output(websocket))
+        writer.start()
+        try:
+            await send_chunks(websocket, writer, progress)
+        finally:
+            writer.abort()
+
+        output = await receiving
+
+    if writer.error is not None:
+        raise ExecError(writer.error)
+
+    check_exit(websocket, output)
+
+
+async def _copy_from_container(container, path, directory, compress, progress):
+    parent, name = posixpath.split(posixpath.normpath(path))
+    options = "-c -z" if compress else "-c"
+    # The output must only be the archive, so errors are left to the exit code
+    cmd = (
+        f"tar {options} -f - -C {shlex.quote(parent or '/')} {shlex.quote(name)}"
+        " 2>/dev/null"
+    )
+    if directory == "-":
+        # The archive is written as it is, compressed or not
+        reader = ArchiveReader(_copy_stdout, decompress=False)
+    else:
+        reader = ArchiveReader(functools.partial(_unpack, directory), compress)
+
+    async with exec_session(container, ["/bin/sh", "-c", cmd]) as websocket:
+        reader.start()
+        try:
+            await receive_chunks(websocket, reader, progress)
+        finally:
+            await reader.finish()
+
+    if reader.error is not None:
+        raise ExecError(reader.error)
+
+    check_exit(websocket, [])
+
+
+async def send_chunks(websocket, writer, progress):
+    """
+    Send the chunks of 'writer' in order until its end, or until the websocket is
+    closed, e.g., because the receiving process failed.
+    """
+    from websockets.exceptions import ConnectionClosed
+
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            chunk = writer.chunks.get_nowait()
+        except queue.Empty:
+            chunk = await loop.run_in_executor(None, writer.chunks.get)
+
+        if chunk is None:
+            return
+
+        try:
+            await websocket.send(chunk)
+        except ConnectionClosed:
+            return
+
+        progress.add(len(chunk))
+
+
+async def receive_chunks(websocket, reader, progress):
+    """Pass the frames received on the websocket to 'reader' until it is closed."""
+    from websockets.exceptions import ConnectionClosed
+
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            frame = await websocket.recv()
+        except ConnectionClosed:
+            return
+
+        if isinstance(frame, str):
+            frame = frame.encode()
+
+        try:
+            reader.chunks.put_nowait(frame)
+        except queue.Full:
+            await loop.run_in_executor(None, reader.chunks.put, frame)
+
+        progress.add(len(frame))
+
+
+class ArchiveWriter:
+    """
+    A file-like object that a 'producer', run in a thread, writes an archive to.
+    The archive is (compressed and) split into chunks of 'CHUNK_SIZE' that are
+    taken from the bounded queue 'chunks', ending with None.
+    """
+
+    def __init__(self, producer, compress=False):
+        self.producer = producer
+        self.chunks = queue.Queue(maxsize=CHUNK_QUEUE_SIZE)
+        self.error = None
+        self._buffer = bytearray()
+        self._aborted = threading.Event()
+        self._compressor = None
+        if compress:
+            self._compressor = zlib.compressobj(COMPRESS_LEVEL, wbits=31)
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def abort(self):
+        """Make the producer stop, e.g., if the chunks are no longer sent."""
+        self._aborted.set()
+
+    def write(self, data):
+        if self._compressor is None:
+            self._buffer += data
+        else:
+            self._buffer += self._compressor.compress(data)
+
+        while len(self._buffer) >= CHUNK_SIZE:
+            self._put(bytes(self._buffer[:CHUNK_SIZE]))
+            del self._buffer[:CHUNK_SIZE]
+
+        return len(data)
+
+    def _run(self):
+        try:
+            self.producer(self)
+            if self._compressor is not None:
+                self._buffer += self._compressor.flush()
+
+            if self._buffer:
+                self._put(bytes(self._buffer))
+
+        except (OSError, tarfile.TarError) as e:
+            self.error = e
+
+        except _Aborted:
+            pass
+
+        finally:
+            # Also if the producer failed, so that 'send_chunks' returns
+            with contextlib.suppress(_Aborted):
+                self._put(None)
+
+    def _put(self, chunk):
+        while not self._aborted.is_set():
+            try:
+                self.chunks.put(chunk, timeout=PROGRESS_INTERVAL)
+                return
+            except queue.Full:
+                continue
+
+        raise _Aborted()
+
+
+class ArchiveReader:
+    """
+    A file-like object that a 'consumer', run in a thread, reads an archive from.
+    The (compressed) archive is put in the bounded queue 'chunks' in chunks,
+    ending with None.
+    """
+
+    def __init__(self, consumer, decompress=False):
+        self.consumer = consumer
+        self.chunks = queue.Queue(maxsize=CHUNK_QUEUE_SIZE)
+        self.error = None
+        self._buffer = b""
+        self._eof = False
+        self._decompressor = zlib.decompressobj(wbits=31) if decompress else None
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    async def finish(self):
+        """Signal the end of the archive and wait for the consumer to finish."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.chunks.put, None)
+        await loop.run_in_executor(None, self._thread.join)
+
+    def read(self, size=-1):
+        while not self._eof and (size < 0 or len(self._buffer) < size):
+            chunk = self.chunks.get()
+            if chunk is None:
+                self._eof = True
+                if self._decompressor is not None:
+                    chunk = self._decompressor.flush()
+                else:
+                    break
+
+            elif self._decompressor is not None:
+                chunk = self._decompressor.decompress(chunk)
+
+            self._buffer += chunk
+
+        if size < 0:
+            size = len(self._buffer)
+
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def _run(self):
+        try:
+            self.consumer(self)
+        except (OSError, tarfile.TarError, zlib.error) as e:
+            self.error = e
+
+        finally:
+            # Take whatever is left, so that putting chunks never blocks
+            while not self._eof:
+                self._eof = self.chunks.get() is None
+
+
+class TransferProgress:
+    """
+    The amount of data transferred, shown on STDERR as it goes if that is a
+    terminal, unless 'quiet'.
+    """
+
+    def __init__(self, quiet=False):
+        self.quiet = quiet
+        self.live = not quiet and sys.stderr.isatty()
+        self.started = time.perf_counter()
+        self.bytes = 0
+        self._shown = self.started
+
+    def add(self, size):
+        self.bytes += size
+        now = time.perf_counter()
+        if self.live and now - self._shown >= PROGRESS_INTERVAL:
+            self._shown = now
+            click.echo(
+                COPY_PROGRESS.format(size=human_size(self.bytes), rate=self._rate(now)),
+                err=True,
+                nl=False,
+            )
+
+    def print_summary(self):
+        if self.quiet:
+            return
+
+        now = time.perf_counter()
+        self.clear()
+        click.echo(
+            COPY_SUMMARY.format(
+                size=human_size(self.bytes),
+                seconds=now - self.started,
+                rate=self._rate(now),
+            ),
+            err=True,
+        )
+
+    def clear(self):
+        """Remove the progress shown, if any."""
+        if self.live:
+            click.echo("\r\033[K", err=True, nl=False)
+
+    def _rate(self, now):
+        seconds = now - self.started
+        return human_size(self.bytes / seconds if seconds > 0 else 0)
+
+
+class _Aborted(Exception):
+    pass
+
+
+def _pack(path, fileobj):
+    # Stream mode, so the archive is written sequentially as it is created
+    with tarfile.open(fileobj=fileobj, mode="w|", format=tarfile.PAX_FORMAT) as tar:
+        _add(tar, path, os.path.basename(os.path.normpath(path)))
+
+
+def _add(tar, path, arcname):
+    tar.add(path, arcname, recursive=False)
+    # The archive keeps every member otherwise, which adds up for large trees
+    tar.members.clear()
+    if os.path.isdir(path) and not os.path.islink(path):
+        for entry in sorted(os.scandir(path), key=lambda entry: entry.name):
+            _add(tar, entry.path, posixpath.join(arcname, entry.name))
+
+
+def _unpack(directory, fileobj):
+    os.makedirs(directory, exist_ok=True)
+    # Refuse absolute paths, '..' and the like where Python supports it
+    extract_kwargs = {"filter": "data"} if hasattr(tarfile, "data_filter") else {}
+    with tarfile.open(fileobj=fileobj, mode="r|") as tar:
+        while True:
+            member = tar.next()
+            if member is None:
+                break
+
+            tar.extract(member, directory, **extract_kwargs)
+            tar.members.clear()
+
+
+def _copy_stdin(fileobj):
+    stdin = sys.stdin.buffer
+    while True:
+        data = stdin.read1(CHUNK_SIZE)
+        if not data:
+            return
+
+        fileobj.write(data)
+
+
+def _copy_stdout(fileobj):
+    stdout = sys.stdout.buffer
+    while True:
+        data = fileobj.read(CHUNK_SIZE)
+        if not data:
+            break
+
+        stdout.write(data)
+
+    stdout.flush()
@@ -1,12 +1,14 @@
+import os
 import sys
-import json
+import time
 import datetime
-import dateutil.parser
+import tempfile
+from contextlib import contextmanager
 
-import websockets
 import httpx
 
-from .connection import request
+from . import jsoncodec
+from .connection import request, async_request, stream_request
 from .printing import (
     echo,
     echo_error,
@@ -18,11 +20,13 @@ from .printing import (
 
 
 async def listen_for_messages(websocket, newline=False, message_processor=None):
+    from websockets.exceptions import ConnectionClosed
+
     while True:
         try:
             message = await websocket.recv()
-        except websockets.exceptions.ConnectionClosed:
-            closing_message = json.loads(websocket.close_reason)
+        except ConnectionClosed:
+            closing_message = jsoncodec.loads(websocket.close_reason)
             echo("")
             return closing_message
 
@@ -33,9 +37,37 @@ async def listen_for_messages(websocket, newline=False, message_processor=None):
 
 
 def request_and_print_response(endpoint, kwargs, statuscode2printer):
-    try:
+    with _exit_on_connection_errors():
         response = request(endpoint, kwargs)
 
+    return _print_response(response, statuscode2printer)
+
+
+async def async_request_and_print_response(endpoint, kwargs, statuscode2printer):
+    """
+    'request_and_print_response' for the 'asyncio_detailed' endpoint variants.
+    """
+    with _exit_on_connection_errors():
+        response = await async_request(endpoint, kwargs)
+
+    return _print_response(response, statuscode2printer)
+
+
+def stream_and_print_response(endpoint, kwargs, statuscode2printer):
+    """
+    'request_and_print_response' for the 'stream_detailed' endpoint variants. The
+    printers get the 'httpx.Response' while its body is still being received.
+    """
+    with _exit_on_connection_errors():
+        with stream_request(endpoint, kwargs) as response:
+            return _print_response(response, statuscode2printer)
+
+
+@contextmanager
+def _exit_on_connection_errors():
+    try:
+        yield
+
     except httpx.ConnectError as e:
         print_unable_to_connect(e)
         sys.exit(1)
@@ -53,10 +85,12 @@ def request_and_print_response(endpoint, kwargs, statuscode2printer):
         print_timeout()
         sys.exit(1)
 
-    except json.decoder.JSONDecodeError:
+    except jsoncodec.JSONDecodeError:
         print_unexpected_response()
         sys.exit(1)
 
+
+def _print_response(response, statuscode2printer):
     if response is None:
         return None
 
@@ -153,10 +187,63 @@ def _extract_ports_and_interface(pub_port_raw):
     sys.exit(1)
 
 
-def human_duration(timestamp_iso):
-    now = datetime.datetime.now().timestamp()
-    timestamp = dateutil.parser.parse(timestamp_iso)
-    seconds = int(now - timestamp.timestamp())
+def image_reference(image):
+    """'image' as 'NAME:TAG', without a snapshot and with the default tag."""
+    image = image.partition("@")[0]
+    if ":" not in image:
+        image += ":latest"
+
+    return image
+
+
+def load_json_map(filepath):
+    """The JSON object stored in 'filepath', empty if it is missing or unreadable."""
+    try:
+        with open(os.path.expanduser(filepath), encoding="utf-8") as f:
+            mapping = jsoncodec.loads(f.read())
+    except (OSError, jsoncodec.JSONDecodeError):
+        return {}
+
+    return mapping if isinstance(mapping, dict) else {}
+
+
+def write_json_map(filepath, mapping):
+    """
+    Store the JSON object 'mapping' in 'filepath'. The file is replaced
+    atomically, so concurrent klee processes never read a partial file. Returns
+    whether it could be written.
+    """
+    filepath = os.path.expanduser(filepath)
+    try:
+        directory = os.path.dirname(filepath) or "."
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", dir=directory, delete=False, encoding="utf-8"
+        ) as f:
+            f.write(jsoncodec.dumps(mapping))
+    except OSError:
+        return False
+
+    try:
+        os.replace(f.name, filepath)
+    except OSError:
+        os.remove(f.name)
+        return False
+
+    return True
+
+
+def human_duration(timestamp_iso, now=None):
+    """
+    How long ago 'timestamp_iso' was, in words.
+
+    When formatting many timestamps, pass the same 'now' (seconds since the epoch)
+    for all of them.
+    """
+    if now is None:
+        now = time.time()
+
+    seconds = int(now - _parse_timestamp(timestamp_iso).timestamp())
     if seconds < 1:
         return "Less than a second"
     if seconds == 1:
@@ -184,3 +271,14 @@ def human_duration(timestamp_iso):
         return f"{m} months"
     years = int(hours / 24 / 365)
     return f"{years} years"
+
+
+def _parse_timestamp(timestamp_iso):
+    try:
+        # Fast path for the ISO-8601 timestamps returned by kleened
+        return datetime.datetime.fromisoformat(timestamp_iso.replace("Z", "+00:00"))
+    except ValueError:
+        # Older Pythons only parse a subset of ISO-8601
+        import dateutil.parser
+
+        return dateutil.parser.parse(timestamp_iso)
@@ -1,9 +1,19 @@
+import sys
+import time
+
 import click
 
 from .client.api.default.volume_create import sync_detailed as volume_create_endpoint
-from .client.api.default.volume_list import sync_detailed as volume_list_endpoint
-from .client.api.default.volume_inspect import sync_detailed as volume_inspect_endpoint
-from .client.api.default.volume_remove import sync_detailed as volume_remove_endpoint
+from .client.api.default.volume_list import (
+    stream_detailed as volume_list_stream_endpoint,
+)
+from .client.api.default.volume_inspect import (
+    stream_detailed as volume_inspect_stream_endpoint,
+)
+from .client.api.default.volume_remove import (
+    sync_detailed as volume_remove_endpoint,
+    asyncio_detailed as volume_remove_async_endpoint,
+)
 from .client.api.default.volume_prune import sync_detailed as volume_prune_endpoint
 
 from .client.models.volume_config import VolumeConfig
@@ -17,7 +27,15 @@ from .printing import (
 )
 from .prune import prune_command
 from .inspect import inspect_command
-from .utils import human_duration, request_and_print_response
+from .listing import listing_printer
+from .rowviews import VolumeView
+from .parallel import run_parallel, request_operation
+from .options import listing_options, parallel_options
+from .utils import (
+    human_duration,
+    request_and_print_response,
+    stream_and_print_response,
+)
 
 # pylint: disable=unused-argument
 
@@ -48,25 +66,28 @@ def volume_create(name, hidden=False):
 def volume_list(name, hidden=False):
 
     @click.command(cls=command_cls(), name=name, hidden=hidden)
-    def listing():
+    def listing(quiet, output_format):
         """List volumes"""
-        request_and_print_response(
-            volume_list_endpoint,
+        printer = listing_printer(
+            _print_volumes, VolumeView, "name", quiet, output_format
+        )
+        stream_and_print_response(
+            volume_list_stream_endpoint,
             kwargs={},
-            statuscode2printer={200: _print_volumes, 500: print_backend_error},
+            statuscode2printer={200: printer, 500: print_backend_error},
         )
 
+    listing = listing_options(listing, id_name="name")
     return listing
 
 
-def _print_volumes(response):
+def _print_volumes(volumes):
     VOLUME_LIST_COLUMNS = [
         ("VOLUME NAME", {"style": "bold aquamarine1"}),
         ("CREATED", {"style": "bright_white"}),
     ]
-    volumes = [
-        [vol.name, human_duration(vol.created) + " ago"] for vol in response.parsed
-    ]
+    now = time.time()
+    volumes = ([vol.name, human_duration(vol.created, now) + " ago"] for vol in volumes)
     print_table(volumes, VOLUME_LIST_COLUMNS)
 
 
@@ -77,7 +98,7 @@ def volume_inspect(name, hidden=False):
         argument="volume",
         id_var="volume_name",
         docs="Display detailed information on an volume.",
-        endpoint=volume_inspect_endpoint,
+        endpoint=volume_inspect_stream_endpoint,
     )
 
 
@@ -85,8 +106,13 @@ def volume_remove(name, hidden=False):
 
     @click.command(cls=command_cls(), name=name, hidden=hidden, no_args_is_help=True)
     @click.argument("volumes", required=True, nargs=-1)
-    def remove(volumes):
+    def remove(volumes, parallel, unordered):
         """Remove one or more volumes. You cannot remove a volume that is in use by a container."""
+        if parallel is not None:
+            operation = request_operation(volume_remove_async_endpoint, "volume_name")
+            exit_code = run_parallel(volumes, operation, parallel, not unordered)
+            sys.exit(exit_code)
+
         for volume_name in volumes:
             response = request_and_print_response(
                 volume_remove_endpoint,
@@ -100,6 +126,7 @@ def volume_remove(name, hidden=False):
             if response is None or response.status_code != 200:
                 break
 
+    remove = parallel_options(remove)
     return remove
 
 
@@ -0,0 +1,89 @@
+import os
+import asyncio
+import fnmatch
+import posixpath
+
+# Seconds between scans of a watched directory
+DEFAULT_INTERVAL = 1.0
+
+
+def snapshot(root, exclude=()):
+    """
+    The files below the directory 'root' as '{path: (size, mtime_ns, mode)}' with
+    paths relative to 'root', using '/'. Directories themselves are left out and
+    symbolic links are not followed. Paths matching a pattern of 'exclude' (see
+    'is_excluded') are skipped, including everything below excluded directories.
+    """
+    files = {}
+    directories = [""]
+    while directories:
+        directory = directories.pop()
+        try:
+            entries = os.scandir(os.path.join(root, directory))
+        except (FileNotFoundError, NotADirectoryError):
+            # Removed since it was listed
+            continue
+
+        with entries:
+            for entry in entries:
+                path = posixpath.join(directory, entry.name)
+                if is_excluded(path, exclude):
+                    continue
+
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append(path)
+                        continue
+
+                    stat = entry.stat(follow_symlinks=False)
+                except FileNotFoundError:
+                    continue
+
+                files[path] = (stat.st_size, stat.st_mtime_ns, stat.st_mode)
+
+    return files
+
+
+def is_excluded(path, exclude):
+    """
+    Whether the relative 'path' matches one of the glob patterns of 'exclude',
+    either as a whole or by its last component, e.g., '*.pyc' or 'node_modules'.
+    """
+    name = posixpath.basename(path)
+    return any(
+        fnmatch.fnmatchcase(name, pattern) or fnmatch.fnmatchcase(path, pattern)
+        for pattern in exclude
+    )
+
+
+async def wait_for_change(root, previous, exclude=(), interval=DEFAULT_INTERVAL):
+    """
+    Scan 'root' every 'interval' seconds until its 'snapshot' differs from
+    'previous', and return the new snapshot.
+
+    Scanning works the same on every platform without extra dependencies, where
+    kqueue on FreeBSD would need an open descriptor for every watched file. Only
+    the metadata of the files is read, so a scan is cheap even for large trees.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(interval)
+        current = await loop.run_in_executor(None, snapshot, root, exclude)
+        if current != previous:
+            return current
+
+
+async def wait_until_settled(root, current, exclude=(), interval=DEFAULT_INTERVAL):
+    """
+    Scan 'root' every 'interval' seconds until a scan finds no change since the
+    previous one, starting from the snapshot 'current', and return the last
+    snapshot. A burst of changes, like a checkout, is thereby picked up as one.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(interval)
+        latest = await loop.run_in_executor(None, snapshot, root, exclude)
+        if latest == current:
+            return latest
+
+        current = latest
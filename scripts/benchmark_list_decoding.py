@@ -0,0 +1,74 @@
+import argparse
+import json
+import time
+
+from klee.client.models.container_summary import ContainerSummary
+from klee.rowviews import ContainerSummaryView
+from klee.utils import human_duration
+
+
+def container(n):
+    return {
+        "id": f"{n:012x}",
+        "name": f"container{n}",
+        "image_id": "e3b0c44298fc",
+        "image_name": "FreeBSD",
+        "image_tag": "latest",
+        "cmd": ["/bin/sh", "/etc/rc"],
+        "created": "2024-01-01T10:00:00.000000Z",
+        "running": n % 2 == 0,
+        "jid": n if n % 2 == 0 else None,
+        "restart_policy": "no",
+        "network_driver": "ipnet",
+        "public_ports": [],
+        "dataset": f"zroot/kleene/container/{n:012x}",
+        "env": ["PATH=/bin:/usr/bin"],
+        "mounts": [],
+        "user": "root",
+        "persist": False,
+    }
+
+
+def rows(containers, decode):
+    now = time.time()
+    return [
+        [
+            c.id,
+            c.name,
+            c.image_name,
+            " ".join(c.cmd),
+            human_duration(c.created, now),
+            "yes" if c.restart_policy == "on-startup" else "no",
+            "yes" if c.running else "no",
+            "" if c.jid is None else str(c.jid),
+        ]
+        for c in map(decode, containers)
+    ]
+
+
+def measure(containers, decode, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows(containers, decode)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="benchmark-list-decoding",
+        description="Time building the rows of 'klee container ls' from models and from row views",
+    )
+    parser.add_argument("-n", type=int, default=20000, help="Number of containers.")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Runs per variant.")
+    args = parser.parse_args()
+
+    # Decoded again for each run, like the response of a real listing
+    document = json.dumps([container(n) for n in range(args.n)])
+    for label, decode in [
+        ("ContainerSummary", ContainerSummary.from_dict),
+        ("ContainerSummaryView", ContainerSummaryView.from_dict),
+    ]:
+        seconds = measure(json.loads(document), decode, args.repeat)
+        print(f"{label:<22}{seconds * 1000:9.1f} ms for {args.n} containers")
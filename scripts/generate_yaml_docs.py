@@ -1,6 +1,7 @@
 import argparse
 import os
 
+import click
 import yaml
 
 from click.testing import CliRunner
@@ -15,6 +16,12 @@ from klee.docs_generator import DocsGroup, DocsCommand
 
 
 def iter_commands(cli):
+    # The subcommands of klee's root are loaded on demand, so they are not all
+    # in 'cli.commands' up front.
+    ctx = click.Context(cli)
+    for cmd in cli.list_commands(ctx):
+        cli.get_command(ctx, cmd)
+
     for cmd, obj in cli.commands.items():
         if isinstance(obj, DocsGroup):
             yield [cmd], obj
@@ -165,24 +165,21 @@ def inspect(obj_type, identifier):
 
 def list_images():
     kwargs = {}
-    response = image_list_endpoint(
-        httpx.HTTPTransport(uds="/var/run/kleened.sock"),
-        client=Client(base_url="http://localhost"),
-        **kwargs,
-    )
+    response = image_list_endpoint(client=_kleened_client(), **kwargs)
     return response.parsed
 
 
 def list_containers(all_=True):
     kwargs = {"all_": all_}
-    response = container_list_endpoint(
-        httpx.HTTPTransport(uds="/var/run/kleened.sock"),
-        client=Client(base_url="http://localhost"),
-        **kwargs,
-    )
+    response = container_list_endpoint(client=_kleened_client(), **kwargs)
     return response.parsed
 
 
+def _kleened_client():
+    transport = httpx.HTTPTransport(uds="/var/run/kleened.sock")
+    return Client(base_url="http://localhost", httpx_args={"transport": transport})
+
+
 def container_interfaces(container_id, ipv4_only=False):
     """
     The 'statistics.interface' list that netstat(1) reports inside a container.
@@ -0,0 +1,91 @@
+"""Unit tests for klee.batch's batch files and splitting of the session output."""
+
+import subprocess
+
+import pytest
+
+from klee.batch import SentinelParser, batch_script, read_batch
+
+pytestmark = pytest.mark.unit
+
+TOKEN = "__klee_batch_test__"
+
+
+def test_read_batch_skips_comments_and_joins_continued_lines():
+    lines = [
+        "# setup\n",
+        "\n",
+        "cd /tmp\n",
+        "pkg install -y \\\n",
+        "  nginx\n",
+        "   # indented comment\n",
+        "service nginx start",
+    ]
+    assert read_batch(lines) == [
+        (3, "cd /tmp"),
+        (4, "pkg install -y \\\n  nginx"),
+        (7, "service nginx start"),
+    ]
+
+
+def _events(parser, chunks):
+    events = []
+    for chunk in chunks:
+        events.extend(parser.feed(chunk))
+    return events
+
+
+def _merged(events):
+    """The events with consecutive output joined, as chunking is arbitrary."""
+    merged = []
+    for event in events:
+        if event[0] == "output" and merged and merged[-1][0] == "output":
+            merged[-1] = ("output", merged[-1][1] + event[1])
+        else:
+            merged.append(event)
+    return merged
+
+
+def test_sentinels_split_output_and_exit_codes():
+    output = f"a\nb\n\n{TOKEN} 0 0\npartial\n{TOKEN} 1 3\n".encode()
+    expected = [
+        ("output", b"a\nb\n"),
+        ("exit", 0, 0),
+        ("output", b"partial"),
+        ("exit", 1, 3),
+    ]
+    assert _merged(_events(SentinelParser(TOKEN), [output])) == expected
+
+    # The same when the frames split the sentinel lines anywhere
+    chunks = [output[n : n + 3] for n in range(0, len(output), 3)]
+    assert _merged(_events(SentinelParser(TOKEN), chunks)) == expected
+
+
+def test_output_is_passed_on_before_the_command_ends():
+    parser = SentinelParser(TOKEN)
+    assert parser.feed(b"line 1\nline 2\nline") == [("output", b"line 1\nline 2")]
+    assert parser.feed(b" 3") == []
+    assert parser.flush() == b"\nline 3"
+
+
+def test_the_script_reports_each_command():
+    commands = [
+        (1, "cd /tmp"),
+        (2, "pwd"),
+        (3, "if then fi"),
+        (4, "echo 'it''s' && exit 5"),
+    ]
+    script = batch_script(commands, TOKEN)
+    result = subprocess.run(
+        ["/bin/sh"], input=script.encode(), capture_output=True, check=False
+    )
+    parser = SentinelParser(TOKEN)
+    events = _merged(_events(parser, [result.stdout]))
+
+    assert events[:3] == [("exit", 0, 0), ("output", b"/tmp\n"), ("exit", 1, 0)]
+    assert events[3][0] == "output"
+    assert events[4][:2] == ("exit", 2) and events[4][2] != 0
+    # The session ended without a sentinel after the last output
+    assert events[5:] == [("output", b"its")]
+    assert parser.flush() == b"\n"
+    assert result.returncode == 5
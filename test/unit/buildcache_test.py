@@ -0,0 +1,214 @@
+"""Unit tests for klee.buildcache's reuse of snapshots of earlier builds."""
+
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from klee import buildcache
+from klee.buildcache import (
+    CacheMatch,
+    cached_dockerfile,
+    expand_image,
+    find_cache_match,
+    load_base_images,
+    parse_dockerfile,
+    record_base_image,
+    resolve_base,
+    write_cached_dockerfile,
+)
+
+pytestmark = pytest.mark.unit
+
+DOCKERFILE = """
+# the application
+FROM FreeBSD:14
+ENV A=1
+run   pkg install -y \\
+      python3
+WORKDIR /app
+COPY app /app
+ARG MODE=prod
+RUN make $MODE
+"""
+
+INSTRUCTIONS = [
+    ["FROM FreeBSD:14", ""],
+    ["ENV A=1", ""],
+    ["RUN pkg install -y python3", "@s1"],
+    ["WORKDIR /app", ""],
+    ["COPY app /app", "@s2"],
+    ["ARG MODE=prod", ""],
+    ["RUN make $MODE", "@s3"],
+]
+
+
+# The image 'FROM FreeBSD:14' refers to, and the one it referred to before
+BASE = SimpleNamespace(id="fbsd", name="FreeBSD", tag="14", instructions=[])
+OLD_BASE = SimpleNamespace(id="old", name="FreeBSD", tag="", instructions=[])
+
+# What the 'FROM' of the cached images referred to when they were built
+BASE_IMAGES = {"aaa": "fbsd", "bbb": "fbsd"}
+
+
+def _image(id_, instructions, created="2024-01-01T10:00:00.000000Z", tag="latest"):
+    return SimpleNamespace(
+        id=id_, name="app", tag=tag, created=created, instructions=instructions
+    )
+
+
+def _match(instructions, images, context, **kwargs):
+    return find_cache_match(
+        instructions, [BASE, *images], context, base_images=BASE_IMAGES, **kwargs
+    )
+
+
+@pytest.fixture(name="context")
+def fixture_context(tmp_path):
+    (tmp_path / "app").mkdir()
+    (tmp_path / "app" / "main.py").write_text("print('hello')")
+    for path in (tmp_path / "app" / "main.py", tmp_path / "app"):
+        os.utime(path, (1e9, 1e9))
+    return str(tmp_path)
+
+
+def test_parse_dockerfile_joins_lines_and_skips_comments():
+    assert parse_dockerfile(DOCKERFILE) == [
+        "FROM FreeBSD:14",
+        "ENV A=1",
+        "run   pkg install -y  python3",
+        "WORKDIR /app",
+        "COPY app /app",
+        "ARG MODE=prod",
+        "RUN make $MODE",
+    ]
+
+
+def test_the_whole_build_is_reused(context):
+    images = [_image("aaa", INSTRUCTIONS)]
+    match = _match(parse_dockerfile(DOCKERFILE), images, context)
+    assert match == CacheMatch("aaa", "s3", 7)
+
+
+def test_a_changed_instruction_ends_the_prefix(context):
+    instructions = parse_dockerfile(DOCKERFILE.replace("make", "gmake"))
+    match = _match(instructions, [_image("aaa", INSTRUCTIONS)], context)
+    assert match == CacheMatch("aaa", "s2", 5)
+
+
+def test_copy_is_not_reused_if_the_sources_changed(context):
+    os.utime(os.path.join(context, "app", "main.py"))
+    images = [_image("aaa", INSTRUCTIONS)]
+    match = _match(parse_dockerfile(DOCKERFILE), images, context)
+    assert match == CacheMatch("aaa", "s1", 3)
+
+
+def test_build_args_end_the_prefix_at_their_arg(context):
+    images = [_image("aaa", INSTRUCTIONS)]
+    match = _match(
+        parse_dockerfile(DOCKERFILE), images, context, build_args=["MODE=dev"]
+    )
+    assert match == CacheMatch("aaa", "s2", 5)
+
+
+def test_only_the_given_image_is_considered(context):
+    images = [_image("aaa", INSTRUCTIONS), _image("bbb", INSTRUCTIONS[:3], tag="old")]
+    instructions = parse_dockerfile(DOCKERFILE)
+    assert _match(instructions, images, context, cache_from="app:old") == (
+        CacheMatch("bbb", "s1", 3)
+    )
+    assert _match(instructions, images, context, cache_from="other") is None
+
+
+def test_cached_dockerfile_replays_configuration():
+    dockerfile = cached_dockerfile(
+        parse_dockerfile(DOCKERFILE), CacheMatch("aaa", "s1", 3)
+    )
+    assert dockerfile.splitlines() == [
+        "FROM aaa@s1",
+        "ENV A=1",
+        "WORKDIR /app",
+        "COPY app /app",
+        "ARG MODE=prod",
+        "RUN make $MODE",
+    ]
+
+
+def test_images_of_cached_builds_are_expanded(context):
+    base = _image("aaa", INSTRUCTIONS)
+    instructions = parse_dockerfile(DOCKERFILE)
+    dockerfile = cached_dockerfile(instructions, CacheMatch("aaa", "s1", 3))
+    cached = _image(
+        "bbb",
+        [
+            [line, "@t2" if line.startswith("COPY") else ""]
+            for line in dockerfile.splitlines()
+        ],
+    )
+    images_by_id = {"aaa": base, "bbb": cached}
+    steps = expand_image(cached, images_by_id)
+    assert [step.instruction for step in steps] == [
+        "FROM FreeBSD:14",
+        "ENV A=1",
+        "RUN pkg install -y python3",
+        "WORKDIR /app",
+        "COPY app /app",
+        "ARG MODE=prod",
+        "RUN make $MODE",
+    ]
+    assert [step.image_id for step in steps][2:5] == ["aaa", "bbb", "bbb"]
+
+    match = _match(
+        parse_dockerfile(DOCKERFILE.replace("make", "gmake")), [cached], context
+    )
+    assert match is None
+    match = _match(
+        parse_dockerfile(DOCKERFILE.replace("make", "gmake")),
+        [base, cached],
+        context,
+    )
+    assert match.reused == 5
+
+
+def test_from_does_not_match_if_its_image_was_replaced(context):
+    instructions = parse_dockerfile(DOCKERFILE)
+    images = [BASE, OLD_BASE, _image("aaa", INSTRUCTIONS)]
+    assert find_cache_match(instructions, images, context) is None
+    assert (
+        find_cache_match(instructions, images, context, base_images={"aaa": "old"})
+        is None
+    )
+    assert find_cache_match(
+        instructions, images, context, base_images={"aaa": "fbsd"}
+    ) == CacheMatch("aaa", "s3", 7)
+
+
+def test_resolve_base():
+    images = [BASE, _image("aaa", INSTRUCTIONS)]
+    assert resolve_base(["from FreeBSD:14"], images) == "fbsd"
+    assert resolve_base(["FROM fbsd@s1 AS build"], images) == "fbsd@s1"
+    assert resolve_base(["FROM app"], images) == "aaa"
+    assert resolve_base(["FROM FreeBSD:13"], images) is None
+    assert resolve_base(["ENV A=1", "FROM FreeBSD:14"], images) is None
+
+
+def test_base_images_are_recorded(tmp_path, monkeypatch):
+    filepath = str(tmp_path / "base_images.json")
+    assert load_base_images(filepath) == {}
+    monkeypatch.setattr(buildcache, "MAX_BASE_IMAGES", 2)
+    assert record_base_image("aaa", "fbsd", filepath)
+    assert record_base_image("bbb", "aaa@s1", filepath)
+    assert load_base_images(filepath) == {"aaa": "fbsd", "bbb": "aaa@s1"}
+    assert record_base_image("aaa", "fbsd2", filepath)
+    assert record_base_image("ccc", "bbb", filepath)
+    assert load_base_images(filepath) == {"aaa": "fbsd2", "ccc": "bbb"}
+
+
+def test_cached_dockerfiles_are_written_outside_the_context(context):
+    path = write_cached_dockerfile("FROM aaa@s1\n")
+    try:
+        assert not os.path.abspath(path).startswith(context)
+        with open(path, encoding="utf-8") as f:
+            assert f.read() == "FROM aaa@s1\n"
+    finally:
+        os.remove(path)
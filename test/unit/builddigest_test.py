@@ -0,0 +1,97 @@
+import os
+
+import pytest
+
+from klee import builddigest
+from klee.builddigest import (
+    IGNORE_FILE,
+    context_digest,
+    load_digest_cache,
+    read_ignore_file,
+    record_digest,
+)
+
+pytestmark = pytest.mark.unit
+
+CONFIG = '{"context":"/ctx","dockerfile":"Dockerfile","tag":"app","quiet":"false","buildargs":{"A":"1","B":"2"}}'
+
+
+@pytest.fixture(name="context")
+def fixture_context(tmp_path):
+    (tmp_path / "Dockerfile").write_text("FROM FreeBSD\nCOPY src /app\n")
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "main.py").write_text("print('hello')\n")
+    return tmp_path
+
+
+def test_digest_is_stable(context):
+    assert context_digest(context, "Dockerfile", CONFIG) == context_digest(
+        context, "Dockerfile", CONFIG
+    )
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        lambda context: (context / "src" / "main.py").write_text("print('bye')\n"),
+        lambda context: (context / "src" / "new.py").write_text(""),
+        lambda context: (context / "src" / "main.py").rename(context / "main.py"),
+        lambda context: os.chmod(context / "src" / "main.py", 0o755),
+        lambda context: (context / "Dockerfile").write_text("FROM FreeBSD\n"),
+    ],
+)
+def test_digest_changes_with_the_context(context, change):
+    before = context_digest(context, "Dockerfile", CONFIG)
+    change(context)
+    assert context_digest(context, "Dockerfile", CONFIG) != before
+
+
+def test_digest_covers_the_build_configuration(context):
+    before = context_digest(context, "Dockerfile", CONFIG)
+    assert context_digest(context, "Dockerfile", CONFIG.replace('"1"', '"3"')) != before
+    reordered = CONFIG.replace('"A":"1","B":"2"', '"B":"2","A":"1"')
+    assert context_digest(context, "Dockerfile", reordered) == before
+    quiet = CONFIG.replace('"quiet":"false"', '"quiet":"true"')
+    assert context_digest(context, "Dockerfile", quiet) == before
+
+
+def test_ignored_files_do_not_change_the_digest(context):
+    (context / IGNORE_FILE).write_text("# build output\n*.log\n\nsrc/cache\n")
+    assert read_ignore_file(context) == ["*.log", "src/cache"]
+    before = context_digest(context, "Dockerfile", CONFIG)
+    (context / "build.log").write_text("")
+    (context / "src" / "cache").mkdir()
+    (context / "src" / "cache" / "data").write_text("")
+    assert context_digest(context, "Dockerfile", CONFIG) == before
+
+
+def test_missing_dockerfile_raises(context):
+    with pytest.raises(OSError):
+        context_digest(context, "Dockerfile.missing", CONFIG)
+
+
+def test_record_and_load_digests(tmp_path, monkeypatch):
+    cache = tmp_path / "klee" / "build_digests.json"
+    assert load_digest_cache(cache) == {}
+    monkeypatch.setattr(builddigest, "MAX_CACHE_ENTRIES", 2)
+    assert record_digest("d1", "image1", cache)
+    assert record_digest("d2", "image2", cache)
+    assert record_digest("d1", "image3", cache)
+    assert record_digest("d4", "image4", cache)
+    assert load_digest_cache(cache) == {"d1": "image3", "d4": "image4"}
+    assert os.listdir(tmp_path / "klee") == ["build_digests.json"]
+
+
+def test_unreadable_cache_is_empty(tmp_path):
+    cache = tmp_path / "build_digests.json"
+    cache.write_text("{not json")
+    assert load_digest_cache(cache) == {}
+    assert record_digest("d1", "image1", cache)
+    assert load_digest_cache(cache) == {"d1": "image1"}
+
+
+def test_the_base_image_changes_the_digest(context):
+    before = context_digest(context, "Dockerfile", CONFIG, "img1")
+    assert context_digest(context, "Dockerfile", CONFIG, "img1") == before
+    assert context_digest(context, "Dockerfile", CONFIG, "img2") != before
+    assert context_digest(context, "Dockerfile", CONFIG, "img1@s1") != before
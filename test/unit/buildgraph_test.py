@@ -0,0 +1,150 @@
+"""Unit tests for klee.buildgraph's dependency resolution and scheduling.
+
+The builds themselves are replaced by coroutines, so no kleened is needed.
+"""
+
+import asyncio
+
+import pytest
+
+from klee import buildgraph
+from klee.buildgraph import (
+    BuildOutcome,
+    GraphError,
+    critical_path,
+    dependencies,
+    load_graph,
+    run_graph,
+)
+
+pytestmark = pytest.mark.unit
+
+GRAPH = """
+builds:
+  base:
+    path: base
+    tag: base
+  runtime:
+    path: runtime
+    tag: runtime:1.0
+    build_args:
+      PY: "3.11"
+  app:
+    path: app
+    tag: app:latest
+  docs:
+    path: docs
+    depends_on: [app]
+  tools:
+    path: tools
+"""
+
+DOCKERFILES = {
+    "base": "FROM FreeBSD:14.0-RELEASE\n",
+    "runtime": "# python\nFROM base:latest\nRUN pkg install -y python3\n",
+    "app": "FROM runtime:1.0@3f2a1b\n",
+    "docs": "FROM FreeBSD\n",
+    "tools": "FROM FreeBSD\n",
+}
+
+
+@pytest.fixture(name="graph_file")
+def fixture_graph_file(tmp_path):
+    for name, dockerfile in DOCKERFILES.items():
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "Dockerfile").write_text(dockerfile)
+    path = tmp_path / "builds.yaml"
+    path.write_text(GRAPH)
+    return path
+
+
+def test_load_graph(graph_file):
+    specs = {spec.name: spec for spec in load_graph(str(graph_file))}
+    assert list(specs) == ["base", "runtime", "app", "docs", "tools"]
+    assert specs["runtime"].path == str(graph_file.parent / "runtime")
+    assert specs["runtime"].build_args == ["PY=3.11"]
+    assert specs["docs"].depends_on == ["app"]
+
+
+def test_dependencies_follow_from_instructions_and_depends_on(graph_file):
+    assert dependencies(load_graph(str(graph_file))) == {
+        "base": set(),
+        "runtime": {"base"},
+        "app": {"runtime"},
+        "docs": {"app"},
+        "tools": set(),
+    }
+
+
+def test_cycles_are_refused(graph_file):
+    graph_file.write_text(
+        GRAPH.replace("tag: base", "tag: base\n    depends_on: [docs]")
+    )
+    with pytest.raises(GraphError, match="base -> docs -> app -> runtime -> base"):
+        dependencies(load_graph(str(graph_file)))
+
+
+def test_unknown_dependencies_are_refused(graph_file):
+    graph_file.write_text(GRAPH.replace("[app]", "[nothing]"))
+    with pytest.raises(GraphError, match="unknown build 'nothing'"):
+        dependencies(load_graph(str(graph_file)))
+
+
+def _outcome(seconds):
+    return BuildOutcome(True, "", 0, seconds, "")
+
+
+def test_critical_path_is_the_longest_chain():
+    graph = {"base": set(), "runtime": {"base"}, "app": {"runtime"}, "tools": set()}
+    outcomes = {
+        "base": _outcome(2),
+        "runtime": _outcome(3),
+        "app": _outcome(1),
+        "tools": _outcome(5),
+    }
+    assert critical_path(graph, outcomes) == (["base", "runtime", "app"], 6)
+
+
+@pytest.fixture(name="builds")
+def fixture_builds(monkeypatch):
+    events = []
+    delays = {"base": 0.03, "runtime": 0.01, "app": 0.01, "docs": 0.0, "tools": 0.02}
+    failing = set()
+
+    async def build(config, tag, prefixer, started):
+        events.append(("start", config))
+        await asyncio.sleep(delays[config])
+        events.append(("end", config))
+        succeeded = config not in failing
+        return BuildOutcome(succeeded, config if succeeded else "", 0, 0, "failed")
+
+    monkeypatch.setattr(buildgraph, "_build", build)
+    return events, failing
+
+
+def test_builds_start_when_their_dependencies_are_built(graph_file, builds, capsys):
+    events, _ = builds
+    specs = load_graph(str(graph_file))
+    exit_code = run_graph(specs, dependencies(specs), lambda spec: spec.name, 2)
+    assert exit_code == 0
+    for before, after in [("base", "runtime"), ("runtime", "app"), ("app", "docs")]:
+        assert events.index(("end", before)) < events.index(("start", after))
+
+    running = peak = 0
+    for event, _ in events:
+        running += 1 if event == "start" else -1
+        peak = max(peak, running)
+    assert peak == 2
+    assert "5 of 5 images built" in capsys.readouterr().out
+
+
+def test_builds_depending_on_failed_builds_are_skipped(graph_file, builds, capsys):
+    events, failing = builds
+    failing.add("runtime")
+    specs = load_graph(str(graph_file))
+    assert run_graph(specs, dependencies(specs), lambda spec: spec.name) == 1
+    started = {config for event, config in events if event == "start"}
+    assert started == {"base", "runtime", "tools"}
+    output = capsys.readouterr().out
+    assert "not built, since runtime failed" in output
+    assert "2 of 5 images built" in output
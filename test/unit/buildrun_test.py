@@ -0,0 +1,106 @@
+"""Unit tests for klee.buildrun's build coroutine shared by single and graph builds.
+
+A fake websocket stands in for kleened, so no connection is needed.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from websockets.exceptions import ConnectionClosedOK
+from websockets.frames import Close
+
+from klee import buildrun
+from klee.buildrun import run_build
+
+pytestmark = pytest.mark.unit
+
+STARTING = '{"msg_type": "starting", "message": "", "data": "image1"}'
+CREATED = '{"msg_type": "closing", "message": "image created", "data": "image1"}'
+FAILED = '{"msg_type": "error", "message": "image build failed", "data": "@s2"}'
+
+
+class FakeWebSocket:
+    def __init__(self, frames, close_reason):
+        self.frames = list(frames)
+        self.close_reason = close_reason
+        self.sent = []
+
+    async def send(self, data):
+        self.sent.append(data)
+
+    async def recv(self):
+        if not self.frames:
+            raise ConnectionClosedOK(Close(1000, self.close_reason), None)
+
+        return self.frames.pop(0)
+
+
+@pytest.fixture(name="kleened")
+def fixture_kleened(monkeypatch):
+    recorded = []
+    websockets = []
+
+    @asynccontextmanager
+    async def create_websocket(_endpoint):
+        yield websockets.pop(0)
+
+    def record_build(tag, image_id, seconds, succeeded, steps):
+        recorded.append((tag, image_id, succeeded, [step.step for step in steps]))
+
+    monkeypatch.setattr(buildrun, "create_websocket", create_websocket)
+    monkeypatch.setattr(buildrun, "record_build", record_build)
+    return websockets, recorded
+
+
+def _run(config="{}", tag=""):
+    written = []
+    run = asyncio.run(run_build(config, written.append, tag))
+    return run, written
+
+
+def test_builds_are_timed_and_recorded(kleened):
+    websockets, recorded = kleened
+    frames = [STARTING, "Step 1/2 : FROM FreeBSD\n", "Step 2/2 : RUN make\n", "ok\n"]
+    websockets.append(FakeWebSocket(frames, CREATED))
+    run, written = _run(tag="app")
+
+    assert (run.started, run.succeeded, run.image_id) == (True, True, "image1")
+    assert run.message == "image created"
+    assert written == frames[1:]
+    assert [step.step for step in run.steps] == [1, 2]
+    assert recorded == [("app", "image1", True, [1, 2])]
+
+
+def test_failed_builds_keep_their_image_id(kleened):
+    websockets, recorded = kleened
+    websockets.append(FakeWebSocket([STARTING, "Step 1/1 : RUN false\n"], FAILED))
+    run, _ = _run(tag="app")
+
+    assert (run.succeeded, run.image_id, run.snapshot) == (False, "image1", "@s2")
+    assert run.message == "image build failed"
+    assert recorded == [("app", "image1", False, [1])]
+
+
+def test_builds_that_did_not_start(kleened):
+    websockets, recorded = kleened
+    error = (
+        '{"msg_type": "error", "message":'
+        ' "\'ENV testvar=lol\' not permitted before a FROM instruction", "data": ""}'
+    )
+    websockets.append(FakeWebSocket([error], ""))
+    run, written = _run(tag="app")
+
+    assert not run.started and not run.succeeded
+    # kleened's reason is reported as is
+    assert run.message == "'ENV testvar=lol' not permitted before a FROM instruction"
+    assert written == [] and recorded == []
+
+
+def test_invalid_messages_fail_the_build_without_raising(kleened):
+    websockets, _ = kleened
+    websockets.append(FakeWebSocket(["not json"], ""))
+    run, _ = _run()
+
+    assert not run.succeeded
+    assert run.message.startswith("unexpected message from kleened:")
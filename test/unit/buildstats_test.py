@@ -0,0 +1,134 @@
+import sqlite3
+
+import pytest
+
+from klee.buildstats import (
+    BuildRecord,
+    StepTiming,
+    StepTimer,
+    compare_steps,
+    load_history,
+    print_build_stats,
+    record_build,
+)
+
+pytestmark = pytest.mark.unit
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_step_timer_times_steps_from_status_messages():
+    clock = FakeClock()
+    timer = StepTimer(clock)
+    clock.now += 0.5
+    timer.feed("Step 1/3 : FROM FreeBSD\n")
+    clock.now += 1
+    timer.feed("pkg: installing\n")
+    timer.feed("--> Snapshot created: @3f2a1b\n")
+    clock.now += 1
+    timer.feed("Step 2/3 : RUN   pkg install -y\n  python3\n")
+    clock.now += 4
+    timer.feed("Step 3/3 : CMD /bin/sh\n")
+    clock.now += 0.25
+    assert timer.finish() == 6.75
+    assert timer.steps == [
+        StepTiming(1, "FROM FreeBSD", 2),
+        StepTiming(2, "RUN pkg install -y python3", 4),
+        StepTiming(3, "CMD /bin/sh", 0.25),
+    ]
+
+
+def test_step_timer_without_steps():
+    timer = StepTimer()
+    timer.feed("image created\n")
+    timer.finish()
+    assert timer.steps == []
+
+
+def test_record_and_load_history(tmp_path):
+    history = tmp_path / "klee" / "build_history.db"
+    assert load_history("app", 10, history) == []
+    steps = [StepTiming(1, "FROM FreeBSD", 0.5), StepTiming(2, "RUN make", 3)]
+    assert record_build("app", "image1", 3.5, True, steps, history)
+    assert record_build("app:latest", "image2", 1, False, steps[:1], history)
+    assert record_build("app:1.0", "image3", 2, True, steps, history)
+
+    builds = load_history("app", 10, history)
+    assert [(build.image_id, build.succeeded) for build in builds] == [
+        ("image2", False),
+        ("image1", True),
+    ]
+    assert builds[1].steps == steps
+    assert [build.image_id for build in load_history("app", 1, history)] == ["image2"]
+
+
+def test_unwritable_history_is_reported(tmp_path):
+    history = tmp_path / "build_history.db"
+    history.mkdir()
+    assert not record_build("app", "image1", 1, True, [], history)
+
+
+def _build(*seconds, succeeded=True):
+    instructions = ["FROM FreeBSD", "RUN make", "COPY . /app", "RUN make"]
+    steps = [
+        StepTiming(n, instruction, duration)
+        for n, (instruction, duration) in enumerate(zip(instructions, seconds), 1)
+    ]
+    return BuildRecord("image", "2024-01-01T10:00:00Z", sum(seconds), succeeded, steps)
+
+
+def test_compare_steps():
+    last = _build(1, 20, 1, 3)
+    earlier = [_build(1, 10, 1, 2), _build(1, 12, 1, 4), _build(1, 60, succeeded=False)]
+    comparisons = compare_steps(last, earlier)
+    assert [(step.previous, step.median) for step in comparisons] == [
+        (1, 1),
+        (10, 11),
+        (1, 1),
+        # The second 'RUN make' is compared to itself, not to the first
+        (2, 3),
+    ]
+    assert [step.regression for step in comparisons] == [False, True, False, False]
+
+
+def test_small_slowdowns_are_not_regressions():
+    comparisons = compare_steps(_build(0.1, 0.9), [_build(0.1, 0.3)])
+    assert not comparisons[1].regression
+
+
+def test_new_steps_have_nothing_to_compare_to():
+    comparisons = compare_steps(_build(1, 2, 3), [_build(1, 2)])
+    assert comparisons[2].previous is None
+    assert comparisons[2].median is None
+    assert not comparisons[2].regression
+
+
+def test_build_stats(tmp_path, capsys):
+    history = tmp_path / "build_history.db"
+    assert print_build_stats("app", 10, history) == 1
+    assert "no builds of app:latest" in capsys.readouterr().out
+
+    for seconds in (10, 11, 30):
+        steps = [StepTiming(1, "FROM FreeBSD", 1), StepTiming(2, "RUN make", seconds)]
+        record_build("app", "image", seconds + 1, True, steps, history)
+
+    assert print_build_stats("app", 10, history) == 0
+    captured = capsys.readouterr()
+    assert "compared with 2 earlier builds" in captured.out
+    assert "+19.5s" in captured.out
+    assert "slower than usual: step 2" in captured.out
+
+
+def test_build_stats_of_a_corrupt_history(tmp_path, capsys):
+    history = tmp_path / "build_history.db"
+    history.write_text("not a database" * 100)
+    assert print_build_stats("app", 10, history) == 1
+    assert capsys.readouterr().out
+    with pytest.raises(sqlite3.Error):
+        load_history("app", 10, history)
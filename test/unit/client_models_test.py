@@ -0,0 +1,45 @@
+"""Unit tests for the lazily loaded models of the generated kleened client."""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+from klee.client import models
+
+pytestmark = pytest.mark.unit
+
+LOADED_MODELS_SCRIPT = """
+import json, sys
+import klee.client.api.default.container_remove
+print(json.dumps(sorted(
+    name for name in sys.modules if name.startswith("klee.client.models.")
+)))
+"""
+
+
+def test_endpoint_loads_only_the_models_it_decodes():
+    # In a fresh interpreter, since pytest may already have imported other models
+    output = subprocess.run(
+        [sys.executable, "-c", LOADED_MODELS_SCRIPT],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    assert json.loads(output) == [
+        "klee.client.models.error_response",
+        "klee.client.models.id_response",
+    ]
+
+
+@pytest.mark.parametrize("name", models.__all__)
+def test_every_model_is_accessible_from_the_package(name):
+    model = getattr(models, name)
+    assert model.__name__ == name
+    assert name in dir(models)
+
+
+def test_unknown_model_raises_attribute_error():
+    with pytest.raises(AttributeError):
+        models.NoSuchModel  # pylint: disable=pointless-statement
@@ -0,0 +1,46 @@
+"""Unit tests for the TLS context klee.connection shares between its clients."""
+
+import ssl
+from urllib.parse import urlparse
+
+import pytest
+
+from klee import connection
+from klee.config import config
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def tls_config(monkeypatch):
+    monkeypatch.setattr(connection, "_ssl_contexts", {})
+    monkeypatch.setattr(config, "host", urlparse("https://kleene.example:8085"))
+    for param in ["tlsverify", "tlscacert", "tlscert", "tlskey"]:
+        monkeypatch.setattr(config, param, None)
+    return config
+
+
+class TestSslContext:
+    def test_context_is_built_once_and_shared(self, tls_config):
+        tls_config.tlsverify = True
+        tls_ctx = connection.ssl_context()
+        assert connection.ssl_context() is tls_ctx
+        assert connection._transport_settings()[2]["verify"] is tls_ctx
+
+    def test_verifies_when_tlsverify_is_set(self, tls_config):
+        tls_config.tlsverify = True
+        tls_ctx = connection.ssl_context()
+        assert tls_ctx.verify_mode == ssl.CERT_REQUIRED
+        assert tls_ctx.check_hostname
+
+    def test_no_verification_without_tlsverify(self, tls_config):
+        tls_config.tlsverify = False
+        tls_ctx = connection.ssl_context()
+        assert tls_ctx.verify_mode == ssl.CERT_NONE
+        assert not tls_ctx.check_hostname
+
+    def test_new_context_when_the_configuration_changes(self, tls_config):
+        tls_config.tlsverify = False
+        unverified = connection.ssl_context()
+        tls_config.tlsverify = True
+        assert connection.ssl_context() is not unverified
@@ -0,0 +1,132 @@
+"""Unit tests for 'klee image build' with '--watch' and '--skip-unchanged'."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from click.testing import CliRunner
+
+from klee import image
+from klee.image import BuildResult
+from klee.root import create_cli
+
+pytestmark = pytest.mark.unit
+
+
+class StopWatching(Exception):
+    pass
+
+
+@pytest.fixture(name="watched_builds")
+def fixture_watched_builds(monkeypatch, tmp_path):
+    """Run '_watch_builds' over 'results' and return the '--cache-from' of each."""
+    cache_froms = []
+
+    def run(results, from_=None):
+        results = list(results)
+
+        async def watched_build(kwargs, cache_from):
+            cache_froms.append(cache_from)
+            if not results:
+                raise StopWatching()
+            return results.pop(0)
+
+        async def changed(root, previous, exclude, interval):
+            return {"Dockerfile": (len(cache_froms), 0, 0)}
+
+        async def settled(root, current, exclude, interval):
+            return current
+
+        monkeypatch.setattr(image, "_watched_build", watched_build)
+        monkeypatch.setattr(image, "wait_for_change", changed)
+        monkeypatch.setattr(image, "wait_until_settled", settled)
+        kwargs = {"path": str(tmp_path), "from": from_}
+        with pytest.raises(StopWatching):
+            asyncio.run(image._watch_builds(kwargs, None, 0.01))
+        return cache_froms
+
+    return run
+
+
+def test_rebuilds_continue_from_the_last_image_with_a_snapshot(watched_builds):
+    results = [
+        BuildResult(True, "image1", ""),
+        BuildResult(False, "image2", "@snap3"),
+        # Failed before the first snapshot, so there is nothing to continue from
+        BuildResult(False, "image3", ""),
+        BuildResult(True, "image4", ""),
+    ]
+    assert watched_builds(results) == [None, "image1", "image2", "image2", "image4"]
+
+
+def test_rebuilds_do_not_reuse_snapshots_with_from(watched_builds):
+    results = [BuildResult(True, "image1", "")]
+    assert watched_builds(results, from_="FreeBSD:14.0") == [None, None]
+
+
+def test_rebuilds_reuse_the_snapshots_of_the_first_build(monkeypatch, tmp_path):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    context = tmp_path / "context"
+    context.mkdir()
+    (context / "Dockerfile").write_text("FROM FreeBSD\nRUN echo hi\nRUN make\n")
+    images = [
+        SimpleNamespace(
+            id="base1",
+            name="FreeBSD",
+            tag="latest",
+            created="2024-01-01T10:00:00Z",
+            instructions=[["FROM scratch", ""]],
+        )
+    ]
+    froms = []
+
+    def image_list(endpoint, kwargs, statuscode2printer):
+        return SimpleNamespace(status_code=200, parsed=images)
+
+    async def build_image(kwargs):
+        froms.append(kwargs["from"])
+        image_id = f"image{len(froms)}"
+        images.append(
+            SimpleNamespace(
+                id=image_id,
+                name="app",
+                tag="latest",
+                created="2024-01-01T11:00:00Z",
+                instructions=[["FROM FreeBSD", ""], ["RUN echo hi", "@s2"]],
+            )
+        )
+        return BuildResult(False, image_id, "@s2")
+
+    monkeypatch.setattr(image, "request_and_print_response", image_list)
+    monkeypatch.setattr(image, "_build_image", build_image)
+    kwargs = {
+        "path": str(context),
+        "file": "Dockerfile",
+        "from": None,
+        "quiet": True,
+        "build_arg": (),
+    }
+    first = asyncio.run(image._watched_build(dict(kwargs), None))
+    asyncio.run(image._watched_build(dict(kwargs), first.image_id))
+    assert froms == [None, "image1@s2"]
+
+
+def test_skip_unchanged_without_kleened_exits_with_the_connection_error(
+    monkeypatch, tmp_path
+):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    (tmp_path / "Dockerfile").write_text("FROM FreeBSD\n")
+    result = CliRunner().invoke(
+        create_cli(),
+        [
+            "--host",
+            "http:///nonexistent.sock",
+            "image",
+            "build",
+            "--skip-unchanged",
+            str(tmp_path),
+        ],
+    )
+
+    assert result.exit_code == 1
+    assert result.output.startswith("unable to connect to kleened: ")
@@ -0,0 +1,111 @@
+"""Unit tests for klee.jsoncodec: both backends must give the same results."""
+
+import json
+import math
+
+import pytest
+
+from klee import jsoncodec
+
+pytestmark = pytest.mark.unit
+
+orjson = pytest.importorskip("orjson")
+
+EXEC_CONFIG = {"exec_id": "2b9a5f4ce1d3", "attach": True, "start_container": False}
+
+BUILD_CONFIG = {
+    "context": "/home/user/é/app",
+    "dockerfile": "Dockerfile",
+    "tag": "app:latest",
+    "quiet": False,
+    "cleanup": True,
+    "buildargs": {"GREETING": 'say "hi"\n\ttab\\', "EMPTY": ""},
+    "container_config": {"cmd": ["/bin/sh", "-c", "echo ✓  "], "jid": None},
+    "networks": [],
+}
+
+DOCUMENTS = [
+    EXEC_CONFIG,
+    BUILD_CONFIG,
+    [BUILD_CONFIG, EXEC_CONFIG, [], {}, [[[]]]],
+    "emoji 🐚 and \x00 control",
+    [0, -1, 2**63 - 1, -(2**63), 2**64, 10**30],
+    [0.5, -0.0, 1.25, 123456789.123, 0.1],
+    {1: "integer key", "2": "string key"},
+    True,
+    None,
+]
+
+INVALID_DOCUMENTS = [b"", b"[1,", b"{'a': 1}", b"[1] 2", b'"\\u12"']
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    if request.param == "json":
+        monkeypatch.setattr(jsoncodec, "orjson", None)
+    return request.param
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_dumps_is_identical_with_either_backend(document, monkeypatch):
+    encoded = jsoncodec.dumps(document)
+    monkeypatch.setattr(jsoncodec, "orjson", None)
+    assert jsoncodec.dumps(document) == encoded
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_dumps_is_compact_json(document, backend):
+    encoded = jsoncodec.dumps(document)
+    assert isinstance(encoded, str)
+    assert encoded == json.dumps(document, separators=(",", ":"), ensure_ascii=False)
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_loads_decodes_what_dumps_encodes(document, backend):
+    # JSON objects only have string keys
+    expected = json.loads(json.dumps(document))
+    encoded = json.dumps(document)
+    assert jsoncodec.loads(encoded) == expected
+    assert jsoncodec.loads(encoded.encode()) == expected
+
+
+def test_loads_accepts_what_only_json_decodes(backend):
+    decoded = jsoncodec.loads("[NaN, 1e400, 18446744073709551616]")
+    assert math.isnan(decoded[0])
+    assert decoded[1:] == [math.inf, 2**64]
+
+
+@pytest.mark.parametrize(
+    "document", ['{"a": -18446744073709551616}', "[1,\n 2e0, 10000000000000000000000]"]
+)
+def test_loads_of_long_integers_after_a_chunk_boundary(document, monkeypatch):
+    monkeypatch.setattr(jsoncodec, "_SCAN_CHUNK_SIZE", 7)
+    assert jsoncodec.loads(document) == json.loads(document)
+    assert jsoncodec.loads(document.encode()) == json.loads(document)
+
+
+def test_long_digits_in_strings_are_decoded_by_orjson(monkeypatch):
+    document = '["sha256-1234567890123456789012345", 1.1234567890123456789012]'
+
+    def fail(_data):
+        raise AssertionError("decoded by json")
+
+    monkeypatch.setattr(jsoncodec.json, "loads", fail)
+    assert jsoncodec.loads(document) == orjson.loads(document)
+    assert jsoncodec.loads(bytearray(document.encode())) == orjson.loads(document)
+
+
+def test_loads_of_a_lone_surrogate_escape(backend):
+    assert jsoncodec.loads(r'"\ud800"') == "\ud800"
+
+
+@pytest.mark.parametrize("document", INVALID_DOCUMENTS)
+def test_invalid_documents_raise_json_decode_error(document, backend):
+    with pytest.raises(jsoncodec.JSONDecodeError):
+        jsoncodec.loads(document)
+
+
+def test_decode_errors_are_value_errors():
+    # Existing 'except json.JSONDecodeError' and 'except ValueError' still apply
+    assert jsoncodec.JSONDecodeError is json.JSONDecodeError
+    assert issubclass(jsoncodec.JSONDecodeError, ValueError)
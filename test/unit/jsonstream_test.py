@@ -0,0 +1,83 @@
+"""Unit tests for klee.jsonstream's incremental JSON array parser."""
+
+import json
+
+import pytest
+
+from klee import jsonstream
+from klee.jsonstream import iter_json_array
+
+pytestmark = pytest.mark.unit
+
+DOCUMENT = [
+    {"id": "a1", "cmd": ["/bin/sh", "-c", "echo '[1, {2}]' \\"], "jid": 12},
+    {"id": "b2", "name": "blåbær", "cmd": None, "running": False},
+    1234,
+    "],[",
+    [],
+]
+
+
+def _chunked(data, size):
+    return [data[n : n + size] for n in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 10000])
+def test_any_chunking_yields_the_elements(size):
+    data = json.dumps(DOCUMENT, ensure_ascii=False, indent=2).encode()
+    assert list(iter_json_array(_chunked(data, size))) == DOCUMENT
+
+
+@pytest.mark.parametrize("indent", [None, 1])
+def test_elements_split_at_any_offset_are_decoded_whole(indent):
+    document = [1.5, 123, -0.25e10, True, False, None, "ab", {"n": 45}, [6]]
+    data = json.dumps(document, indent=indent).encode()
+    for offset in range(1, len(data)):
+        assert list(iter_json_array([data[:offset], data[offset:]])) == document
+
+
+def test_elements_are_yielded_before_the_array_is_complete():
+    elements = iter_json_array([b'[{"id": "a1"},', b' {"id": "b2"}'])
+    assert next(elements) == {"id": "a1"}
+
+
+@pytest.mark.parametrize("data", [b"[]", b" [ \n ] "])
+def test_empty_arrays(data):
+    assert list(iter_json_array(_chunked(data, 1))) == []
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b"[",
+        b"]",
+        b'{"id": "a1"}',
+        b"[1, 2",
+        b"[1 2]",
+        b"[1,]",
+        b"[1] 2",
+        b"[{]",
+        b"[1x]",
+        b"[tru]",
+    ],
+)
+def test_invalid_documents_raise(data):
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(_chunked(data, 2)))
+
+
+def test_large_elements_are_decoded_once(monkeypatch):
+    calls = []
+
+    class CountingDecoder(json.JSONDecoder):
+        def raw_decode(self, s, idx=0):
+            calls.append(idx)
+            return super().raw_decode(s, idx)
+
+    monkeypatch.setattr(jsonstream, "_decoder", CountingDecoder())
+    element = {"env": [f'VAR{n}="{n}" \\' for n in range(20000)], "n": 12345}
+    data = json.dumps([element, 12345]).encode()
+    assert list(iter_json_array(_chunked(data, 100))) == [element, 12345]
+    # Not once per chunk: the element spans thousands of them
+    assert len(calls) <= 4
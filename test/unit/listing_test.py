@@ -0,0 +1,77 @@
+"""Unit tests for the '--quiet'/'--format' printers of the 'ls' commands."""
+
+import json
+
+import httpx
+import pytest
+
+from klee.listing import listing_printer
+
+pytestmark = pytest.mark.unit
+
+ITEMS = [
+    {"id": "a1", "name": "web", "cmd": ["/bin/sh", "-c", "ls"], "jid": 3},
+    {"id": "b2", "name": "db", "cmd": None, "jid": None},
+]
+
+CONTENT = json.dumps(ITEMS).encode()
+
+
+class _Model:
+    def __init__(self, src_dict):
+        self.id = src_dict["id"]
+
+    @classmethod
+    def from_dict(cls, src_dict):
+        return cls(src_dict)
+
+
+def _table_printer(_models):
+    raise AssertionError("the table should not be printed")
+
+
+def _print(capsys, quiet=False, output_format=None, content=CONTENT):
+    printer = listing_printer(_table_printer, _Model, "id", quiet, output_format)
+    # A response being received in small chunks
+    printer(httpx.Response(200, content=iter([content[:7], content[7:]])))
+    return capsys.readouterr().out
+
+
+def test_default_passes_models_to_the_table_printer():
+    printed = []
+    printer = listing_printer(printed.extend, _Model, "id")
+    printer(httpx.Response(200, content=CONTENT))
+    assert [model.id for model in printed] == ["a1", "b2"]
+
+
+def test_quiet_prints_one_id_per_line(capsys):
+    assert _print(capsys, quiet=True) == "a1\nb2\n"
+
+
+def test_json_passes_the_response_through(capsys):
+    assert _print(capsys, output_format="json") == CONTENT.decode() + "\n"
+
+
+def test_ndjson_prints_one_object_per_line(capsys):
+    lines = _print(capsys, output_format="ndjson").splitlines()
+    assert [json.loads(line) for line in lines] == ITEMS
+
+
+def test_template(capsys):
+    output = _print(capsys, output_format="{{.ID}}\\t{{ .name }} jid={{.jid}}")
+    assert output == "a1\tweb jid=3\nb2\tdb jid=\n"
+
+
+def test_template_with_non_string_values(capsys):
+    output = _print(capsys, output_format="{{.cmd}}")
+    assert output == '["/bin/sh","-c","ls"]\n\n'
+
+
+def test_template_with_unknown_field_exits(capsys):
+    with pytest.raises(SystemExit):
+        _print(capsys, output_format="{{.nope}}")
+
+
+def test_empty_listing_prints_nothing(capsys):
+    assert _print(capsys, quiet=True, content=b"[]") == ""
+    assert _print(capsys, output_format="{{.id}}", content=b"[]") == ""
@@ -0,0 +1,94 @@
+"""Unit tests for klee.multiplex's selection of containers and prefixed output."""
+
+from types import SimpleNamespace
+
+import pytest
+from click.testing import CliRunner
+
+from klee import multiplex
+from klee.container import ERROR_OPTION_AFTER_CONTAINER
+from klee.multiplex import LinePrefixer, select_containers
+from klee.root import create_cli
+
+pytestmark = pytest.mark.unit
+
+
+class TestLinePrefixer:
+    def test_complete_lines_are_prefixed(self):
+        prefixer = LinePrefixer("web1 | ")
+        assert prefixer.feed(b"a\nb\n") == b"web1 | a\nweb1 | b\n"
+        assert prefixer.flush() == b""
+
+    def test_partial_lines_wait_for_their_end(self):
+        prefixer = LinePrefixer("web1 | ")
+        assert prefixer.feed(b"par") == b""
+        assert prefixer.feed("tial\nnext") == b"web1 | partial\n"
+        assert prefixer.flush() == b"web1 | next\n"
+        assert prefixer.flush() == b""
+
+
+def _summary(name, running):
+    return SimpleNamespace(id=f"{name}-id", name=name, running=running)
+
+
+@pytest.fixture(name="listed")
+def fixture_listed(monkeypatch):
+    containers = [
+        _summary("web1", True),
+        _summary("web2", True),
+        _summary("db", True),
+        _summary("web3", False),
+    ]
+    response = SimpleNamespace(status_code=200, parsed=containers)
+    requests = []
+
+    def request(endpoint, kwargs):
+        requests.append(kwargs)
+        return response
+
+    monkeypatch.setattr(multiplex, "request", request)
+    return requests
+
+
+def test_given_containers_are_used_without_listing(listed):
+    assert select_containers(["a", "b", "a"]) == ["a", "b"]
+    assert not listed
+
+
+def test_all_selects_running_or_stopped_containers(listed):
+    assert select_containers([], all_=True) == ["web1", "web2", "db"]
+    assert select_containers([], all_=True, running=False) == ["web3"]
+    assert listed == [{"all_": True}] * 2
+
+
+def test_filters_match_names_and_ids(listed):
+    assert select_containers(["db"], filters=["web*", "db-id"]) == [
+        "db",
+        "web1",
+        "web2",
+    ]
+
+
+@pytest.mark.parametrize(
+    "command", [["exec", "--all", "ls"], ["container", "start", "--all"]]
+)
+def test_selecting_without_kleened_exits_with_the_connection_error(command):
+    cli = create_cli()
+    result = CliRunner().invoke(cli, ["--host", "http:///nonexistent.sock", *command])
+
+    assert result.exit_code == 1
+    assert result.output.startswith("unable to connect to kleened: ")
+
+
+@pytest.mark.parametrize(
+    "arguments,option",
+    [(["db", "-e", "A=1", "env"], "-e"), (["--all", "--verbose", "ls"], "--verbose")],
+)
+def test_options_after_container_are_refused(arguments, option):
+    cli = create_cli()
+    result = CliRunner().invoke(
+        cli, ["--host", "http:///nonexistent.sock", "exec", *arguments]
+    )
+
+    assert result.exit_code == 1
+    assert result.output == ERROR_OPTION_AFTER_CONTAINER.format(option=option) + "\n"
@@ -0,0 +1,86 @@
+"""Unit tests for klee.parallel's bounded fan-out of multi-argument commands.
+
+The operations are plain coroutines, so no kleened is needed.
+"""
+
+import asyncio
+
+import pytest
+
+from klee.parallel import run_parallel
+
+pytestmark = pytest.mark.unit
+
+
+def _operation(delays, failing=(), in_flight=None):
+    in_flight = [] if in_flight is None else in_flight
+
+    async def operation(item):
+        in_flight.append(item)
+        await asyncio.sleep(delays[item])
+        in_flight.append(None)
+        if item in failing:
+            return False, "no such container"
+        return True, item
+
+    return operation
+
+
+def _max_concurrency(in_flight):
+    running = peak = 0
+    for event in in_flight:
+        running += 1 if event is not None else -1
+        peak = max(peak, running)
+    return peak
+
+
+class TestRunParallel:
+    def test_results_are_reported_in_input_order(self, capsys):
+        delays = {"a": 0.03, "b": 0.01, "c": 0.0}
+        assert run_parallel(list(delays), _operation(delays), parallel=3) == 0
+        lines = capsys.readouterr().out.splitlines()
+        assert lines == ["a", "b", "c", "3 of 3 succeeded"]
+
+    def test_unordered_reports_results_as_they_complete(self, capsys):
+        delays = {"a": 0.03, "b": 0.01, "c": 0.0}
+        run_parallel(list(delays), _operation(delays), parallel=3, ordered=False)
+        lines = capsys.readouterr().out.splitlines()
+        assert lines == ["c", "b", "a", "3 of 3 succeeded"]
+
+    def test_failures_do_not_stop_the_rest_and_set_the_exit_code(self, capsys):
+        delays = {"a": 0.0, "missing": 0.0, "b": 0.0}
+        operation = _operation(delays, failing={"missing"})
+        assert run_parallel(list(delays), operation, parallel=2) == 1
+        lines = capsys.readouterr().out.splitlines()
+        assert lines == [
+            "a",
+            "missing: no such container",
+            "b",
+            "2 of 3 succeeded",
+            "failed: missing",
+        ]
+
+    def test_concurrency_is_capped(self, capsys):
+        delays = {str(n): 0.005 for n in range(12)}
+        in_flight = []
+        run_parallel(list(delays), _operation(delays, in_flight=in_flight), parallel=4)
+        assert _max_concurrency(in_flight) == 4
+
+    def test_unexpected_errors_are_failures_of_their_item(self, capsys):
+        delays = {"a": 0.0, "broken": 0.0, "b": 0.01}
+        operation = _operation(delays)
+
+        async def breaking(item):
+            if item == "broken":
+                raise AttributeError("no id")
+            return await operation(item)
+
+        assert run_parallel(list(delays), breaking, parallel=3) == 1
+        lines = capsys.readouterr().out.splitlines()
+        assert lines == [
+            "a",
+            "broken: unexpected error: AttributeError('no id')",
+            "b",
+            "2 of 3 succeeded",
+            "failed: broken",
+        ]
@@ -0,0 +1,118 @@
+"""Unit tests for klee.printing's plain-text table renderer and JSON printers.
+
+The expected tables are what rich prints for the same input, so the output of
+'klee <object> ls' looks the same whichever renderer is used.
+"""
+
+import httpx
+import pytest
+
+from klee import printing
+from klee.client.types import UNSET
+from klee.config import config
+from klee.printing import (
+    THEME_FANCY,
+    THEME_SIMPLE,
+    print_json_pretty,
+    print_json_stream,
+    print_plain_table,
+)
+
+pytestmark = pytest.mark.unit
+
+COLUMNS = [
+    ("ID", {"style": "cyan"}),
+    ("NAME", {}),
+    ("N", {"justify": "right"}),
+]
+
+ITEMS = [["abc", "[b]x[/b]", "2"], ["a", "yy", "10"]]
+
+
+@pytest.fixture
+def theme(monkeypatch):
+    def set_theme(name):
+        monkeypatch.setattr(config, "theme", name)
+
+    return set_theme
+
+
+class TestPrintPlainTable:
+    def test_fancy_theme_matches_rich(self, theme, capsys):
+        theme(THEME_FANCY)
+        print_plain_table(ITEMS, COLUMNS)
+        assert capsys.readouterr().out == (
+            " ID    NAME    N \n"
+            "─────────────────\n"
+            " abc   x       2 \n"
+            " a     yy     10 \n"
+        )
+
+    def test_simple_theme_matches_rich(self, theme, capsys):
+        theme(THEME_SIMPLE)
+        print_plain_table(ITEMS, COLUMNS)
+        assert capsys.readouterr().out == (
+            " ID  | NAME |  N \n"
+            "-----+------+----\n"
+            " abc | x    |  2 \n"
+            " a   | yy   | 10 \n"
+        )
+
+    def test_min_and_max_width_and_centering(self, theme, capsys):
+        theme(THEME_FANCY)
+        columns = [
+            ("ID", {"min_width": 13}),
+            ("CMD", {"max_width": 10, "no_wrap": True}),
+            ("N", {"justify": "center"}),
+        ]
+        print_plain_table([["abc", "x" * 50, "2"]], columns)
+        assert capsys.readouterr().out.splitlines()[2] == (
+            " abc             xxxxxxxxx…   2 "
+        )
+
+    def test_cells_that_are_not_strings(self, theme, capsys):
+        theme(THEME_FANCY)
+        print_plain_table([["a", None, UNSET], ["b", 12, "x"]], COLUMNS)
+        assert capsys.readouterr().out.splitlines()[2:] == [
+            " a" + " " * 13,
+            " b    12     x ",
+        ]
+
+    def test_rows_are_written_while_they_are_produced(self, theme, capsys, monkeypatch):
+        theme(THEME_FANCY)
+        monkeypatch.setattr(printing, "PLAIN_TABLE_BATCH_SIZE", 2)
+        written = []
+
+        def rows():
+            for n in range(5):
+                written.append(capsys.readouterr().out.count("\n"))
+                yield [str(n), "y" * (n * 3), "1"]
+
+        print_plain_table(rows(), COLUMNS)
+        # The header and the first batch once it is laid out, then a batch at a time
+        assert written == [0, 0, 4, 0, 2]
+        # Wider cells of later batches are written in full
+        assert capsys.readouterr().out.splitlines()[-1] == (" 4    yyyyyyyyyyyy   1 ")
+
+    def test_empty_table_prints_the_header(self, theme, capsys):
+        theme(THEME_FANCY)
+        print_plain_table([], COLUMNS[:2])
+        assert capsys.readouterr().out == " ID   NAME \n───────────\n"
+
+
+INSPECT_JSON = b'{"id": "a1", "endpoints": [{"ip": "10.0.0.2"}]}'
+
+
+class TestPrintJson:
+    def test_stream_writes_the_body_unmodified(self, capsysbinary):
+        print_json_stream(httpx.Response(200, content=INSPECT_JSON))
+        assert capsysbinary.readouterr().out == INSPECT_JSON + b"\n"
+
+    def test_pretty_in_simple_theme(self, theme, capsys):
+        theme(THEME_SIMPLE)
+        print_json_pretty(httpx.Response(200, content=INSPECT_JSON))
+        assert capsys.readouterr().out.splitlines()[:3] == [
+            "{",
+            '  "id": "a1",',
+            '  "endpoints": [',
+        ]
@@ -0,0 +1,65 @@
+"""Unit tests for the row views used in place of models by the 'ls' commands."""
+
+import pytest
+
+from klee.client.models.container_summary import ContainerSummary
+from klee.client.models.network import Network
+from klee.client.types import UNSET
+from klee.rowviews import ContainerSummaryView, NetworkView
+
+pytestmark = pytest.mark.unit
+
+CONTAINER = {
+    "id": "a1b2c3",
+    "name": "web",
+    "image_id": "i1",
+    "image_name": "FreeBSD",
+    "image_tag": "latest",
+    "cmd": ["/bin/sh", "-c", "echo hi"],
+    "created": "2024-01-01T10:00:00Z",
+    "running": True,
+    "jid": 7,
+    "restart_policy": "on-startup",
+    "network_driver": "ipnet",
+    "public_ports": [
+        {
+            "interfaces": ["em0"],
+            "ip_address": "10.0.0.2",
+            "ip_address6": "",
+            "host_port": "8080",
+            "container_port": "80",
+            "protocol": "tcp",
+        }
+    ],
+    "unknown_key": 1,
+}
+
+
+@pytest.mark.parametrize(
+    "view_class,model_class,source",
+    [
+        (ContainerSummaryView, ContainerSummary, CONTAINER),
+        (ContainerSummaryView, ContainerSummary, {"id": "a1", "restart_policy": None}),
+        (NetworkView, Network, {"id": "n1", "name": "net", "type": "bridge"}),
+    ],
+)
+def test_every_attribute_matches_the_model(view_class, model_class, source):
+    view = view_class.from_dict(source)
+    model = model_class.from_dict(source)
+    for name in model_class.__attrs_attrs__:
+        assert getattr(view, name.name) == getattr(model, name.name)
+
+    assert view.to_dict() == model.to_dict()
+
+
+def test_fields_are_decoded_without_building_the_model():
+    view = ContainerSummaryView.from_dict(CONTAINER)
+    assert view.restart_policy == "on-startup"
+    assert view.jid == 7
+    assert view._model is None  # pylint: disable=protected-access
+
+
+def test_missing_fields_are_unset():
+    view = ContainerSummaryView.from_dict({})
+    assert view.id is UNSET
+    assert view.restart_policy is UNSET
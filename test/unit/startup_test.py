@@ -0,0 +1,59 @@
+"""Startup-time regression tests for klee's CLI.
+
+Every klee invocation pays for importing 'klee.main', so it must stay cheap. Each
+test imports it in a fresh interpreter, as modules already imported by pytest
+would otherwise hide the cost.
+"""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+# Generous compared to what is measured on a developer machine (~50 ms, most of
+# it click), so that a slow VM does not fail it, but far below the several
+# hundred milliseconds of importing every command module.
+IMPORT_BUDGET_SECONDS = 0.3
+
+HEAVY_MODULES = ["httpx", "rich", "websockets", "dateutil", "yaml", "klee.client"]
+
+IMPORT_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import klee.main
+elapsed = time.perf_counter() - started
+print(json.dumps({"elapsed": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+def _import_klee_main():
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+@pytest.fixture(scope="module")
+def imported_modules():
+    return _import_klee_main()["modules"]
+
+
+def test_importing_klee_main_stays_within_budget():
+    # Best of three to not fail on a single hiccup of a loaded machine
+    elapsed = min(_import_klee_main()["elapsed"] for _ in range(3))
+    assert elapsed < IMPORT_BUDGET_SECONDS
+
+
+@pytest.mark.parametrize("module", HEAVY_MODULES)
+def test_heavy_modules_are_not_imported_at_startup(imported_modules, module):
+    assert [
+        name
+        for name in imported_modules
+        if name == module or name.startswith(f"{module}.")
+    ] == []
@@ -0,0 +1,218 @@
+"""Unit tests for klee.streaming's relaying of attached input and output.
+
+A fake websocket stands in for kleened, so no connection is needed.
+"""
+
+import io
+import os
+import sys
+import time
+import asyncio
+
+import pytest
+from click.testing import CliRunner
+from websockets.exceptions import ConnectionClosedOK
+from websockets.frames import Close
+
+from klee import streaming
+from klee.container import ERROR_INPUT_WITHOUT_TTY
+from klee.root import create_cli
+from klee.streaming import OutputStats, human_size, pump_input, relay_output
+
+pytestmark = pytest.mark.unit
+
+CLOSE_REASON = '{"msg_type": "closing", "message": "exited", "data": ""}'
+
+
+class FakeWebSocket:
+    def __init__(self, frames):
+        self.frames = list(frames)
+        self.received = 0
+        self.close_reason = CLOSE_REASON
+
+    async def recv(self):
+        if self.received == len(self.frames):
+            raise ConnectionClosedOK(Close(1000, CLOSE_REASON), None)
+
+        self.received += 1
+        return self.frames[self.received - 1]
+
+    async def send(self, data):
+        self.frames.append(data)
+
+
+def _relay(frames, fileno, stats=None):
+    return asyncio.run(relay_output(FakeWebSocket(frames), fileno, stats))
+
+
+def test_frames_are_written_in_order_as_bytes(tmp_path):
+    path = tmp_path / "output"
+    stats = OutputStats()
+    with open(path, "wb") as output:
+        closing = _relay([b"binary\n", "text ✓\n", b"", b"end"], output.fileno(), stats)
+
+    assert path.read_bytes() == "binary\ntext ✓\nend".encode()
+    assert closing["message"] == "exited"
+    assert (stats.frames, stats.bytes) == (4, len("binary\ntext ✓\nend".encode()))
+
+
+def test_frames_received_during_a_write_are_joined(tmp_path, monkeypatch):
+    def slow_write(fileno, data):
+        # Gives the receiver time to queue more frames
+        os.write(fileno, data)
+        time.sleep(0.001)
+
+    monkeypatch.setattr(streaming, "_write_all", slow_write)
+    path = tmp_path / "output"
+    stats = OutputStats()
+    frames = [f"{n}\n".encode() for n in range(1000)]
+    with open(path, "wb") as output:
+        _relay(frames, output.fileno(), stats)
+
+    assert path.read_bytes() == b"".join(frames)
+    assert stats.writes < len(frames) / 10
+
+
+def test_receiving_waits_for_a_slow_writer(tmp_path, monkeypatch):
+    websocket = FakeWebSocket([b"x"] * 100)
+    ahead = []
+
+    def slow_write(fileno, data):
+        # Frames received but not yet written
+        ahead.append(websocket.received - len(ahead) - len(data))
+        time.sleep(0.001)
+
+    monkeypatch.setattr(streaming, "OUTPUT_QUEUE_SIZE", 4)
+    monkeypatch.setattr(streaming, "OUTPUT_WRITE_SIZE", 1)
+    monkeypatch.setattr(streaming, "_write_all", slow_write)
+    with open(tmp_path / "output", "wb") as output:
+        asyncio.run(relay_output(websocket, output.fileno()))
+
+    assert len(ahead) == 100
+    # The queue, the frame being put and the one being written
+    assert max(ahead) <= 4 + 2
+
+
+def test_output_to_a_closed_pipe_is_discarded():
+    read_end, write_end = os.pipe()
+    os.close(read_end)
+    stats = OutputStats()
+    try:
+        closing = _relay([b"x" * 1024] * 100, write_end, stats)
+    finally:
+        os.close(write_end)
+
+    assert closing["message"] == "exited"
+    assert (stats.frames, stats.bytes) == (100, 0)
+
+
+def test_output_to_stdout_without_a_file_descriptor(monkeypatch):
+    # Like the output captured by click's 'CliRunner'
+    output = io.BytesIO()
+    monkeypatch.setattr(sys, "stdout", io.TextIOWrapper(output))
+    closing = _relay([b"binary\n", "text \u2713\n"], None)
+
+    assert output.getvalue() == "binary\ntext \u2713\n".encode()
+    assert closing["message"] == "exited"
+
+
+def _pump(fileno, eof_frame=None):
+    websocket = FakeWebSocket([])
+    asyncio.run(pump_input(websocket, fileno, eof_frame))
+    return websocket.frames
+
+
+def test_piped_input_is_sent_in_large_frames_in_order():
+    data = os.urandom(streaming.INPUT_READ_SIZE * 20)
+    read_end, write_end = os.pipe()
+
+    async def pump_while_writing():
+        websocket = FakeWebSocket([])
+        pumping = asyncio.ensure_future(pump_input(websocket, read_end, b"\x04"))
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, os.write, write_end, data)
+        os.close(write_end)
+        await pumping
+        return websocket.frames
+
+    try:
+        frames = asyncio.run(pump_while_writing())
+    finally:
+        os.close(read_end)
+
+    assert b"".join(frames[:-1]) == data
+    assert frames[-1] == b"\x04"
+    assert len(frames) < 100
+
+
+def test_input_from_a_regular_file(tmp_path):
+    path = tmp_path / "input"
+    data = os.urandom(streaming.INPUT_READ_SIZE * 3 + 1)
+    path.write_bytes(data)
+    with open(path, "rb") as input_:
+        frames = _pump(input_.fileno())
+
+    assert b"".join(frames) == data
+    assert len(frames) == 4
+
+
+def test_empty_input_sends_only_the_eof_frame():
+    read_end, write_end = os.pipe()
+    os.close(write_end)
+    try:
+        assert _pump(read_end, b"\x04") == [b"\x04"]
+        assert _pump(read_end) == []
+    finally:
+        os.close(read_end)
+
+
+def test_input_from_stdin_without_a_file_descriptor(monkeypatch):
+    # Like the input given to click's 'CliRunner'
+    data = os.urandom(streaming.INPUT_READ_SIZE * 2 + 1)
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(data)))
+
+    assert b"".join(_pump(None, b"\x04")) == data + b"\x04"
+
+
+@pytest.mark.parametrize(
+    "command",
+    [["exec", "-i", "db", "psql"], ["run", "-i", "app"], ["start", "-i", "db"]],
+)
+def test_piped_input_without_a_tty_is_refused(command):
+    # It is refused before connecting to kleened, which would never be told
+    # that the input has ended
+    cli = create_cli()
+    result = CliRunner().invoke(cli, ["--host", "http:///nonexistent.sock", *command])
+
+    assert result.exit_code == 1
+    assert result.output == f"{ERROR_INPUT_WITHOUT_TTY}\n"
+
+
+def test_reading_pauses_while_sending_is_slow(monkeypatch):
+    monkeypatch.setattr(streaming, "INPUT_QUEUE_SIZE", 2)
+    monkeypatch.setattr(streaming, "INPUT_READ_SIZE", 1)
+    read_end, write_end = os.pipe()
+    os.write(write_end, b"abcdefghij")
+    os.close(write_end)
+
+    class SlowWebSocket(FakeWebSocket):
+        async def send(self, data):
+            await asyncio.sleep(0.001)
+            await super().send(data)
+
+    websocket = SlowWebSocket([])
+    try:
+        # Would raise 'asyncio.QueueFull' if reading went on while full
+        asyncio.run(pump_input(websocket, read_end))
+    finally:
+        os.close(read_end)
+
+    assert websocket.frames == [bytes([c]) for c in b"abcdefghij"]
+
+
+@pytest.mark.parametrize(
+    "size,expected",
+    [(0, "0 B"), (1023, "1023 B"), (1536, "1.5 KiB"), (5 * 1024**3, "5.0 GiB")],
+)
+def test_human_size(size, expected):
+    assert human_size(size) == expected
@@ -0,0 +1,89 @@
+"""Unit tests for klee.sync's comparison of local and container manifests."""
+
+# pylint: disable=protected-access
+
+import io
+import os
+import hashlib
+import tarfile
+
+import pytest
+
+from klee import sync
+from klee.sync import compare_manifests, hash_files, parse_manifest
+from klee.watch import snapshot
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture(name="tree")
+def fixture_tree(tmp_path):
+    (tmp_path / "css").mkdir()
+    (tmp_path / "index.html").write_text("<html></html>")
+    (tmp_path / "css" / "site.css").write_text("body {}")
+    (tmp_path / "big.bin").write_bytes(os.urandom(sync.HASH_BLOCK_SIZE * 2 + 3))
+    (tmp_path / "latest").symlink_to("index.html")
+    (tmp_path / "dangling").symlink_to("nowhere")
+    return tmp_path
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def test_hash_files_follows_symlinks_and_skips_unreadable_files(tree):
+    digests = hash_files(str(tree), snapshot(str(tree)))
+    assert set(digests) == {"index.html", "css/site.css", "big.bin", "latest"}
+    assert digests["css/site.css"][1] == _sha256(b"body {}")
+    assert digests["big.bin"][1] == _sha256((tree / "big.bin").read_bytes())
+    assert digests["latest"][1] == digests["index.html"][1]
+
+
+def test_hash_files_reuses_digests_of_unchanged_files(tree, monkeypatch):
+    files = snapshot(str(tree))
+    previous = hash_files(str(tree), files)
+    (tree / "index.html").write_text("<html>changed</html>")
+    os.utime(tree / "index.html", ns=(0, 0))
+    hashed = []
+    file_digest = sync.file_digest
+
+    def counting_digest(path):
+        hashed.append(os.path.relpath(path, tree))
+        return file_digest(path)
+
+    monkeypatch.setattr(sync, "file_digest", counting_digest)
+    digests = hash_files(str(tree), snapshot(str(tree)), previous)
+    # 'latest' points to the changed file, but its own entry is unchanged
+    assert sorted(hashed) == ["dangling", "index.html"]
+    assert digests["index.html"][1] == _sha256(b"<html>changed</html>")
+
+
+def test_parse_manifest():
+    output = (
+        f"{_sha256(b'a')} ./index.html\n"
+        f"{_sha256(b'b')} ./css/my site.css\n"
+        f"{_sha256(b'c')} ./app.pyc\n"
+        "\n"
+    )
+    assert parse_manifest(output, exclude=("*.pyc",)) == {
+        "index.html": _sha256(b"a"),
+        "css/my site.css": _sha256(b"b"),
+    }
+
+
+def test_compare_manifests():
+    local = {"same": "1", "changed": "2", "added": "3"}
+    remote = {"same": "1", "changed": "x", "removed": "4"}
+    assert compare_manifests(local, remote) == (["added", "changed"], ["removed"])
+    assert compare_manifests(local, local) == ([], [])
+
+
+def test_pack_files_only_contains_the_given_files(tree):
+    archive = io.BytesIO()
+    sync._pack_files(str(tree), ["css/site.css", "latest"], archive)
+    archive.seek(0)
+    with tarfile.open(fileobj=archive) as tar:
+        members = {member.name: member for member in tar.getmembers()}
+
+    assert set(members) == {"css/site.css", "latest"}
+    assert members["latest"].issym()
@@ -0,0 +1,164 @@
+"""Unit tests for klee.transfer's streaming of tar archives for 'klee cp'.
+
+The archives are passed between the threads directly, without a websocket.
+"""
+
+# pylint: disable=protected-access
+
+import os
+import tarfile
+import functools
+
+import pytest
+
+from klee import transfer
+from klee.transfer import ArchiveReader, ArchiveWriter, split_container_path
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.mark.parametrize(
+    "argument,expected",
+    [
+        ("web:/usr/local/www", ("web", "/usr/local/www")),
+        ("web:", ("web", "")),
+        ("web:relative/path", ("web", "relative/path")),
+        ("/tmp/file:with:colons", (None, "/tmp/file:with:colons")),
+        ("./web:/path", (None, "./web:/path")),
+        ("dir/web:/path", (None, "dir/web:/path")),
+        (":/path", (None, ":/path")),
+        ("artifact.tar", (None, "artifact.tar")),
+        ("-", (None, "-")),
+    ],
+)
+def test_split_container_path(argument, expected):
+    assert split_container_path(argument) == expected
+
+
+@pytest.fixture(name="tree")
+def fixture_tree(tmp_path):
+    root = tmp_path / "source" / "app"
+    (root / "static" / "css").mkdir(parents=True)
+    (root / "empty").mkdir()
+    (root / "index.html").write_text("<html></html>")
+    (root / "static" / "css" / "site.css").write_text("body {}")
+    (root / "static" / "blob.bin").write_bytes(os.urandom(transfer.CHUNK_SIZE * 5 + 7))
+    (root / "latest").symlink_to("index.html")
+    return root
+
+
+def _transfer(producer, consumer, compress):
+    """Run a producer and a consumer like 'cp' does, with the chunks in between."""
+    writer = ArchiveWriter(producer, compress)
+    reader = ArchiveReader(consumer, compress)
+    writer.start()
+    reader.start()
+    chunks = []
+    while True:
+        chunk = writer.chunks.get()
+        reader.chunks.put(chunk)
+        if chunk is None:
+            break
+        chunks.append(chunk)
+
+    reader._thread.join()
+    assert writer.error is None and reader.error is None
+    return chunks
+
+
+def _files(root):
+    return {
+        path.relative_to(root): (
+            os.readlink(path)
+            if path.is_symlink()
+            else None if path.is_dir() else path.read_bytes()
+        )
+        for path in root.rglob("*")
+    }
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_a_tree_is_copied_through_chunks(tree, tmp_path, compress):
+    destination = tmp_path / "destination"
+    chunks = _transfer(
+        functools.partial(transfer._pack, str(tree)),
+        functools.partial(transfer._unpack, str(destination)),
+        compress,
+    )
+
+    assert _files(destination / "app") == _files(tree)
+    assert all(len(chunk) == transfer.CHUNK_SIZE for chunk in chunks[:-1])
+
+
+def test_the_archive_is_a_plain_tar_stream(tree, tmp_path):
+    chunks = _transfer(
+        functools.partial(transfer._pack, str(tree)),
+        lambda fileobj: fileobj.read(),
+        compress=False,
+    )
+    archive = tmp_path / "app.tar"
+    archive.write_bytes(b"".join(chunks))
+    with tarfile.open(archive) as tar:
+        names = tar.getnames()
+
+    assert names[0] == "app"
+    assert "app/static/css/site.css" in names
+
+
+def test_unpacking_refuses_paths_outside_the_destination(tmp_path):
+    if not hasattr(tarfile, "data_filter"):
+        pytest.skip("extraction filters are not supported by this Python")
+
+    archive = tmp_path / "evil.tar"
+    with tarfile.open(archive, "w") as tar:
+        evil = tmp_path / "evil.txt"
+        evil.write_text("evil")
+        tar.add(evil, "../evil.txt")
+
+    reader = ArchiveReader(
+        functools.partial(
+            transfer._unpack,
+            str(tmp_path / "destination"),
+        )
+    )
+    reader.start()
+    reader.chunks.put(archive.read_bytes())
+    reader.chunks.put(None)
+    reader._thread.join()
+    assert isinstance(reader.error, tarfile.TarError)
+
+
+def test_a_failing_producer_still_ends_the_chunks():
+    def producer(fileobj):
+        fileobj.write(b"x" * 10)
+        raise OSError("disk on fire")
+
+    writer = ArchiveWriter(producer)
+    writer.start()
+    # Only whole chunks of the archive are sent
+    assert writer.chunks.get() is None
+    assert str(writer.error) == "disk on fire"
+
+
+def test_an_aborted_producer_stops(monkeypatch):
+    monkeypatch.setattr(transfer, "CHUNK_QUEUE_SIZE", 1)
+    monkeypatch.setattr(transfer, "PROGRESS_INTERVAL", 0.01)
+    stopped = []
+
+    def producer(fileobj):
+        try:
+            while True:
+                fileobj.write(b"x" * transfer.CHUNK_SIZE)
+        finally:
+            stopped.append(True)
+
+    writer = ArchiveWriter(producer)
+    writer.start()
+    writer.chunks.get()
+    writer.abort()
+    for _ in range(100):
+        if stopped:
+            break
+        writer.chunks.get(timeout=1)
+
+    assert stopped
@@ -4,9 +4,11 @@ These need no kleened, no root, no jails and no ZFS -- see the 'unit' marker in
 pyproject.toml. They are the fast tier: run them with 'make test-unit'.
 """
 
+import datetime
+
 import pytest
 
-from klee.utils import decode_mount, decode_public_ports
+from klee.utils import decode_mount, decode_public_ports, human_duration
 
 pytestmark = pytest.mark.unit
 
@@ -148,3 +150,37 @@ class TestDecodePublicPorts:
     def test_too_many_colon_separated_sections_exits(self):
         with pytest.raises(SystemExit):
             list(decode_public_ports(["em0:8080:80:extra"]))
+
+
+class TestHumanDuration:
+    NOW = 1700000000.0  # 2023-11-14T22:13:20Z
+
+    @pytest.mark.parametrize(
+        "timestamp",
+        [
+            "2023-11-14T22:13:15Z",
+            "2023-11-14T22:13:15.000000Z",
+            "2023-11-14T22:13:15+00:00",
+            "2023-11-14T23:13:15+01:00",
+            # Not ISO-8601, so parsed by the dateutil fallback
+            "Tue Nov 14 22:13:15 UTC 2023",
+        ],
+    )
+    def test_timestamp_formats(self, timestamp):
+        assert human_duration(timestamp, now=self.NOW) == "5 seconds"
+
+    @pytest.mark.parametrize(
+        "seconds,expected",
+        [
+            (0, "Less than a second"),
+            (1, "1 second"),
+            (90, "About a minute"),
+            (60 * 60 * 3, "3 hours"),
+            (60 * 60 * 24 * 3, "3 days"),
+        ],
+    )
+    def test_durations(self, seconds, expected):
+        timestamp = datetime.datetime.fromtimestamp(
+            self.NOW - seconds, datetime.timezone.utc
+        ).isoformat()
+        assert human_duration(timestamp, now=self.NOW) == expected
@@ -0,0 +1,87 @@
+"""Unit tests for klee.watch's scanning of directories for changes."""
+
+import os
+import asyncio
+
+import pytest
+
+from klee.watch import is_excluded, snapshot, wait_for_change, wait_until_settled
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture(name="tree")
+def fixture_tree(tmp_path):
+    (tmp_path / "src" / "__pycache__").mkdir(parents=True)
+    (tmp_path / "src" / "app.py").write_text("print('hello')")
+    (tmp_path / "src" / "__pycache__" / "app.cpython-311.pyc").write_bytes(b"\0")
+    (tmp_path / "README").write_text("readme")
+    (tmp_path / "empty").mkdir()
+    (tmp_path / "latest").symlink_to("README")
+    return tmp_path
+
+
+def test_snapshot_lists_files_relative_to_the_root(tree):
+    files = snapshot(str(tree))
+    assert set(files) == {
+        "README",
+        "latest",
+        "src/app.py",
+        "src/__pycache__/app.cpython-311.pyc",
+    }
+    size, _, _ = files["src/app.py"]
+    assert size == len("print('hello')")
+
+
+def test_snapshot_skips_excluded_paths(tree):
+    files = snapshot(str(tree), exclude=("__pycache__", "latest"))
+    assert set(files) == {"README", "src/app.py"}
+
+
+@pytest.mark.parametrize(
+    "path,exclude,expected",
+    [
+        ("src/app.pyc", ("*.pyc",), True),
+        ("node_modules", ("node_modules",), True),
+        ("src/node_modules", ("node_modules",), True),
+        ("src/app.py", ("src/*",), True),
+        ("src/app.py", ("*.pyc", "build"), False),
+        ("src/app.py", (), False),
+    ],
+)
+def test_is_excluded(path, exclude, expected):
+    assert is_excluded(path, exclude) == expected
+
+
+def test_wait_for_change_returns_the_changed_snapshot(tree):
+    previous = snapshot(str(tree))
+
+    async def change_and_wait():
+        waiting = asyncio.ensure_future(
+            wait_for_change(str(tree), previous, interval=0.01)
+        )
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        os.remove(tree / "README")
+        return await asyncio.wait_for(waiting, timeout=5)
+
+    current = asyncio.run(change_and_wait())
+    assert "README" not in current
+    assert "src/app.py" in current
+
+
+def test_wait_until_settled_waits_for_a_burst_of_changes_to_end(tree):
+    async def change_in_bursts():
+        current = snapshot(str(tree))
+        settling = asyncio.ensure_future(
+            wait_until_settled(str(tree), current, interval=0.05)
+        )
+        for n in range(4):
+            (tree / f"file{n}").write_text("")
+            await asyncio.sleep(0.03)
+            assert not settling.done()
+
+        return await asyncio.wait_for(settling, timeout=5)
+
+    current = asyncio.run(change_in_bursts())
+    assert {"file0", "file1", "file2", "file3"} <= set(current)